@@ -0,0 +1,958 @@
+import asyncio
+import json
+import logging
+import math
+import re
+import time
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlencode
+
+import aiohttp
+import pandas as pd
+from github.GithubException import GithubException
+from github.GithubObject import GithubObject
+
+import catalog
+import storage
+from checkpoint import FetchCheckpoint
+from fetch_repo_data import RepoDataFetcher, utc_timestamp
+from github_client import DEFAULT_API_URL
+from http_cache import ResponseCache
+from rate_limit import RateLimitScheduler, resource_of, token_key
+from telemetry import FetchTelemetry
+
+LAST_PAGE_PATTERN = re.compile(r'[?&]page=(\d+)[^>]*>; rel="last"')
+STAR_MEDIA_TYPE = "application/vnd.github.v3.star+json"
+
+
+def parse_datetime(value: Optional[str]) -> Optional[datetime]:
+    """Parses a GitHub timestamp with PyGithub's own parser, so that the dates
+    are written exactly as by ``RepoDataFetcher``.
+
+    Args:
+        value (Optional[str]): ISO 8601 timestamp, e.g. "2022-08-01T12:00:00Z".
+
+    Returns:
+        Optional[datetime]: Parsed date, or None if there is none.
+    """
+    return GithubObject._makeDatetimeAttribute(value).value
+
+
+def last_page(link: Optional[str]) -> Optional[int]:
+    """Returns the number of the last page from a ``Link`` response header.
+
+    Args:
+        link (Optional[str]): ``Link`` header of a paginated response.
+
+    Returns:
+        Optional[int]: Last page (one based), or None if there is no link to it.
+    """
+    match = LAST_PAGE_PATTERN.search(link or "")
+    return int(match.group(1)) if match else None
+
+
+class AsyncGithubClient:
+    """Asynchronous GitHub REST client with one shared connection pool.
+
+    All requests go through one ``aiohttp`` session whose connector keeps up
+    to ``concurrency`` keep-alive connections, and a semaphore bounds the
+    number of requests in flight. Each request uses the token with the most
+    remaining budget in the ``RateLimitScheduler``; rate limited requests
+    wait without blocking the event loop.
+    """
+
+    def __init__(
+        self,
+        tokens: List[str],
+        api_url: str = DEFAULT_API_URL,
+        concurrency: int = 100,
+        per_page: int = 100,
+        timeout: int = 10,
+        retry: int = 5,
+        scheduler: Optional[RateLimitScheduler] = None,
+        cache: Optional[ResponseCache] = None,
+        telemetry: Optional[FetchTelemetry] = None,
+    ) -> None:
+        """Initialization of the AsyncGithubClient class.
+
+        Args:
+            tokens (List[str]): GitHub access tokens.
+            api_url (str, optional): Base URL of the GitHub API. Defaults to DEFAULT_API_URL.
+            concurrency (int, optional): Maximum number of requests in flight. Defaults to 100.
+            per_page (int, optional): Items per page of paginated lists. Defaults to 100.
+            timeout (int, optional): Request timeout in seconds. Defaults to 10.
+            retry (int, optional): Retries of a request after a connection error.
+                                   Defaults to 5.
+            scheduler (Optional[RateLimitScheduler], optional): Rate-limit scheduler.
+                                                                Defaults to a new one.
+            cache (Optional[ResponseCache], optional): Cache for conditional GET requests.
+                                                       Defaults to None.
+            telemetry (Optional[FetchTelemetry], optional): Counters of the requests
+                                                            and waits. Defaults to None.
+        """
+        self.tokens = list(tokens) or [None]
+        self.api_url = api_url.rstrip("/")
+        self.concurrency = max(1, concurrency)
+        self.per_page = per_page
+        self.timeout = timeout
+        self.retry = retry
+        self.scheduler = scheduler if scheduler is not None else RateLimitScheduler()
+        self.cache = cache
+        self.telemetry = telemetry
+        self._turn = 0
+        self._users: Dict[str, asyncio.Future] = {}
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    async def __aenter__(self) -> "AsyncGithubClient":
+        self._session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=self.concurrency),
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+            headers={"Accept": "application/vnd.github.v3+json"},
+        )
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback) -> None:
+        await self._session.close()
+        self._session = None
+        self._users.clear()
+
+    def next_token(self) -> Optional[str]:
+        """Returns the token with the most remaining requests (round robin on ties)."""
+        self._turn = (self._turn + 1) % len(self.tokens)
+        tokens = self.tokens[self._turn :] + self.tokens[: self._turn]
+        return max(tokens, key=lambda token: self.scheduler.remaining(token_key(token)))
+
+    async def send(
+        self, url: str, headers: Dict[str, str], key: str
+    ) -> Tuple[int, Dict[str, str], str]:
+        """Sends a GET request, waiting for the rate limit and retrying on errors.
+
+        Args:
+            url (str): Requested URL.
+            headers (Dict[str, str]): Request headers.
+            key (str): Identifier of the token used.
+
+        Raises:
+            aiohttp.ClientError: If the request still fails after ``retry`` retries.
+
+        Returns:
+            Tuple[int, Dict[str, str], str]: Status, headers (lower case names) and body.
+        """
+        resource = resource_of(url)
+        attempt = 0
+        while True:
+            wait = self.scheduler.reserve(key, resource)
+            if wait > 0:
+                print(
+                    f"Waiting for {math.ceil(wait / 60)} minutes to refresh request limit..."
+                )
+                logging.info(
+                    f"{resource} rate limit reached, waiting {wait:.0f}s until reset"
+                )
+                self.scheduler.count_wait(wait)
+                if self.telemetry is not None:
+                    self.telemetry.record_wait(url, wait)
+                await asyncio.sleep(wait)
+                continue
+            try:
+                async with self._semaphore:
+                    start = time.perf_counter()
+                    async with self._session.get(url, headers=headers) as response:
+                        status = response.status
+                        response_headers = {
+                            k.lower(): v for k, v in response.headers.items()
+                        }
+                        body = await response.text()
+                        size = response.content_length
+                    if self.telemetry is not None:
+                        self.telemetry.record_request(
+                            url,
+                            status,
+                            time.perf_counter() - start,
+                            len(body.encode()) if size is None else size,
+                        )
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                if attempt >= self.retry:
+                    raise
+                attempt += 1
+                logging.info(f"Request to {url} failed ({e!r}), retry {attempt}")
+                await asyncio.sleep(2**attempt)
+                continue
+
+            wait = self.scheduler.retry_after(
+                key, resource, status, response_headers, body, attempt
+            )
+            if wait is None:
+                return status, response_headers, body
+            logging.info(f"Rate limited on {url}, retrying in {wait:.0f}s")
+            self.scheduler.count_wait(wait)
+            if self.telemetry is not None:
+                self.telemetry.record_wait(url, wait)
+            await asyncio.sleep(wait)
+            attempt += 1
+
+    async def get(
+        self,
+        path: str,
+        params: Optional[Dict[str, Any]] = None,
+        accept: Optional[str] = None,
+    ) -> Tuple[Any, Dict[str, str]]:
+        """Requests a resource of the REST API.
+
+        Args:
+            path (str): Path of the resource, e.g. "/repos/owner/name".
+            params (Optional[Dict[str, Any]], optional): Query parameters. Defaults to None.
+            accept (Optional[str], optional): Media type of the response. Defaults to None.
+
+        Raises:
+            GithubException: If GitHub answers with an error status.
+
+        Returns:
+            Tuple[Any, Dict[str, str]]: Decoded JSON body and response headers.
+        """
+        url = f"{self.api_url}{path}"
+        if params:
+            url = f"{url}?{urlencode(params)}"
+        token = self.next_token()
+        headers = {}
+        if token is not None:
+            headers["Authorization"] = f"token {token}"
+        if accept is not None:
+            headers["Accept"] = accept
+
+        entry = cache_key = None
+        if self.cache is not None:
+            cache_key = self.cache.key(f"{url} {accept}", headers.get("Authorization"))
+            entry = await asyncio.to_thread(self.cache.get, cache_key)
+            if entry is not None:
+                if "etag" in entry["headers"]:
+                    headers["If-None-Match"] = entry["headers"]["etag"]
+                if "last-modified" in entry["headers"]:
+                    headers["If-Modified-Since"] = entry["headers"]["last-modified"]
+
+        status, response_headers, body = await self.send(url, headers, token_key(token))
+        if self.cache is not None:
+            if status == 304 and entry is not None:
+                self.cache.count("hits")
+                await asyncio.to_thread(self.cache.touch, cache_key)
+                status, body = 200, entry["body"]
+                response_headers = {**entry["headers"], **response_headers}
+            else:
+                self.cache.count("misses")
+                validated = (
+                    "etag" in response_headers or "last-modified" in response_headers
+                )
+                if status == 200 and validated:
+                    await asyncio.to_thread(
+                        self.cache.put, cache_key, response_headers, body
+                    )
+
+        data = json.loads(body) if body else None
+        if status >= 400:
+            raise GithubException(status, data, response_headers)
+        return data, response_headers
+
+    async def count(
+        self,
+        path: str,
+        params: Optional[Dict[str, Any]] = None,
+        list_item: Optional[str] = None,
+    ) -> int:
+        """Counts the items of a paginated list with one request, as PyGithub's
+        ``totalCount`` does.
+
+        Args:
+            path (str): Path of the list.
+            params (Optional[Dict[str, Any]], optional): Query parameters. Defaults to None.
+            list_item (Optional[str], optional): Member holding the items if the list
+                                                 is wrapped in an object. Defaults to None.
+
+        Returns:
+            int: Number of items.
+        """
+        data, headers = await self.get(path, {**(params or {}), "per_page": 1})
+        page = last_page(headers.get("link"))
+        if page is not None:
+            return page
+        if isinstance(data, dict):
+            if "total_count" in data:
+                return data["total_count"]
+            data = data[list_item]
+        return len(data or [])
+
+    async def iter_pages(
+        self,
+        path: str,
+        params: Optional[Dict[str, Any]] = None,
+        start_page: int = 0,
+        prefetch: Optional[int] = None,
+        accept: Optional[str] = None,
+    ) -> AsyncIterator[Tuple[int, List[Any]]]:
+        """Yields the pages of a paginated list, requesting them concurrently.
+
+        The ``Link`` header of the first requested page tells the number of
+        pages; up to ``prefetch`` of the following pages are then requested at
+        once and yielded in order.
+
+        Args:
+            path (str): Path of the list.
+            params (Optional[Dict[str, Any]], optional): Query parameters. Defaults to None.
+            start_page (int, optional): First page (zero based) to fetch. Defaults to 0.
+            prefetch (Optional[int], optional): Pages requested ahead of the current one.
+                                                Defaults to ``concurrency``.
+            accept (Optional[str], optional): Media type of the response. Defaults to None.
+
+        Yields:
+            AsyncIterator[Tuple[int, List[Any]]]: Page number (zero based) and the items
+                                                  of the page.
+        """
+        params = {**(params or {}), "per_page": self.per_page}
+        prefetch = self.concurrency if prefetch is None else max(1, prefetch)
+
+        async def fetch(page: int) -> Tuple[List[Any], Optional[int]]:
+            try:
+                data, headers = await self.get(
+                    path, {**params, "page": page + 1}, accept
+                )
+            except GithubException as e:
+                # Pages past GitHub's pagination limit end the list.
+                if e.status == 422:
+                    return [], None
+                raise
+            return data or [], last_page(headers.get("link"))
+
+        items, pages = await fetch(start_page)
+        if items:
+            yield start_page, items
+        if pages is None or len(items) < self.per_page:
+            return
+
+        next_page = start_page + 1
+        pending = deque()
+        try:
+            while True:
+                while len(pending) < prefetch and next_page < pages:
+                    pending.append((next_page, asyncio.ensure_future(fetch(next_page))))
+                    next_page += 1
+                if not pending:
+                    return
+                page, task = pending.popleft()
+                items, _ = await task
+                if items:
+                    yield page, items
+                if len(items) < self.per_page:
+                    return
+        finally:
+            for _, task in pending:
+                task.cancel()
+
+    async def user_created_at(self, login: str) -> Optional[datetime]:
+        """Returns the account creation date of a user, requesting each user once.
+
+        Args:
+            login (str): User name.
+
+        Returns:
+            Optional[datetime]: Creation date of the account.
+        """
+        if login not in self._users:
+            self._users[login] = asyncio.ensure_future(self.get(f"/users/{login}"))
+        user, _ = await self._users[login]
+        return parse_datetime(user["created_at"])
+
+
+class AsyncRepoDataFetcher:
+    """Fetches repository data on a single asyncio event loop.
+
+    Runs alongside a ``RepoDataFetcher``, whose directories, sync mode,
+    checkpoints and writers it uses, and writes the same data files. The REST
+    API is requested through an ``AsyncGithubClient``, so that hundreds of
+    requests of several repositories and feature files are in flight at once.
+    The histories are always fetched from the REST API, whatever the backend
+    of the ``RepoDataFetcher``.
+    """
+
+    def __init__(self, fetcher: RepoDataFetcher, concurrency: int = 100) -> None:
+        """Initialization of the AsyncRepoDataFetcher class.
+
+        Args:
+            fetcher (RepoDataFetcher): Fetcher providing the files, settings and tokens.
+            concurrency (int, optional): Maximum number of requests in flight.
+                                         Defaults to 100.
+        """
+        self.fetcher = fetcher
+        pool = fetcher.client_pool
+        self.client = AsyncGithubClient(
+            pool.tokens,
+            api_url=pool.api_url,
+            concurrency=concurrency,
+            per_page=pool.per_page,
+            timeout=pool.timeout,
+            scheduler=pool.scheduler,
+            cache=pool.cache,
+            telemetry=fetcher.telemetry,
+        )
+
+    def file_to_fetch(self, repo_name: str, repo_file: str) -> Optional[Path]:
+        """Returns the data file to fetch, or None if it is skipped.
+
+        Args:
+            repo_name (str): Repository's full name.
+            repo_file (str): Repository data file (e.g commits, forks).
+
+        Returns:
+            Optional[Path]: Path of the data file.
+        """
+        file_exist, file_to_save = self.fetcher.check_file(repo_name, repo_file)
+        if file_exist and self.fetcher.sync_mode == "skip":
+            print(f"{repo_name} {file_to_save.stem} file already exists")
+            logging.info(f"{repo_name} {file_to_save.stem} file already exists")
+            return None
+        return file_to_save
+
+    async def sync_since(
+        self, file_to_save: Path, date_column: str, key: Optional[str] = None
+    ) -> Optional[pd.Timestamp]:
+        """Returns the date from which an incremental sync fetches new items."""
+        return await asyncio.to_thread(
+            self.fetcher.get_sync_since,
+            file_to_save.exists(),
+            file_to_save,
+            date_column,
+            key,
+        )
+
+    async def write_pages(
+        self,
+        file_to_save: Path,
+        columns: List[str],
+        fetch_pages: Callable[
+            [Optional[int]], AsyncIterator[Tuple[int, List[Dict[str, Any]]]]
+        ],
+        since: Optional[pd.Timestamp] = None,
+        key: Optional[str] = None,
+    ) -> None:
+        """Writes the pages of a history to its data file with checkpoints.
+
+        Same as ``RepoDataFetcher.write_pages``, so that a fetch interrupted in
+        one engine can be resumed by the other. The file I/O runs in worker
+        threads, so that it does not block the requests of the event loop.
+
+        Args:
+            file_to_save (Path): Path of the repository data file.
+            columns (List[str]): Column names of the file.
+            fetch_pages (Callable[[Optional[int]], AsyncIterator[Tuple[int, List[Dict[str, Any]]]]]):
+                Called with the page to resume from; yields the next page
+                number and the records of each page.
+            since (Optional[pd.Timestamp], optional): Date of an incremental sync.
+                                                      Defaults to None.
+            key (Optional[str], optional): Column identifying a row. Defaults to None.
+        """
+        checkpoint_pages = self.fetcher.checkpoint_pages
+        checkpoint = FetchCheckpoint(file_to_save)
+        writer = self.fetcher.open_writer(file_to_save, columns, since, key)
+        state = await asyncio.to_thread(checkpoint.load)
+        start = None
+        if state is not None and await asyncio.to_thread(
+            writer.resume, state["records"]
+        ):
+            start = state["position"]
+            print(f"{file_to_save.stem}: resuming after {state['records']} records")
+            logging.info(
+                f"{file_to_save.stem}: resuming after {state['records']} records"
+            )
+
+        with self.fetcher.telemetry.fetching(file_to_save):
+            index = 0
+            try:
+                async for position, records in fetch_pages(start):
+                    index += 1
+                    await asyncio.to_thread(writer.write_many, records)
+                    self.fetcher.telemetry.record_page(file_to_save, len(records))
+                    if checkpoint_pages and index % checkpoint_pages == 0:
+                        await asyncio.to_thread(writer.flush)
+                        await asyncio.to_thread(checkpoint.save, position, writer.count)
+            except BaseException:
+                # Keep what has been fetched so far in the .part file, as
+                # leaving the writer's context does.
+                writer.flush()
+                raise
+            await asyncio.to_thread(writer.close)
+        await asyncio.to_thread(checkpoint.clear)
+        catalog.record_file(file_to_save)
+
+    async def get_repo_info(self, repo_name: str) -> None:
+        """Retrieve general information about the repository and saves it in
+            the respective csv file under the repository Folder.
+
+        Args:
+            repo_name (str): Repository's full name.
+        """
+        file_to_save = self.file_to_fetch(repo_name, "repo_data")
+        if file_to_save is None:
+            return
+
+        path = f"/repos/{repo_name}"
+        with self.fetcher.telemetry.fetching(file_to_save):
+            repo, _ = await self.client.get(path)
+            counts = await asyncio.gather(
+                self.client.count(f"{path}/branches"),
+                self.client.count(f"{path}/milestones", {"state": "all"}),
+                self.client.count(f"{path}/pulls", {"state": "all"}),
+                self.client.count(f"{path}/releases"),
+                self.client.count(f"{path}/actions/workflows", list_item="workflows"),
+                self.client.count(f"{path}/issues", {"state": "all"}),
+            )
+        branches, milestones, pulls, releases, workflows, issues = counts
+        df_repo = pd.DataFrame(
+            [
+                {
+                    "repo_name": repo_name,
+                    "discription": repo["description"],
+                    "language": repo["language"],
+                    "user_Name": repo["url"].split("/")[-2],
+                    "created_at": pd.to_datetime(parse_datetime(repo["created_at"])),
+                    "pushed_at": pd.to_datetime(parse_datetime(repo["pushed_at"])),
+                    "last_update_at": pd.to_datetime(
+                        parse_datetime(repo["updated_at"])
+                    ),
+                    "stars": repo["stargazers_count"],
+                    "size": repo["size"],
+                    "repo_url": repo["url"],
+                    "repo_html_url": repo["html_url"],
+                    "branch_count": branches,
+                    "milestone_count": milestones,
+                    "pullrequest_count": pulls,
+                    "release_count": releases,
+                    "workflow_count": workflows,
+                    "issues_count": issues,
+                    "watchers_count": repo["watchers_count"],
+                    "subscribers_count": repo["subscribers_count"],
+                    "has_wiki": bool(repo["has_wiki"]),
+                    "has_pages": bool(repo["has_pages"]),
+                    "has_projects": bool(repo["has_projects"]),
+                    "has_downloads": bool(repo["has_downloads"]),
+                }
+            ]
+        )
+        await asyncio.to_thread(storage.write_table, df_repo, file_to_save)
+        self.fetcher.telemetry.record_page(file_to_save, len(df_repo))
+        catalog.record_file(file_to_save)
+        print(f"{repo_name}: Repository Data file is created")
+        logging.info(f"{repo_name}: Repository Data file is created")
+
+    async def iter_commits_pages(
+        self,
+        repo_name: str,
+        since: Optional[pd.Timestamp] = None,
+        start: Optional[int] = None,
+    ) -> AsyncIterator[Tuple[int, List[Dict[str, Any]]]]:
+        """Yields pages of commit records (see ``RepoDataFetcher.iter_commits_pages``)."""
+        path = f"/repos/{repo_name}/commits"
+        commit_count = await self.client.count(path)
+        params = (
+            {} if since is None else {"since": since.strftime("%Y-%m-%dT%H:%M:%SZ")}
+        )
+        async for page, commits in self.client.iter_pages(path, params, start or 0):
+            records = []
+            for commit in commits:
+                commit_date = parse_datetime(commit["commit"]["committer"]["date"])
+                if since is not None and utc_timestamp(commit_date) <= since:
+                    continue
+                records.append(
+                    {
+                        "repo_name": repo_name,
+                        "commit_count": commit_count,
+                        "commit_sha": f'Commit(sha="{commit["sha"]}")',
+                        "commit_date": commit_date,
+                    }
+                )
+            yield page + 1, records
+
+    async def get_commits_his(self, repo_name: str) -> None:
+        """Retrieve repository commits history and saves it in a corresponding
+         commits CSV file under the repository folder.
+
+        Args:
+            repo_name (str): Repository's full name.
+        """
+        file_to_save = self.file_to_fetch(repo_name, "commits")
+        if file_to_save is None:
+            return
+        since = await self.sync_since(file_to_save, "commit_date")
+        columns = ["repo_name", "commit_count", "commit_sha", "commit_date"]
+        await self.write_pages(
+            file_to_save,
+            columns,
+            lambda start: self.iter_commits_pages(repo_name, since, start),
+            since,
+        )
+        print(f"{repo_name}: commits file is created")
+        logging.info(f"{repo_name}: commits file is created")
+
+    async def iter_issues_pulls_pages(
+        self,
+        repo_name: str,
+        since: Optional[pd.Timestamp] = None,
+        start: Optional[int] = None,
+    ) -> AsyncIterator[Tuple[int, List[Dict[str, Any]]]]:
+        """Yields pages of issue and pull request records
+        (see ``RepoDataFetcher.iter_issues_pulls_pages``)."""
+        params = {"state": "all"}
+        if since is not None:
+            params["since"] = since.strftime("%Y-%m-%dT%H:%M:%SZ")
+        async for page, repo_issues in self.client.iter_pages(
+            f"/repos/{repo_name}/issues", params, start or 0
+        ):
+            yield page + 1, [
+                {
+                    "repo_name": repo_name,
+                    "issue_pull": (
+                        "pull request"
+                        if repo_issue.get("pull_request") is not None
+                        else "Issue"
+                    ),
+                    "pr_iss_number": repo_issue["number"],
+                    "pr_iss_state": repo_issue["state"],
+                    "pr_iss_opened_at": parse_datetime(repo_issue["created_at"]),
+                    "pr_iss_updated_at": parse_datetime(repo_issue["updated_at"]),
+                    "pr_iss_closed_at": parse_datetime(repo_issue["closed_at"]),
+                }
+                for repo_issue in repo_issues
+            ]
+
+    async def get_issues_and_pull_his(self, repo_name: str) -> None:
+        """Retrieve repository pull requests and issues history and saves it in a
+         corresponding issues_pulls CSV file under the repository folder.
+
+        Args:
+            repo_name (str): Repository's full name.
+        """
+        file_to_save = self.file_to_fetch(repo_name, "issues_pulls")
+        if file_to_save is None:
+            return
+        since = await self.sync_since(
+            file_to_save, "pr_iss_updated_at", key="pr_iss_number"
+        )
+        columns = [
+            "repo_name",
+            "issue_pull",
+            "pr_iss_number",
+            "pr_iss_state",
+            "pr_iss_opened_at",
+            "pr_iss_updated_at",
+            "pr_iss_closed_at",
+        ]
+        await self.write_pages(
+            file_to_save,
+            columns,
+            lambda start: self.iter_issues_pulls_pages(repo_name, since, start),
+            since,
+            key="pr_iss_number",
+        )
+        print(f"{repo_name}: Issues and pull requests file is created")
+        logging.info(f"{repo_name}: Issues and pull requests file is created")
+
+    async def iter_forks_pages(
+        self,
+        repo_name: str,
+        since: Optional[pd.Timestamp] = None,
+        start: Optional[int] = None,
+    ) -> AsyncIterator[Tuple[int, List[Dict[str, Any]]]]:
+        """Yields pages of fork records (see ``RepoDataFetcher.iter_forks_pages``).
+
+        With ``since`` the pages are requested one after another, as the
+        listing stops at the first fork that is already stored.
+        """
+        path = f"/repos/{repo_name}/forks"
+        fork_count = await self.client.count(path)
+        pages = self.client.iter_pages(
+            path, start_page=start or 0, prefetch=None if since is None else 1
+        )
+        try:
+            async for page, forks in pages:
+                newer = [
+                    fork
+                    for fork in forks
+                    if since is None
+                    or utc_timestamp(parse_datetime(fork["created_at"])) > since
+                ]
+                yield page + 1, [
+                    {
+                        "repo_name": repo_name,
+                        "fork_count": fork_count,
+                        "forked_user": fork["full_name"],
+                        "forked_at": parse_datetime(fork["created_at"]),
+                    }
+                    for fork in newer
+                ]
+                if len(newer) < len(forks):
+                    return
+        finally:
+            await pages.aclose()
+
+    async def get_forks_his(self, repo_name: str) -> None:
+        """Retrieve repository forks history and saves it in a corresponding
+            forks CSV file under the repository folder.
+
+        Args:
+            repo_name (str): Repository's full name.
+        """
+        file_to_save = self.file_to_fetch(repo_name, "forks")
+        if file_to_save is None:
+            return
+        since = await self.sync_since(file_to_save, "forked_at")
+        columns = ["repo_name", "fork_count", "forked_user", "forked_at"]
+        await self.write_pages(
+            file_to_save,
+            columns,
+            lambda start: self.iter_forks_pages(repo_name, since, start),
+            since,
+        )
+        print(f"{repo_name}: forks file is created")
+        logging.info(f"{repo_name}: forks file is created")
+
+    async def iter_users_pages(
+        self,
+        repo_name: str,
+        path: str,
+        start: Optional[int] = None,
+    ) -> AsyncIterator[Tuple[int, List[Tuple[str, Optional[datetime]]]]]:
+        """Yields pages of user names together with their account creation dates,
+        which are requested concurrently.
+
+        Args:
+            repo_name (str): Repository's full name.
+            path (str): Path of the user list below the repository.
+            start (Optional[int], optional): Page to resume from. Defaults to None.
+
+        Yields:
+            AsyncIterator[Tuple[int, List[Tuple[str, Optional[datetime]]]]]: Next page
+                number and the users of a page.
+        """
+        async for page, users in self.client.iter_pages(
+            f"/repos/{repo_name}/{path}", start_page=start or 0
+        ):
+            logins = [user["login"] for user in users]
+            created = await asyncio.gather(
+                *(self.client.user_created_at(login) for login in logins)
+            )
+            yield page + 1, list(zip(logins, created))
+
+    async def get_watchers_his(self, repo_name: str) -> None:
+        """Retrieve repository Watchers history and saves it in a corresponding
+            watchers CSV file under the repository folder.
+
+        Args:
+            repo_name (str): Repository's full name.
+        """
+        file_to_save = self.file_to_fetch(repo_name, "watchers")
+        if file_to_save is None:
+            return
+        repo, _ = await self.client.get(f"/repos/{repo_name}")
+
+        async def fetch_pages(start: Optional[int]):
+            async for page, users in self.iter_users_pages(
+                repo_name, "subscribers", start
+            ):
+                yield page, [
+                    {
+                        "repo_name": repo_name,
+                        "watchers_count": repo["watchers_count"],
+                        "subscribers_count": repo["subscribers_count"],
+                        "subscriber": f'NamedUser(login="{login}")',
+                        "subscriber_username": login,
+                        "subscribed_at": created_at,
+                    }
+                    for login, created_at in users
+                ]
+
+        columns = [
+            "repo_name",
+            "watchers_count",
+            "subscribers_count",
+            "subscriber",
+            "subscriber_username",
+            "subscribed_at",
+        ]
+        await self.write_pages(file_to_save, columns, fetch_pages)
+        print(f"{repo_name} : watchers/subscriber file is created")
+        logging.info(f"{repo_name} : watchers/subscriber file is created")
+
+    async def get_contributors_his(self, repo_name: str) -> None:
+        """Retrieve repository Contributors history and saves it in a corresponding
+            Contributors CSV file under the repository folder.
+
+        Args:
+            repo_name (str): Repository's full name.
+        """
+        file_to_save = self.file_to_fetch(repo_name, "Contributors")
+        if file_to_save is None:
+            return
+        path = f"/repos/{repo_name}/contributors"
+        all_contributos, contributers_count = await asyncio.gather(
+            self.client.count(path, {"anon": "true"}), self.client.count(path)
+        )
+        print(
+            f"Github provides only data of the {contributers_count} / {all_contributos} Contributors"
+        )
+        logging.info(
+            f"Github provides only data of the {contributers_count} / {all_contributos} Contributors"
+        )
+
+        async def fetch_pages(start: Optional[int]):
+            async for page, users in self.iter_users_pages(
+                repo_name, "contributors", start
+            ):
+                yield page, [
+                    {
+                        "repo_name": repo_name,
+                        "contributors_count": contributers_count,
+                        "contributor": login,
+                        "contributed_date": created_at,
+                    }
+                    for login, created_at in users
+                ]
+
+        columns = ["repo_name", "contributors_count", "contributor", "contributed_date"]
+        await self.write_pages(file_to_save, columns, fetch_pages)
+        print(f"{repo_name}:  Contributors file is created")
+        logging.info(f"{repo_name}:  Contributors file is created")
+
+    async def iter_stargazer_pages(
+        self,
+        repo_name: str,
+        since: Optional[pd.Timestamp] = None,
+        stored: int = 0,
+        start: Optional[int] = None,
+    ) -> AsyncIterator[Tuple[int, List[Dict[str, Any]]]]:
+        """Yields pages of stargazer records (see ``RepoDataFetcher.iter_stargazer_pages``)."""
+        repo, _ = await self.client.get(f"/repos/{repo_name}")
+        if start is None and since is not None:
+            start = max(0, stored // self.client.per_page - 1)
+        num_stars_returned = 0
+        async for page, stars in self.client.iter_pages(
+            f"/repos/{repo_name}/stargazers",
+            start_page=start or 0,
+            accept=STAR_MEDIA_TYPE,
+        ):
+            num_stars_returned += len(stars)
+            records = []
+            for star in stars:
+                starred_at = parse_datetime(star["starred_at"])
+                if since is None or utc_timestamp(starred_at) > since:
+                    records.append(
+                        {
+                            "repo_name": repo_name,
+                            "starred_user": f'NamedUser(login="{star["user"]["login"]}")',
+                            "starred_at": starred_at,
+                        }
+                    )
+            yield page + 1, records
+
+        if (
+            since is None
+            and not start
+            and num_stars_returned < repo["stargazers_count"]
+        ):
+            print(f"Because stars are more than {num_stars_returned}")
+            print(f"Only the first {num_stars_returned} are returned from Github")
+            print("#" * 25)
+
+    async def get_stargazer_his(self, repo_name: str) -> None:
+        """Retrieve repository stargazer history and saves it in a corresponding
+            stargazer CSV file under the repository folder.
+
+        Args:
+            repo_name (str): Repository's full name.
+        """
+        file_to_save = self.file_to_fetch(repo_name, "stargazer")
+        if file_to_save is None:
+            return
+        since = await self.sync_since(file_to_save, "starred_at")
+        stored = (
+            await asyncio.to_thread(storage.count_rows, file_to_save)
+            if since is not None
+            else 0
+        )
+        columns = ["repo_name", "starred_user", "starred_at"]
+        await self.write_pages(
+            file_to_save,
+            columns,
+            lambda start: self.iter_stargazer_pages(repo_name, since, stored, start),
+            since,
+        )
+        print(f"{repo_name}: stargazer file has been created")
+        logging.info(f"{repo_name}: stargazer file is created")
+
+    async def get_repo_data(self, repo_name: str) -> Dict[str, str]:
+        """Gets all repository data, fetching the feature files concurrently.
+
+        Args:
+            repo_name (str): Repository's full name.
+
+        Returns:
+            Dict[str, str]: Status ("ok" or the error message) of each feature fetcher.
+        """
+        self.fetcher.create_repo_dir(repo_name, show_msg=True)
+        fetchers = RepoDataFetcher.FEATURE_FETCHERS
+        results = await asyncio.gather(
+            *(getattr(self, fetcher)(repo_name) for fetcher in fetchers),
+            return_exceptions=True,
+        )
+        status = {}
+        for fetcher, result in zip(fetchers, results):
+            if isinstance(result, Exception):
+                status[fetcher] = f"{type(result).__name__}: {result}"
+                print(f"{repo_name}: {fetcher} failed: {result}")
+                logging.error(f"{repo_name}: {fetcher} failed: {result}")
+            else:
+                status[fetcher] = "ok"
+
+        if all(state == "ok" for state in status.values()):
+            print(f"{repo_name}: Repository data is successfully extracted.")
+            logging.info(f"{repo_name}: Repository data is successfully extracted.")
+        return status
+
+    async def fetch_repos(
+        self, repo_names: List[str], workers: int = 1
+    ) -> Dict[str, Dict[str, str]]:
+        """Fetches several repositories on the event loop.
+
+        Args:
+            repo_names (List[str]): Full names of the repositories to fetch.
+            workers (int, optional): Number of repositories fetched at once. Defaults to 1.
+
+        Returns:
+            Dict[str, Dict[str, str]]: Status of each feature fetcher per repository.
+        """
+        self.fetcher.create_repos_dir()
+        semaphore = asyncio.Semaphore(max(1, workers))
+
+        async def fetch(repo_name: str) -> Dict[str, str]:
+            async with semaphore:
+                try:
+                    return await self.get_repo_data(repo_name)
+                finally:
+                    self.fetcher.telemetry.repo_done()
+
+        async with self.client:
+            results = await asyncio.gather(
+                *(fetch(repo_name) for repo_name in repo_names), return_exceptions=True
+            )
+        summary = {}
+        for repo_name, result in zip(repo_names, results):
+            if isinstance(result, Exception):
+                summary[repo_name] = {
+                    "get_repo_data": f"{type(result).__name__}: {result}"
+                }
+                print(f"{repo_name}: failed: {result}")
+                logging.error(f"{repo_name}: failed: {result}")
+            else:
+                summary[repo_name] = result
+        return summary
@@ -0,0 +1,90 @@
+import json
+import resource
+import subprocess
+import sys
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import storage
+
+
+def peak_rss_mb() -> float:
+    """Returns the peak resident memory of the current process, or of its
+    largest finished child process (e.g. a pool worker), in MiB."""
+    peak = max(
+        resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss,
+    )
+    # Linux reports kilobytes, macOS bytes.
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def count_records(data_dir: Path) -> int:
+    """Counts the records of all data files below a directory.
+
+    Args:
+        data_dir (Path): Directory of fetched repositories.
+
+    Returns:
+        int: Number of records.
+    """
+    return sum(
+        storage.count_rows(path)
+        for path in Path(data_dir).rglob("*")
+        if path.suffix in storage.FORMATS.values()
+    )
+
+
+def data_size_mb(data_dir: Path) -> float:
+    """Returns the size of all data files below a directory in MiB."""
+    size = sum(
+        path.stat().st_size
+        for path in Path(data_dir).rglob("*")
+        if path.suffix in storage.FORMATS.values()
+    )
+    return size / (1024 * 1024)
+
+
+def git_revision() -> Optional[str]:
+    """Returns the git revision of the code being benchmarked, if available."""
+    try:
+        revision = subprocess.run(
+            ["git", "describe", "--always", "--dirty"],
+            cwd=Path(__file__).parent,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return revision.stdout.strip() or None
+
+
+def save_results(results_dir: Path, name: str, report: Dict[str, Any]) -> Path:
+    """Saves a benchmark report as JSON file.
+
+    The file is named after the benchmark and the time of the run, so the
+    results of different versions can be compared.
+
+    Args:
+        results_dir (Path): Directory of the benchmark results.
+        name (str): Name of the benchmark, e.g. "fetch".
+        report (Dict[str, Any]): Settings and results of the run.
+
+    Returns:
+        Path: Path of the results file.
+    """
+    results_dir = Path(results_dir)
+    results_dir.mkdir(parents=True, exist_ok=True)
+    timestamp = datetime.now()
+    results_file = results_dir / f"{name}-{timestamp:%Y%m%d-%H%M%S}.json"
+    report = {
+        "benchmark": name,
+        "created_at": timestamp.isoformat(timespec="seconds"),
+        "revision": git_revision(),
+        **report,
+    }
+    with open(results_file, "w") as f:
+        json.dump(report, f, indent=2)
+    return results_file
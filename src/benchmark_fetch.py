@@ -0,0 +1,172 @@
+import contextlib
+import multiprocessing
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List
+
+import hydra
+import pandas as pd
+from hydra.core.config_store import ConfigStore
+from omegaconf import OmegaConf
+
+from benchmark import count_records, peak_rss_mb, save_results
+from config import ReposConfig
+from fetch_repo_data import RepoDataFetcher, run_fetch
+from mock_github import MockGithubServer, replayed_repos, synthetic_repos
+
+cs = ConfigStore.instance()
+cs.store(name="repo_config", node=ReposConfig)
+
+SCENARIOS = ("get_repo_data", "main")
+BENCHMARK_TOKEN = "benchmark-token"
+
+
+def run_scenario(
+    scenario: str, cfg_dict: Dict[str, Any], repo_names: List[str]
+) -> Dict[str, Any]:
+    """Runs one benchmark scenario (in a fresh worker process).
+
+    Args:
+        scenario (str): "get_repo_data" fetches the repositories one after
+                        another, "main" runs the fetch as configured.
+        cfg_dict (Dict[str, Any]): Resolved configuration of the run.
+        repo_names (List[str]): Full names of the repositories to fetch.
+
+    Returns:
+        Dict[str, Any]: Wall time, peak memory and failed feature fetchers.
+    """
+    cfg = OmegaConf.create(cfg_dict)
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        start = time.perf_counter()
+        if scenario == "get_repo_data":
+            fetcher = RepoDataFetcher(
+                repo_names,
+                Path(cfg.paths.raw_data),
+                feature_workers=cfg.fetch.feature_workers,
+                tokens=[BENCHMARK_TOKEN],
+                api_url=cfg.fetch.api_url,
+                pool_size=cfg.fetch.pool_size,
+                batch_size=cfg.fetch.batch_size,
+                prefetch_pages=cfg.fetch.prefetch_pages,
+                checkpoint_pages=cfg.fetch.checkpoint_pages,
+                min_remaining=cfg.fetch.min_remaining,
+                file_format=cfg.storage.format,
+            )
+            fetcher.create_repos_dir()
+            summary = {name: fetcher.get_repo_data(name) for name in repo_names}
+            fetcher.client_pool.close()
+        else:
+            summary = run_fetch(cfg, tokens=[BENCHMARK_TOKEN])
+        wall_seconds = time.perf_counter() - start
+
+    failed = [
+        f"{repo_name} {fetcher}: {state}"
+        for repo_name, status in summary.items()
+        for fetcher, state in status.items()
+        if state != "ok"
+    ]
+    return {
+        "wall_seconds": wall_seconds,
+        "peak_rss_mb": peak_rss_mb(),
+        "failed": failed,
+    }
+
+
+def print_results(results: List[Dict[str, Any]]) -> None:
+    """Prints the benchmark results as a table."""
+    print("#" * 25)
+    print(
+        f"{'scenario':<15}{'wall s':>10}{'requests':>10}{'req/s':>10}"
+        f"{'records':>10}{'rec/s':>12}{'peak MiB':>10}"
+    )
+    for result in results:
+        print(
+            f"{result['scenario']:<15}{result['wall_seconds']:>10.2f}"
+            f"{result['requests']:>10}{result['requests_per_second']:>10.1f}"
+            f"{result['records']:>10}{result['records_per_second']:>12.1f}"
+            f"{result['peak_rss_mb']:>10.1f}"
+        )
+        for failure in result["failed"]:
+            print(f"  failed: {failure}")
+    print("#" * 25)
+
+
+@hydra.main(config_path="conf", config_name="config", version_base=None)
+def main(cfg: ReposConfig):
+    bench = cfg.benchmark.fetch
+    unknown = set(bench.scenarios) - set(SCENARIOS)
+    if unknown:
+        raise ValueError(f"Unknown scenarios: {sorted(unknown)}, use {list(SCENARIOS)}")
+
+    if bench.replay_dir:
+        repos = replayed_repos(Path(bench.replay_dir))
+    else:
+        repos = synthetic_repos(
+            bench.repos,
+            bench.commits,
+            bench.stars,
+            bench.forks,
+            bench.issues,
+            bench.watchers,
+            bench.contributors,
+        )
+    repo_names = [repo.full_name for repo in repos]
+    server = MockGithubServer(
+        repos, latency=bench.latency, rate_limit=bench.rate_limit, port=bench.port
+    )
+
+    results = []
+    # A fresh process per scenario gives a clean peak memory measurement.
+    spawn = multiprocessing.get_context("spawn")
+    with server, tempfile.TemporaryDirectory() as tmp_dir:
+        repos_file = Path(tmp_dir, "repos.csv")
+        pd.DataFrame({"repo_name": repo_names}).to_csv(repos_file, index=False)
+        for scenario in bench.scenarios:
+            raw_dir = Path(tmp_dir, scenario)
+            raw_dir.mkdir()
+            run_cfg = OmegaConf.to_container(cfg, resolve=True)
+            run_cfg["paths"]["raw_data"] = str(raw_dir)
+            run_cfg["repos"]["repos_dir"] = str(repos_file)
+            # The mock serves the REST API only; the HTTP cache would hide requests.
+            run_cfg["fetch"].update(
+                api_url=server.url, cache_dir="", backend="rest", sync_mode="skip"
+            )
+
+            print(f"Running {scenario} on {len(repos)} repositories ...")
+            requests_before = server.stats["requests"]
+            with ProcessPoolExecutor(max_workers=1, mp_context=spawn) as pool:
+                measured = pool.submit(
+                    run_scenario, scenario, run_cfg, repo_names
+                ).result()
+            requests = server.stats["requests"] - requests_before
+            records = count_records(raw_dir)
+            wall_seconds = measured["wall_seconds"]
+            results.append(
+                {
+                    "scenario": scenario,
+                    "requests": requests,
+                    "requests_per_second": requests / wall_seconds,
+                    "records": records,
+                    "records_per_second": records / wall_seconds,
+                    **measured,
+                }
+            )
+
+    print_results(results)
+    report = {
+        "settings": {
+            "benchmark": OmegaConf.to_container(bench, resolve=True),
+            "fetch": OmegaConf.to_container(cfg.fetch, resolve=True),
+            "storage": OmegaConf.to_container(cfg.storage, resolve=True),
+        },
+        "results": results,
+    }
+    results_file = save_results(Path(cfg.benchmark.results_dir), "fetch", report)
+    print(f"Results are saved in {results_file}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,230 @@
+import contextlib
+import multiprocessing
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List
+
+import hydra
+from hydra.core.config_store import ConfigStore
+from omegaconf import OmegaConf
+
+import catalog
+import utils
+from benchmark import count_records, data_size_mb, peak_rss_mb, save_results
+from config import ReposConfig
+from generate_repo_data import generate_raw_data, synthetic_sizes
+from pipeline import PreprocessPipeline
+from preprocess_repo_data import RowRepoDataProcessor
+
+cs = ConfigStore.instance()
+cs.store(name="repo_config", node=ReposConfig)
+
+# Preprocessing stages in pipeline order.
+STAGES = (
+    "agg_repo_feat",
+    "get_all_feat_data",
+    "agg_repos_generic_data",
+    "gen_repos_age",
+    "set_maintainability_state",
+    # All of the above in one run, as preprocess_repo_data.main does.
+    "pipeline",
+)
+# Stages reading the output of an earlier stage.
+STAGE_REQUIRES = {"get_all_feat_data": "agg_repo_feat"}
+
+
+def check_stages(stages: List[str]) -> None:
+    """Checks that the stages are known and their inputs are produced.
+
+    Args:
+        stages (List[str]): Stages to run, in this order.
+
+    Raises:
+        ValueError: If a stage is unknown or runs before the stage it reads from.
+    """
+    unknown = set(stages) - set(STAGES)
+    if unknown:
+        raise ValueError(f"Unknown stages: {sorted(unknown)}, use {list(STAGES)}")
+    for position, stage in enumerate(stages):
+        required = STAGE_REQUIRES.get(stage)
+        if required is not None and required not in stages[:position]:
+            raise ValueError(
+                f"Stage {stage} reads the output of {required}, run it first"
+            )
+
+
+def call_stage(
+    processor: RowRepoDataProcessor,
+    stage: str,
+    paths: Dict[str, str],
+    periods: List[int],
+) -> Any:
+    """Calls a preprocessing stage as preprocess_repo_data.main does.
+
+    Args:
+        processor (RowRepoDataProcessor): Processor running the stage.
+        stage (str): Name of the stage, e.g. "agg_repo_feat".
+        paths (Dict[str, str]): Raw, processed and final data directories.
+        periods (List[int]): Maintenance periods in weeks.
+
+    Returns:
+        Any: Result of the stage.
+    """
+    if stage == "pipeline":
+        return PreprocessPipeline(
+            processor, paths["raw"], paths["processed"], paths["final"], periods
+        ).run()
+    if stage == "get_all_feat_data":
+        return processor.get_all_feat_data(paths["processed"], paths["final"])
+    if stage == "set_maintainability_state":
+        return processor.set_maintainability_state(
+            paths["raw"], periods, paths["final"]
+        )
+    return getattr(processor, stage)(paths["raw"], paths["processed"])
+
+
+def run_stage(
+    stage: str,
+    paths: Dict[str, str],
+    file_format: str,
+    workers: int,
+    periods: List[int],
+    catalog_settings: Dict[str, Any],
+    rollups: List[str],
+    chunk_rows: int,
+) -> Dict[str, float]:
+    """Runs one preprocessing stage (in a fresh worker process).
+
+    Args:
+        stage (str): Name of the stage, e.g. "agg_repo_feat".
+        paths (Dict[str, str]): Raw, processed and final data directories.
+        file_format (str): Storage format of the processed files.
+        workers (int): Worker processes of the preprocessing.
+        periods (List[int]): Maintenance periods in weeks.
+        catalog_settings (Dict[str, Any]): Settings of the directory catalogs.
+        rollups (List[str]): Coarser frequencies of the file with all features.
+        chunk_rows (int): Rows of the raw feature files read at once, 0 for whole files.
+
+    Returns:
+        Dict[str, float]: Wall time and peak memory of the stage.
+    """
+    catalog.configure(**catalog_settings)
+    processor = RowRepoDataProcessor(
+        file_format, workers, rollups=rollups, chunk_rows=chunk_rows
+    )
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        start = time.perf_counter()
+        call_stage(processor, stage, paths, periods)
+        wall_seconds = time.perf_counter() - start
+    return {"wall_seconds": wall_seconds, "peak_rss_mb": peak_rss_mb()}
+
+
+def print_results(results: List[Dict[str, Any]]) -> None:
+    """Prints the benchmark results as a table."""
+    print("#" * 25)
+    print(f"{'stage':<28}{'wall s':>10}{'rec/s':>14}{'peak MiB':>10}")
+    for result in results:
+        print(
+            f"{result['stage']:<28}{result['wall_seconds']:>10.2f}"
+            f"{result['records_per_second']:>14.1f}{result['peak_rss_mb']:>10.1f}"
+        )
+    print("#" * 25)
+
+
+@hydra.main(config_path="conf", config_name="config", version_base=None)
+def main(cfg: ReposConfig):
+    bench = cfg.benchmark.preprocess
+    synthetic = cfg.synthetic
+    stages = list(bench.stages)
+    check_stages(stages)
+    catalog.configure(cfg.catalog.enabled, cfg.catalog.manifest, cfg.catalog.verify)
+
+    results = []
+    data = {}
+    # A fresh process per run gives a clean peak memory measurement.
+    spawn = multiprocessing.get_context("spawn")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        if bench.data_dir:
+            raw_dir = Path(bench.data_dir)
+        else:
+            raw_dir = Path(tmp_dir, "raw")
+            print(f"Generating {synthetic.repos} synthetic repositories ...")
+            start = time.perf_counter()
+            generate_raw_data(
+                raw_dir,
+                synthetic.repos,
+                synthetic_sizes(cfg),
+                synthetic.sizes,
+                synthetic.inactive,
+                synthetic.start,
+                synthetic.end,
+                synthetic.seed,
+                cfg.storage.format,
+                synthetic.workers,
+            )
+            data["generate_seconds"] = time.perf_counter() - start
+        records = count_records(raw_dir)
+        data.update(
+            repos=len(utils.list_repos_dirs(raw_dir)),
+            records=records,
+            size_mb=data_size_mb(raw_dir),
+        )
+        print(f"Benchmarking {data['repos']} repositories with {records} records ...")
+
+        paths = {"raw": str(raw_dir)}
+        for name in ("processed", "final"):
+            paths[name] = str(Path(tmp_dir, name))
+            Path(paths[name]).mkdir()
+        for stage in stages:
+            print(f"Running {stage} ...")
+            runs = []
+            for _ in range(max(bench.repeat, 1)):
+                with ProcessPoolExecutor(max_workers=1, mp_context=spawn) as pool:
+                    run = pool.submit(
+                        run_stage,
+                        stage,
+                        paths,
+                        cfg.storage.format,
+                        cfg.preprocess.workers,
+                        list(cfg.preprocess.maintenance_periods),
+                        OmegaConf.to_container(cfg.catalog, resolve=True),
+                        list(cfg.preprocess.rollups),
+                        cfg.preprocess.chunk_rows,
+                    )
+                    runs.append(run.result())
+            wall_seconds = min(run["wall_seconds"] for run in runs)
+            results.append(
+                {
+                    "stage": stage,
+                    "wall_seconds": wall_seconds,
+                    "runs_seconds": [run["wall_seconds"] for run in runs],
+                    "records_per_second": records / wall_seconds,
+                    "peak_rss_mb": max(run["peak_rss_mb"] for run in runs),
+                }
+            )
+
+    print_results(results)
+    report = {
+        "settings": {
+            "benchmark": OmegaConf.to_container(bench, resolve=True),
+            "synthetic": (
+                None
+                if bench.data_dir
+                else OmegaConf.to_container(synthetic, resolve=True)
+            ),
+            "storage": OmegaConf.to_container(cfg.storage, resolve=True),
+            "catalog": OmegaConf.to_container(cfg.catalog, resolve=True),
+            "preprocess": OmegaConf.to_container(cfg.preprocess, resolve=True),
+        },
+        "data": data,
+        "results": results,
+    }
+    results_file = save_results(Path(cfg.benchmark.results_dir), "preprocess", report)
+    print(f"Results are saved in {results_file}")
+
+
+if __name__ == "__main__":
+    main()
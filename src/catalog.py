@@ -0,0 +1,371 @@
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Set
+
+import storage
+
+MANIFEST_VERSION = 1
+
+# Settings of the catalogs, see ``configure``.
+SETTINGS = {"enabled": True, "manifest": "catalog.json", "verify": True}
+# Catalogs opened by this process, by their root directory.
+CATALOGS: Dict[str, "Catalog"] = {}
+CATALOGS_LOCK = threading.Lock()
+
+
+def configure(
+    enabled: bool = True, manifest: str = "catalog.json", verify: bool = True
+) -> None:
+    """Sets how the data directories are catalogued.
+
+    Args:
+        enabled (bool, optional): Look up repositories and files in catalogs instead
+                                  of listing the directories. Defaults to True.
+        manifest (str, optional): Name of the manifest file in a data directory.
+                                  Defaults to "catalog.json".
+        verify (bool, optional): Check a loaded manifest against the modification
+                                 times of the repository directories. Defaults to True.
+    """
+    SETTINGS.update(enabled=enabled, manifest=manifest, verify=verify)
+    with CATALOGS_LOCK:
+        CATALOGS.clear()
+
+
+def abspath(path: Path) -> Path:
+    """Returns an absolute path without resolving symlinks (no file system access)."""
+    return Path(os.path.abspath(path))
+
+
+def scan_files(repo_dir: Path) -> Dict[str, List[float]]:
+    """Lists the data files of a repository directory with their size and mtime."""
+    files = {}
+    with os.scandir(repo_dir) as entries:
+        for entry in entries:
+            suffix = os.path.splitext(entry.name)[1]
+            if suffix in storage.FORMATS.values() and entry.is_file():
+                stat = entry.stat()
+                files[entry.name] = [stat.st_size, stat.st_mtime]
+    return files
+
+
+def newest_first(path: Path) -> float:
+    """Sort key putting the most recently modified files first, missing ones last."""
+    try:
+        return -path.stat().st_mtime
+    except FileNotFoundError:
+        return float("inf")
+
+
+class Catalog:
+    """Index of the repository directories below a data directory and their
+    data files (with size and modification time).
+
+    The repositories are found like ``utils.list_repos_dirs`` does: a
+    directory without sub-directories is a repository, otherwise its
+    sub-directories are. The index is stored as a manifest file in the data
+    directory. Loading it only stats the directories, and re-lists those that
+    changed since, instead of listing every repository and stating every file.
+    """
+
+    def __init__(self, root: Path, manifest: str = "catalog.json"):
+        """Empty catalog of a data directory.
+
+        Args:
+            root (Path): Data directory, e.g. the raw data directory.
+            manifest (str, optional): Name of the manifest file. Defaults to "catalog.json".
+        """
+        self.root = abspath(root)
+        self.manifest_path = self.root / manifest
+        self.root_mtime = None
+        # Top level directories and repositories (relative path) with their mtime.
+        self.tops: Dict[str, float] = {}
+        self.repos: Dict[str, Dict] = {}
+        # Repositories of each top level directory.
+        self.top_keys: Dict[str, Set[str]] = {}
+        self.changed = False
+        self.lock = threading.RLock()
+
+    def __repr__(self):
+        return f"Catalog({str(self.root)!r}, {len(self.repos)} repositories)"
+
+    def scan(self) -> None:
+        """Builds the index by listing the data directory."""
+        with self.lock:
+            self.tops, self.repos, self.top_keys = {}, {}, {}
+            self.root_mtime = self.root.stat().st_mtime
+            with os.scandir(self.root) as entries:
+                names = [entry.name for entry in entries if entry.is_dir()]
+            for name in names:
+                self.scan_top(name)
+            self.changed = True
+
+    def scan_top(self, name: str) -> None:
+        """Lists a top level directory and the repositories in it."""
+        top = self.root / name
+        self.tops[name] = top.stat().st_mtime
+        with os.scandir(top) as entries:
+            subdirs = [entry.name for entry in entries if entry.is_dir()]
+        keys = [f"{name}/{subdir}" for subdir in subdirs] or [name]
+        for key in set(self.keys_below(name)).difference(keys):
+            del self.repos[key]
+        self.top_keys[name] = set()
+        for key in keys:
+            self.scan_repo(key)
+        self.changed = True
+
+    def scan_repo(self, key: str) -> None:
+        """Lists the data files of a repository."""
+        repo_dir = self.root / key
+        self.repos[key] = {
+            "mtime": repo_dir.stat().st_mtime,
+            "files": scan_files(repo_dir),
+        }
+        self.top_keys.setdefault(key.split("/")[0], set()).add(key)
+        self.changed = True
+
+    def keys_below(self, name: str) -> List[str]:
+        """Returns the repositories of a top level directory."""
+        return list(self.top_keys.get(name, ()))
+
+    def remove_top(self, name: str) -> None:
+        """Removes a top level directory and its repositories."""
+        for key in self.top_keys.pop(name, ()):
+            del self.repos[key]
+        del self.tops[name]
+        self.changed = True
+
+    def verify(self) -> None:
+        """Re-lists the directories that changed since the index was built.
+
+        Adding, removing or renaming an entry changes the modification time of
+        its directory, so one stat per directory finds new repositories and files.
+        """
+        with self.lock:
+            root_mtime = self.root.stat().st_mtime
+            if root_mtime != self.root_mtime:
+                with os.scandir(self.root) as entries:
+                    names = {entry.name for entry in entries if entry.is_dir()}
+                for name in set(self.tops) - names:
+                    self.remove_top(name)
+                for name in names - set(self.tops):
+                    self.scan_top(name)
+                self.root_mtime = root_mtime
+                self.changed = True
+            for name, mtime in list(self.tops.items()):
+                try:
+                    if (self.root / name).stat().st_mtime != mtime:
+                        self.scan_top(name)
+                        continue
+                    for key in self.keys_below(name):
+                        if key == name:
+                            continue
+                        if (self.root / key).stat().st_mtime != self.repos[key][
+                            "mtime"
+                        ]:
+                            self.scan_repo(key)
+                except FileNotFoundError:
+                    # Removed since the root was listed.
+                    self.remove_top(name)
+
+    def load(self) -> bool:
+        """Loads the index from the manifest file.
+
+        Returns:
+            bool: Whether a manifest of this version was found.
+        """
+        try:
+            with open(self.manifest_path) as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return False
+        if manifest.get("version") != MANIFEST_VERSION:
+            return False
+        with self.lock:
+            self.root_mtime = manifest["root_mtime"]
+            self.tops = manifest["tops"]
+            self.repos = manifest["repos"]
+            self.top_keys = {}
+            for key in self.repos:
+                self.top_keys.setdefault(key.split("/")[0], set()).add(key)
+            self.changed = False
+        return True
+
+    def save(self) -> None:
+        """Writes the index to the manifest file if it changed."""
+        with self.lock:
+            if not self.changed:
+                return
+            manifest = {
+                "version": MANIFEST_VERSION,
+                "root_mtime": self.root_mtime,
+                "tops": self.tops,
+                "repos": self.repos,
+            }
+            # Rewritten in place: creating a file would change the mtime of the
+            # data directory. A torn manifest fails to load and is rebuilt.
+            try:
+                with open(self.manifest_path, "w") as f:
+                    json.dump(manifest, f)
+                self.changed = False
+            except OSError as e:
+                # A read-only data directory is only listed again next time.
+                logging.warning(f"Catalog manifest {self.manifest_path} not saved: {e}")
+
+    def key(self, path: Path) -> Optional[str]:
+        """Returns the relative path of a path below the root, None if outside."""
+        try:
+            return abspath(path).relative_to(self.root).as_posix()
+        except ValueError:
+            return None
+
+    def repo_dirs(self) -> List[Path]:
+        """Returns the repository directories."""
+        return [self.root / key for key in sorted(self.repos)]
+
+    def repo_files(self, repo_dir: Path) -> Optional[Dict[str, Path]]:
+        """Returns the data files of a repository by feature name.
+
+        If a feature is stored in several formats the most recently written
+        file is returned, like ``utils.list_repo_files``. Only these files are
+        stated, as a file rewritten in place keeps its directory's mtime.
+
+        Args:
+            repo_dir (Path): Repository directory.
+
+        Returns:
+            Optional[Dict[str, Path]]: Data files, None if the repository is unknown.
+        """
+        with self.lock:
+            repo = self.repos.get(self.key(repo_dir))
+            if repo is None:
+                return None
+            names = list(repo["files"])
+        repo_path = abspath(repo_dir)
+        stems: Dict[str, List[str]] = {}
+        for name in names:
+            stems.setdefault(os.path.splitext(name)[0], []).append(name)
+        repo_files = {}
+        for stem, stem_names in stems.items():
+            if len(stem_names) > 1:
+                stem_names.sort(key=lambda name: newest_first(repo_path / name))
+            repo_files[stem] = repo_path / stem_names[0]
+        return repo_files
+
+    def has_file(self, path: Path) -> Optional[bool]:
+        """Tells whether a data file exists, None if its repository is unknown."""
+        path = abspath(path)
+        with self.lock:
+            repo = self.repos.get(self.key(path.parent))
+            if repo is None:
+                return None
+            return path.name in repo["files"]
+
+    def record(self, path: Path) -> None:
+        """Adds or updates a data file that has just been written.
+
+        Args:
+            path (Path): Path of the data file.
+        """
+        path = abspath(path)
+        key = self.key(path.parent)
+        if key is None or key in ("", "."):
+            return
+        with self.lock:
+            repo = self.repos.get(key)
+            if repo is None:
+                self.refresh(path.parent)
+                return
+            stat = path.stat()
+            repo["files"][path.name] = [stat.st_size, stat.st_mtime]
+            repo["mtime"] = path.parent.stat().st_mtime
+            if key in self.tops:
+                self.tops[key] = repo["mtime"]
+            self.changed = True
+
+    def refresh(self, repo_dir: Path) -> None:
+        """Lists a repository directory again, e.g. after another process wrote to it.
+
+        Args:
+            repo_dir (Path): Repository directory.
+        """
+        key = self.key(repo_dir)
+        if key is None or key in ("", ".") or not (self.root / key).is_dir():
+            return
+        with self.lock:
+            name = key.split("/")[0]
+            if name not in self.tops or (key != name and name in self.repos):
+                self.scan_top(name)
+            else:
+                self.scan_repo(key)
+                self.tops[name] = (self.root / name).stat().st_mtime
+            self.root_mtime = self.root.stat().st_mtime
+
+
+def open_catalog(root: Path) -> Optional[Catalog]:
+    """Returns the catalog of a data directory, built once per process.
+
+    The manifest of an earlier run is loaded (and verified) if there is one,
+    otherwise the directory is listed.
+
+    Args:
+        root (Path): Data directory.
+
+    Returns:
+        Optional[Catalog]: Catalog, None if catalogs are disabled or the
+                           directory does not exist.
+    """
+    if not SETTINGS["enabled"]:
+        return None
+    root = abspath(root)
+    with CATALOGS_LOCK:
+        catalog = CATALOGS.get(str(root))
+        if catalog is not None:
+            return catalog
+        if not root.is_dir():
+            return None
+        catalog = Catalog(root, SETTINGS["manifest"])
+        if not catalog.load():
+            # Created before the listing, so that saving it leaves the mtime
+            # of the data directory as listed.
+            try:
+                catalog.manifest_path.touch()
+            except OSError:
+                pass
+            catalog.scan()
+        elif SETTINGS["verify"]:
+            catalog.verify()
+        catalog.save()
+        CATALOGS[str(root)] = catalog
+        return catalog
+
+
+def find_catalog(path: Path) -> Optional[Catalog]:
+    """Returns the opened catalog whose data directory contains a path."""
+    path = abspath(path)
+    for catalog in list(CATALOGS.values()):
+        if catalog.root in path.parents:
+            return catalog
+    return None
+
+
+def record_file(path: Path) -> None:
+    """Records a written data file in the opened catalog containing it, if any."""
+    catalog = find_catalog(path)
+    if catalog is not None:
+        catalog.record(path)
+
+
+def refresh_dir(repo_dir: Path) -> None:
+    """Lists a repository directory again in the opened catalog containing it, if any."""
+    catalog = find_catalog(repo_dir)
+    if catalog is not None:
+        catalog.refresh(repo_dir)
+
+
+def save_catalogs() -> None:
+    """Writes the manifests of the opened catalogs that changed."""
+    for catalog in list(CATALOGS.values()):
+        catalog.save()
@@ -0,0 +1,136 @@
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+STATE_VERSION = 1
+# Name of the state file in the processed data directory.
+STATE_FILE = "preprocess_state.json"
+
+
+def file_signature(path: Path) -> Optional[List[int]]:
+    """Returns the size and modification time (ns) of a file, None if it is missing."""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def signatures(paths: List[Path]) -> Dict[str, Optional[List[int]]]:
+    """Returns the signature of each file by its absolute path.
+
+    Args:
+        paths (List[Path]): Input files of a build.
+
+    Returns:
+        Dict[str, Optional[List[int]]]: Size and modification time of each file.
+    """
+    return {os.path.abspath(path): file_signature(path) for path in paths}
+
+
+def build_target(stage: str, source: Path, destination: Path) -> str:
+    """Names the outputs a stage builds from a source, e.g. the processed
+    feature files of one repository.
+
+    Args:
+        stage (str): Preprocessing stage, e.g. "agg_repo_feat".
+        source (Path): Repository or data directory read by the stage.
+        destination (Path): Directory or file written by the stage.
+
+    Returns:
+        str: Name of the build target.
+    """
+    return f"{stage}:{os.path.abspath(source)}:{os.path.abspath(destination)}"
+
+
+class ChangeTracker:
+    """Inputs each preprocessing output was last built from.
+
+    For every build target the size and modification time of its input files
+    are recorded together with the settings it was built with. A target is
+    up to date while its inputs and settings are the same and its outputs
+    exist; otherwise it is rebuilt. Outputs of one stage, e.g. the processed
+    ``all_feature`` files, are the inputs of the next one, so a change is
+    passed down the pipeline.
+    """
+
+    def __init__(self, state_path: Path):
+        """Loads the state of the last run.
+
+        Args:
+            state_path (Path): Path of the state file.
+        """
+        self.state_path = Path(state_path)
+        self.targets: Dict[str, Dict[str, Any]] = {}
+        self.changed = False
+        self.load()
+
+    def __repr__(self):
+        return f"ChangeTracker({str(self.state_path)!r}, {len(self.targets)} targets)"
+
+    def load(self) -> None:
+        """Reads the state file, an unreadable one is ignored (all is rebuilt)."""
+        try:
+            with open(self.state_path) as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return
+        if state.get("version") == STATE_VERSION:
+            self.targets = state["targets"]
+
+    def save(self) -> None:
+        """Writes the state file if it changed, replacing it atomically."""
+        if not self.changed:
+            return
+        tmp_path = self.state_path.with_suffix(".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump({"version": STATE_VERSION, "targets": self.targets}, f)
+        tmp_path.replace(self.state_path)
+        self.changed = False
+
+    def is_current(
+        self,
+        target: str,
+        inputs: Dict[str, Optional[List[int]]],
+        params: Optional[Dict[str, Any]] = None,
+    ) -> bool:
+        """Checks whether a target is up to date.
+
+        Args:
+            target (str): Name of the build target, see ``build_target``.
+            inputs (Dict[str, Optional[List[int]]]): Current signatures of its inputs.
+            params (Optional[Dict[str, Any]], optional): Settings of the build.
+                                                        Defaults to None.
+
+        Returns:
+            bool: True if the outputs were built from the same inputs and settings.
+        """
+        entry = self.targets.get(target)
+        if entry is None or entry["inputs"] != inputs or entry["params"] != params:
+            return False
+        return all(os.path.exists(output) for output in entry["outputs"])
+
+    def update(
+        self,
+        target: str,
+        inputs: Dict[str, Optional[List[int]]],
+        outputs: List[Path],
+        params: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        """Records that a target has been built.
+
+        Args:
+            target (str): Name of the build target.
+            inputs (Dict[str, Optional[List[int]]]): Signatures of its inputs, taken
+                                                     before the build.
+            outputs (List[Path]): Files written by the build.
+            params (Optional[Dict[str, Any]], optional): Settings of the build.
+                                                        Defaults to None.
+        """
+        self.targets[target] = {
+            "inputs": inputs,
+            "outputs": [os.path.abspath(output) for output in outputs],
+            "params": params,
+        }
+        self.changed = True
@@ -0,0 +1,53 @@
+import json
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+
+class FetchCheckpoint:
+    """Pagination position of an unfinished repository data file.
+
+    The checkpoint is stored next to the data file (e.g. ``commits.csv`` has
+    ``commits.csv.checkpoint.json``) and records the position of the next page
+    to fetch (page number or GraphQL cursor) together with the number of
+    records already flushed to the ``.part`` file of the ``RecordWriter``.
+    """
+
+    def __init__(self, file_path: Path) -> None:
+        """Initialization of the FetchCheckpoint class.
+
+        Args:
+            file_path (Path): Path of the repository data file.
+        """
+        self.file_path = Path(file_path)
+        self.checkpoint_path = self.file_path.with_suffix(
+            self.file_path.suffix + ".checkpoint.json"
+        )
+
+    def load(self) -> Optional[Dict[str, Any]]:
+        """Returns the stored checkpoint.
+
+        Returns:
+            Optional[Dict[str, Any]]: ``position`` and ``records`` of the last
+                                      checkpoint, or None if there is none.
+        """
+        try:
+            with open(self.checkpoint_path) as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def save(self, position: Any, records: int) -> None:
+        """Stores a checkpoint, replacing the previous one atomically.
+
+        Args:
+            position (Any): JSON serializable position of the next page.
+            records (int): Number of records flushed to disk.
+        """
+        tmp_path = self.checkpoint_path.with_suffix(".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump({"position": position, "records": records}, f)
+        tmp_path.replace(self.checkpoint_path)
+
+    def clear(self) -> None:
+        """Removes the checkpoint once the data file is complete."""
+        self.checkpoint_path.unlink(missing_ok=True)
@@ -1,4 +1,5 @@
 from dataclasses import dataclass
+from typing import List
 
 
 @dataclass
@@ -38,6 +39,106 @@ class RepoToFetch:
     repo_data: str
 
 
+@dataclass
+class FetchConfig:
+    engine: str
+    concurrency: int
+    executor: str
+    workers: int
+    feature_workers: int
+    api_url: str
+    pool_size: int
+    batch_size: int
+    prefetch_pages: int
+    backend: str
+    sync_mode: str
+    checkpoint_pages: int
+    cache_dir: str
+    cache_max_mb: int
+    cache_max_age_days: int
+    min_remaining: int
+    metrics_dir: str
+    progress_seconds: float
+
+
+@dataclass
+class PreprocessConfig:
+    workers: int
+    maintenance_periods: List[int]
+    incremental: bool
+    rollups: List[str]
+    chunk_rows: int
+
+
+@dataclass
+class ProfilingConfig:
+    enabled: bool
+    report_dir: str
+    top: int
+    cprofile: bool
+    tracemalloc: bool
+
+
+@dataclass
+class StorageConfig:
+    format: str
+
+
+@dataclass
+class CatalogConfig:
+    enabled: bool
+    manifest: str
+    verify: bool
+
+
+@dataclass
+class FetchBenchmarkConfig:
+    scenarios: List[str]
+    repos: int
+    commits: int
+    stars: int
+    forks: int
+    issues: int
+    watchers: int
+    contributors: int
+    latency: float
+    rate_limit: int
+    port: int
+    replay_dir: str
+
+
+@dataclass
+class PreprocessBenchmarkConfig:
+    stages: List[str]
+    repeat: int
+    data_dir: str
+
+
+@dataclass
+class BenchmarkConfig:
+    results_dir: str
+    fetch: FetchBenchmarkConfig
+    preprocess: PreprocessBenchmarkConfig
+
+
+@dataclass
+class SyntheticConfig:
+    output_dir: str
+    repos: int
+    commits: int
+    stars: int
+    forks: int
+    issues: int
+    watchers: int
+    contributors: int
+    sizes: str
+    inactive: float
+    start: str
+    end: str
+    seed: int
+    workers: int
+
+
 @dataclass
 class ReposConfig:
     paths: Paths
@@ -45,3 +146,10 @@ class ReposConfig:
     params: Params
     features: RepoFeatures
     repos: RepoToFetch
+    fetch: FetchConfig
+    storage: StorageConfig
+    catalog: CatalogConfig
+    preprocess: PreprocessConfig
+    profiling: ProfilingConfig
+    benchmark: BenchmarkConfig
+    synthetic: SyntheticConfig
@@ -0,0 +1,344 @@
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+import schema
+import storage
+import utils
+
+# Daily count column of each event type: (feature file, date column).
+EVENTS = {
+    "commit_count": ("commits", "commit_date"),
+    "forks_count": ("forks", "forked_at"),
+    "Stars_count": ("stargazer", "starred_at"),
+    "pr_iss_Open_count": ("issues_pulls", "pr_iss_opened_at"),
+    "pr_iss_updated_count": ("issues_pulls", "pr_iss_updated_at"),
+    "pr_is_closed_count": ("issues_pulls", "pr_iss_closed_at"),
+}
+# Processed feature files: (count columns, name of the date index).
+FEATURE_TABLES = {
+    "commits": (["commit_count"], "commit_date"),
+    "forks": (["forks_count"], "forked_at"),
+    "stargazer": (["Stars_count"], "starred_at"),
+    "issues_pulls": (
+        ["pr_iss_Open_count", "pr_iss_updated_count", "pr_is_closed_count"],
+        "pr_iss_opened_at",
+    ),
+}
+# Coarser frequencies of the file with all features: period alias and file suffix.
+ROLLUPS = {"W": "weekly", "M": "monthly", "Q": "quarterly"}
+
+
+def check_rollups(rollups: List[str]) -> List[str]:
+    """Checks that the rollup frequencies are known.
+
+    Args:
+        rollups (List[str]): Period aliases, see ``ROLLUPS``.
+
+    Raises:
+        ValueError: If a frequency is unknown.
+
+    Returns:
+        List[str]: The frequencies.
+    """
+    unknown = [freq for freq in rollups if freq not in ROLLUPS]
+    if unknown:
+        raise ValueError(f"Unknown rollup frequencies: {unknown}, use {list(ROLLUPS)}")
+    return list(rollups)
+
+
+def day_numbers(dates: pd.Series) -> np.ndarray:
+    """Converts dates to integer days since 1970-01-01, dropping missing dates.
+
+    Timezone aware dates are counted on their UTC day.
+
+    Args:
+        dates (pd.Series): Event dates.
+
+    Returns:
+        np.ndarray: Day number of each event.
+    """
+    dates = dates.dropna()
+    if not pd.api.types.is_datetime64_any_dtype(dates):
+        dates = pd.to_datetime(dates)
+    if dates.dt.tz is not None:
+        dates = dates.dt.tz_convert("UTC").dt.tz_localize(None)
+    return dates.to_numpy().astype("datetime64[D]").astype(np.int64)
+
+
+def feature_columns(events: List[str]) -> Dict[str, List[str]]:
+    """Returns the date columns to read from each feature file for some events."""
+    columns: Dict[str, List[str]] = {}
+    for event in events:
+        feature, date_column = EVENTS[event]
+        columns.setdefault(feature, []).append(date_column)
+    return columns
+
+
+def read_event_dates(
+    repo_path: Path, events: Optional[List[str]] = None
+) -> Dict[str, pd.Series]:
+    """Reads the event dates of a repository, each feature file once.
+
+    Args:
+        repo_path (Path): Directory of the raw repository files.
+        events (Optional[List[str]], optional): Count columns to read, see
+                                                ``EVENTS``. Defaults to all.
+
+    Returns:
+        Dict[str, pd.Series]: Event dates per count column.
+    """
+    events = list(EVENTS) if events is None else events
+    dates = {}
+    for feature, date_columns in feature_columns(events).items():
+        raw_file = utils.get_feat_file(feature, repo_path)
+        feat_df = storage.read_table(
+            raw_file, columns=date_columns, parse_dates=date_columns
+        )
+        for event in events:
+            if EVENTS[event][0] == feature:
+                dates[event] = feat_df[EVENTS[event][1]]
+    return dates
+
+
+class DayTotals:
+    """Number of events per day of one event type, added up chunk by chunk.
+
+    Only the days with events are kept, so the memory used depends on the
+    number of days and not on the number of events.
+    """
+
+    def __init__(self):
+        self.days = np.empty(0, dtype=np.int64)
+        self.counts = np.empty(0, dtype=np.int64)
+
+    def __repr__(self):
+        return f"DayTotals({len(self.days)} days, {int(self.counts.sum())} events)"
+
+    def add(self, days: np.ndarray) -> None:
+        """Adds the events of a chunk.
+
+        Args:
+            days (np.ndarray): Day number of each event of the chunk.
+        """
+        chunk_days, chunk_counts = np.unique(days, return_counts=True)
+        self.days, position = np.unique(
+            np.concatenate([self.days, chunk_days]), return_inverse=True
+        )
+        weights = np.concatenate([self.counts, chunk_counts])
+        self.counts = np.bincount(position, weights, len(self.days)).astype(np.int64)
+
+
+def read_day_totals(
+    repo_path: Path, chunk_rows: int, events: Optional[List[str]] = None
+) -> Tuple[Dict[str, DayTotals], Optional[str]]:
+    """Counts the events of a repository per day, reading the feature files in chunks.
+
+    Args:
+        repo_path (Path): Directory of the raw repository files.
+        chunk_rows (int): Maximum number of rows read at once.
+        events (Optional[List[str]], optional): Count columns to read, see
+                                                ``EVENTS``. Defaults to all.
+
+    Returns:
+        Tuple[Dict[str, DayTotals], Optional[str]]: Daily totals per count column
+                                                    and the timezone of the dates.
+    """
+    events = list(EVENTS) if events is None else events
+    totals = {event: DayTotals() for event in events}
+    tz = None
+    for feature, date_columns in feature_columns(events).items():
+        raw_file = utils.get_feat_file(feature, repo_path)
+        for chunk in storage.iter_table(
+            raw_file, chunk_rows, columns=date_columns, parse_dates=date_columns
+        ):
+            for event in events:
+                if EVENTS[event][0] != feature:
+                    continue
+                dates = chunk[EVENTS[event][1]]
+                if tz is None and isinstance(dates.dtype, pd.DatetimeTZDtype):
+                    tz = str(dates.dt.tz)
+                totals[event].add(day_numbers(dates))
+    return totals, tz
+
+
+class DailyCounts:
+    """Dense daily counts of several event types of a repository.
+
+    All events are counted with one ``bincount`` into an array of one row
+    per event type and one column per day. The tables cover the same days,
+    and have the same columns, as the daily resampling and outer merging of
+    each event type did; the counts are integers of ``schema.COUNT_DTYPE``.
+    """
+
+    def __init__(
+        self,
+        days: Dict[str, np.ndarray],
+        tz: Optional[str] = None,
+        weights: Optional[Dict[str, np.ndarray]] = None,
+    ):
+        """Counts events per day.
+
+        Args:
+            days (Dict[str, np.ndarray]): Day numbers of the events per count column.
+            tz (Optional[str], optional): Timezone of the dates. Defaults to None.
+            weights (Optional[Dict[str, np.ndarray]], optional): Number of events of
+                each day number, e.g. totals of several days. Defaults to None
+                (one event per day number).
+        """
+        self.names = list(days)
+        self.tz = tz
+        # Day range of each event type, None without events.
+        self.spans = {
+            name: (int(values.min()), int(values.max())) if len(values) else None
+            for name, values in days.items()
+        }
+        spans = [span for span in self.spans.values() if span is not None]
+        self.start = min((first for first, _ in spans), default=0)
+        self.n_days = (
+            max((last for _, last in spans), default=self.start - 1) - self.start + 1
+        )
+
+        codes = np.concatenate(
+            [
+                position * self.n_days + (values - self.start)
+                for position, values in enumerate(days.values())
+            ]
+            + [np.empty(0, dtype=np.int64)]
+        )
+        if weights is not None:
+            weights = np.concatenate(
+                [weights[name] for name in self.names] + [np.empty(0, dtype=np.int64)]
+            )
+        self.counts = (
+            np.bincount(codes, weights, minlength=len(self.names) * self.n_days)
+            .astype(np.int64, copy=False)
+            .reshape(len(self.names), self.n_days)
+        )
+
+    @classmethod
+    def from_dates(cls, dates: Dict[str, pd.Series]) -> "DailyCounts":
+        """Counts events per day from their dates.
+
+        Args:
+            dates (Dict[str, pd.Series]): Event dates per count column.
+
+        Returns:
+            DailyCounts: Daily counts of the events.
+        """
+        tz = next(
+            (
+                str(values.dt.tz)
+                for values in dates.values()
+                if isinstance(values.dtype, pd.DatetimeTZDtype)
+            ),
+            None,
+        )
+        return cls({name: day_numbers(values) for name, values in dates.items()}, tz)
+
+    @classmethod
+    def from_files(
+        cls, repo_path: Path, events: Optional[List[str]] = None, chunk_rows: int = 0
+    ) -> "DailyCounts":
+        """Counts the events of a repository per day from its raw feature files.
+
+        Args:
+            repo_path (Path): Directory of the raw repository files.
+            events (Optional[List[str]], optional): Count columns, see ``EVENTS``.
+                                                    Defaults to all.
+            chunk_rows (int, optional): Read the files in chunks of this many rows,
+                                        so that large histories fit in memory.
+                                        Defaults to 0 (whole files).
+
+        Returns:
+            DailyCounts: Daily counts of the events.
+        """
+        if not chunk_rows:
+            return cls.from_dates(read_event_dates(repo_path, events))
+        totals, tz = read_day_totals(repo_path, chunk_rows, events)
+        return cls(
+            {name: total.days for name, total in totals.items()},
+            tz,
+            {name: total.counts for name, total in totals.items()},
+        )
+
+    def offsets(self, names: List[str]) -> np.ndarray:
+        """Returns the days on which any of the event types has its range of events."""
+        return np.flatnonzero(
+            np.logical_or.reduce([self.covered(name) for name in names])
+        )
+
+    def covered(self, name: str) -> np.ndarray:
+        """Returns a mask of the days between the first and last event of a type."""
+        day = np.arange(self.n_days)
+        span = self.spans[name]
+        if span is None:
+            return np.zeros(self.n_days, dtype=bool)
+        return (day >= span[0] - self.start) & (day <= span[1] - self.start)
+
+    def dates(
+        self, offsets: np.ndarray, name: Optional[str] = None
+    ) -> pd.DatetimeIndex:
+        """Returns the dates of day offsets from the first counted day."""
+        index = pd.DatetimeIndex(
+            (self.start + offsets).astype("datetime64[D]").astype("datetime64[ns]"),
+            name=name,
+        )
+        return index if self.tz is None else index.tz_localize(self.tz)
+
+    def frame(
+        self, names: List[str], index_name: Optional[str] = None, fillna: bool = False
+    ) -> pd.DataFrame:
+        """Returns the daily counts of event types as one table.
+
+        The table covers the days on which any of the types has its range of
+        events. As after an outer merge, a type that does not cover all of
+        these days has missing counts (a nullable integer column) outside
+        its range.
+
+        Args:
+            names (List[str]): Count columns of the table.
+            index_name (Optional[str], optional): Name of the date index. Defaults to None.
+            fillna (bool, optional): Count the missing days as 0. Defaults to False.
+
+        Returns:
+            pd.DataFrame: Daily counts.
+        """
+        offsets = self.offsets(names)
+        data = {}
+        for name in names:
+            counts = self.counts[self.names.index(name), offsets]
+            # Outside its range the count of a type is 0 already.
+            in_range = None if fillna else self.covered(name)[offsets]
+            data[name] = schema.count_array(counts, in_range)
+        return pd.DataFrame(data, index=self.dates(offsets, index_name))
+
+    def rollup(
+        self, names: List[str], freq: str, index_name: Optional[str] = None
+    ) -> pd.DataFrame:
+        """Returns the counts of event types per week, month or quarter.
+
+        The periods are summed from the days of ``frame`` (missing days count
+        as 0) and labelled by their first day.
+
+        Args:
+            names (List[str]): Count columns of the table.
+            freq (str): Period alias, "W", "M" or "Q".
+            index_name (Optional[str], optional): Name of the date index. Defaults to None.
+
+        Returns:
+            pd.DataFrame: Counts per period.
+        """
+        offsets = self.offsets(names)
+        days = (self.start + offsets).astype("datetime64[D]").astype("datetime64[ns]")
+        periods = pd.DatetimeIndex(days).to_period(freq)
+        counts = self.counts[[self.names.index(name) for name in names]][:, offsets]
+        table = (
+            pd.DataFrame(counts.T, index=periods, columns=names).groupby(level=0).sum()
+        )
+        table = schema.compact(table)
+        starts = table.index.to_timestamp().rename(index_name)
+        table.index = starts if self.tz is None else starts.tz_localize(self.tz)
+        return table
@@ -1,19 +1,29 @@
+import asyncio
 import logging
-import math
-import time
 import warnings
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from functools import partial
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple, Union
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Union
 
 import hydra
 import pandas as pd
-from dotenv import dotenv_values
 from github import Github
-from github.GithubException import BadCredentialsException, GithubException
+from github.PaginatedList import PaginatedList
 from hydra.core.config_store import ConfigStore
 
+import catalog
+import storage
 import utils
+from checkpoint import FetchCheckpoint
 from config import ReposConfig
+from github_client import DEFAULT_API_URL, GithubClientPool, load_tokens
+from graphql_backend import GraphQLFetcher
+from http_cache import ResponseCache
+from pagination import iter_pages
+from rate_limit import RateLimitScheduler
+from record_writer import RecordWriter
+from telemetry import FetchTelemetry
 
 cs = ConfigStore.instance()
 cs.store(name="repo_config", node=ReposConfig)
@@ -26,10 +36,56 @@ logging.basicConfig(
 )
 
 
+def utc_timestamp(value: Any) -> pd.Timestamp:
+    """Converts a date returned by GitHub to a UTC timestamp.
+
+    Args:
+        value (Any): Naive (UTC) or timezone aware date.
+
+    Returns:
+        pd.Timestamp: Timezone aware UTC timestamp.
+    """
+    timestamp = pd.Timestamp(value)
+    if timestamp.tzinfo is None:
+        return timestamp.tz_localize("UTC")
+    return timestamp.tz_convert("UTC")
+
+
 class RepoDataFetcher:
     """Class for retrieving repository-related data from GitHub."""
 
-    def __init__(self, repo: Union[str, List[str]], save_path: Path) -> None:
+    FEATURE_FETCHERS = (
+        "get_repo_info",
+        "get_commits_his",
+        "get_forks_his",
+        "get_issues_and_pull_his",
+        "get_stargazer_his",
+        "get_watchers_his",
+        "get_contributors_his",
+    )
+    # History files listed newest first, with their column holding the total
+    # at fetch time. An incremental sync puts the new rows in front and
+    # refreshes the total of the stored rows, as a full fetch would write them.
+    NEWEST_FIRST = {"commits": "commit_count", "forks": "fork_count"}
+
+    def __init__(
+        self,
+        repo: Union[str, List[str]],
+        save_path: Path,
+        feature_workers: int = 1,
+        tokens: Optional[List[str]] = None,
+        api_url: str = DEFAULT_API_URL,
+        pool_size: int = 10,
+        batch_size: int = 1000,
+        prefetch_pages: int = 1,
+        backend: str = "rest",
+        sync_mode: str = "skip",
+        checkpoint_pages: int = 10,
+        cache: Optional[ResponseCache] = None,
+        min_remaining: int = 50,
+        file_format: str = "csv",
+        telemetry: Optional[FetchTelemetry] = None,
+    ) -> None:
         """Initialization of the RepoDataFetcher class.
 
         Args:
@@ -37,57 +93,82 @@ class RepoDataFetcher:
             a list of repository names.
             save_path (Path): Directory path object to save the repository
             related file.
+            feature_workers (int, optional): Number of feature files
+            (e.g commits, forks) of one repository fetched at once. Defaults to 1.
+            tokens (Optional[List[str]], optional): GitHub access tokens. Defaults to
+            the tokens of the .env file.
+            api_url (str, optional): Base URL of the GitHub API. Defaults to DEFAULT_API_URL.
+            pool_size (int, optional): HTTP keep-alive connections per token. Defaults to 10.
+            batch_size (int, optional): Records buffered before they are flushed to the
+            data file. Defaults to 1000.
+            prefetch_pages (int, optional): Pages of a list requested ahead of the page
+            being processed. Defaults to 1.
+            backend (str, optional): "rest" or "graphql" API for the issues, forks
+            and stargazer histories. Defaults to "rest".
+            sync_mode (str, optional): "skip" leaves existing data files untouched,
+            "incremental" fetches only the items newer than the stored ones. Defaults
+            to "skip".
+            checkpoint_pages (int, optional): Pages between two checkpoints of a
+            history file; 0 disables checkpoints. Defaults to 10.
+            cache (Optional[ResponseCache], optional): On-disk cache used to send
+            conditional requests. Defaults to None.
+            min_remaining (int, optional): Requests kept in reserve per token before
+            the workers wait for the rate-limit reset. Defaults to 50.
+            file_format (str, optional): Storage format of the data files, "csv" or
+            "parquet". Defaults to "csv".
+            telemetry (Optional[FetchTelemetry], optional): Counters of the requests,
+            pages and records of the run. Defaults to new counters without
+            progress lines.
+
+        Raises:
+            ValueError: If the backend, the sync mode or the file format is unknown.
         """
         self.repo_path = repo
         self.save_path = save_path
+        self.feature_workers = max(1, feature_workers)
+        self.batch_size = batch_size
+        self.prefetch_pages = prefetch_pages
+        tokens = load_tokens() if tokens is None else tokens
+        self.telemetry = (
+            telemetry if telemetry is not None else FetchTelemetry(progress_seconds=0)
+        )
+        self.client_pool = GithubClientPool(
+            tokens,
+            api_url=api_url,
+            pool_size=pool_size,
+            cache=cache,
+            scheduler=RateLimitScheduler(min_remaining=min_remaining),
+            telemetry=self.telemetry,
+        )
+        if backend not in ("rest", "graphql"):
+            raise ValueError(f"Unknown backend: {backend!r}, use 'rest' or 'graphql'")
+        self.backend = backend
+        if sync_mode not in ("skip", "incremental"):
+            raise ValueError(
+                f"Unknown sync mode: {sync_mode!r}, use 'skip' or 'incremental'"
+            )
+        self.sync_mode = sync_mode
+        self.checkpoint_pages = checkpoint_pages
+        self.suffix = storage.check_format(file_format)
+        self.graphql = (
+            GraphQLFetcher(
+                tokens,
+                api_url=api_url,
+                per_page=self.client_pool.per_page,
+                scheduler=self.client_pool.scheduler,
+                telemetry=self.telemetry,
+            )
+            if backend == "graphql"
+            else None
+        )
 
-    def get_github_user(self) -> Optional[Github]:
-        """Authorize GitHub users through tokens (if provided) and return User.
+    def get_github_user(self) -> Github:
+        """Returns the pooled GitHub client with the most remaining requests.
 
         Returns:
-            Optional[Github]: GitHub Authorized User.
-        """
-        TOKEN = dotenv_values(".env")["TOKEN"]
-        if not TOKEN or TOKEN.isspace():
-
-            print(
-                "Tip: A GitHub access token has not been provided. Get the  \
-                access token from GitHub to get more requests from users to the \
-                the server (i.e. 5000 requests per hour instead of 60)."
-            )
-        try:
-            git_user = Github(TOKEN, retry=50, timeout=10, per_page=100)
-            return git_user
-        except BadCredentialsException as e:
-            print(e.status)
-            print("Limit exceeded")
-
-    def check_API_ratelimit(self, github_user: Github, min_limit: int) -> None:
-        """checks the GitHub API rate limit and the remaining rate.
-        Args:
-            github_user (Github): GitHub Authorized User.
-            min_limit (int): Minimum limit to be checked against
-                            before the rate limit is reached.
+            Github: GitHub Authorized User.
         """
-        try:
-            requests_remaning, requests_limit = github_user.rate_limiting
-            if (requests_limit == 5000) & (requests_remaning < min_limit):
-                print(requests_remaning, requests_limit)
-                reset_timestamp = github_user.rate_limiting_resettime
-                seconds_until_reset = reset_timestamp - time.time()
-                minutes = math.ceil(seconds_until_reset / 60)
-                print(f"Waiting for {minutes} minutes to refresh request limit...")
-                for i in range(minutes):
-                    print(
-                        "%s[%s%s] %i/%i"
-                        % ("Sleeping ", "#" * i, "." * (minutes - i), i, minutes),
-                        end="",
-                        flush=True,
-                    )
-                time.sleep(60)
-                print(end="\r")
-        except GithubException as e:
-            print(e)
+        return self.client_pool.get_client()
 
     def create_repos_dir(self) -> Path:
         """creates a directory for the resulting repository files.
@@ -96,9 +177,7 @@ class RepoDataFetcher:
             Path: Directory path to the resulting repository files.
         """
         repos_dir = self.save_path
-        if not repos_dir.is_dir():
-            Path.mkdir(repos_dir, exist_ok=True)
-            return repos_dir
+        repos_dir.mkdir(parents=True, exist_ok=True)
         return repos_dir
 
     def create_repo_dir(self, repo_name: str, show_msg: bool = False) -> Path:
@@ -117,11 +196,13 @@ class RepoDataFetcher:
         repo_name = repo_name.split("/")[-1]
         repo_path = Path(dataset_dir, repo_name)
 
-        if not repo_path.exists():
-            Path.mkdir(repo_path, exist_ok=True)
+        # Several workers may create the same directory at once, so let mkdir
+        # decide who created it instead of checking for existence first.
+        try:
+            repo_path.mkdir()
             print(f"{repo_name}: New dir is created ")
             logging.info(f"{repo_name}: New dir is created ")
-        else:
+        except FileExistsError:
             if show_msg:
                 print(f"{repo_name}: Dir exist already ")
                 logging.info(f"{repo_name}: Dir exist already ")
@@ -130,6 +211,9 @@ class RepoDataFetcher:
     def check_file(self, repo_name: str, repo_file: str = None) -> Tuple[bool, Path]:
         """Checks whether the file or directory of a repository already exists
 
+        The catalog of the data directory is asked first, the file system only
+        for repositories it does not know yet.
+
         Args:
             repo_name (str): Repository's full name
             repo_file (str, optional): repository data file(e.g commit, fork). Defaults to None.
@@ -138,10 +222,161 @@ class RepoDataFetcher:
             Tuple[bool, Path]: Returns True or False and the file path if the file exit or not
         """
         repo_dir = self.create_repo_dir(repo_name)
-        file_to_save = Path(repo_dir, f"{repo_file}").with_suffix(".csv")
-        if file_to_save.exists():
-            return (True, file_to_save)
-        return (False, file_to_save)
+        file_to_save = Path(repo_dir, f"{repo_file}").with_suffix(self.suffix)
+        repos_catalog = catalog.find_catalog(file_to_save)
+        file_exist = (
+            None if repos_catalog is None else repos_catalog.has_file(file_to_save)
+        )
+        if file_exist is None:
+            file_exist = file_to_save.exists()
+        return (file_exist, file_to_save)
+
+    def get_sync_since(
+        self,
+        file_exist: bool,
+        file_to_save: Path,
+        date_column: str,
+        key: Optional[str] = None,
+    ) -> Optional[pd.Timestamp]:
+        """Returns the date from which an incremental sync fetches new items.
+
+        Args:
+            file_exist (bool): Whether the data file already exists.
+            file_to_save (Path): Path of the data file.
+            date_column (str): Column holding the item dates.
+            key (Optional[str], optional): Column the stored rows must have to be
+                                           updated in place. Defaults to None.
+
+        Returns:
+            Optional[pd.Timestamp]: Newest stored date, or None if the whole
+                                    history has to be fetched.
+        """
+        if not file_exist or self.sync_mode != "incremental":
+            return None
+        header = storage.read_columns(file_to_save)
+        if date_column not in header or (key is not None and key not in header):
+            return None
+        dates = storage.read_table(file_to_save, columns=[date_column])[
+            date_column
+        ].dropna()
+        if dates.empty:
+            return None
+        try:
+            dates = pd.to_datetime(dates, utc=True)
+        except ValueError:
+            # Files written by older PyGithub versions mix naive and aware dates.
+            dates = dates.map(utc_timestamp)
+        print(f"{file_to_save.stem}: fetching items newer than {dates.max()}")
+        logging.info(f"{file_to_save.stem}: fetching items newer than {dates.max()}")
+        return dates.max()
+
+    def open_writer(
+        self,
+        file_to_save: Path,
+        columns: List[str],
+        since: Optional[pd.Timestamp] = None,
+        key: Optional[str] = None,
+    ) -> RecordWriter:
+        """Opens a streaming writer for a repository data file.
+
+        Args:
+            file_to_save (Path): Path of the repository data file.
+            columns (List[str]): Column names of the file.
+            since (Optional[pd.Timestamp], optional): Date of an incremental sync; the
+                                                      records are then merged into the
+                                                      existing file. Defaults to None.
+            key (Optional[str], optional): Column identifying a row; merged records
+                                           replace the stored row with the same key.
+                                           Defaults to None.
+
+        Returns:
+            RecordWriter: Writer that flushes the records in batches.
+        """
+        snapshot = self.NEWEST_FIRST.get(file_to_save.stem)
+        if since is None:
+            mode = "write"
+        elif key is not None:
+            mode = "upsert"
+        else:
+            mode = "append" if snapshot is None else "prepend"
+        return RecordWriter(
+            file_to_save,
+            columns,
+            batch_size=self.batch_size,
+            mode=mode,
+            key=key,
+            snapshot=None if snapshot is None else [snapshot],
+        )
+
+    def paginate_pages(
+        self,
+        paginated_list: PaginatedList,
+        total_count: Optional[int] = None,
+        start_page: Optional[int] = None,
+    ) -> Iterator[Tuple[int, List[Any]]]:
+        """Iterates the pages of a paginated list once, prefetching the next pages.
+
+        Args:
+            paginated_list (PaginatedList): Paginated list returned by PyGithub.
+            total_count (Optional[int], optional): Known number of items. Defaults to None.
+            start_page (Optional[int], optional): First page (zero based) to fetch.
+                                                  Defaults to None (the first page).
+
+        Returns:
+            Iterator[Tuple[int, List[Any]]]: Page number and the items of the page.
+        """
+        return iter_pages(
+            paginated_list,
+            self.client_pool.per_page,
+            start_page=start_page or 0,
+            prefetch=self.prefetch_pages,
+            total_count=total_count,
+        )
+
+    def write_pages(
+        self,
+        file_to_save: Path,
+        columns: List[str],
+        fetch_pages: Callable[[Any], Iterator[Tuple[Any, List[Dict[str, Any]]]]],
+        since: Optional[pd.Timestamp] = None,
+        key: Optional[str] = None,
+    ) -> None:
+        """Writes the pages of a history to its data file with checkpoints.
+
+        Every ``checkpoint_pages`` pages the records are flushed and the
+        position of the next page is stored. A fetch that was interrupted
+        resumes from the last checkpoint instead of the first page.
+
+        Args:
+            file_to_save (Path): Path of the repository data file.
+            columns (List[str]): Column names of the file.
+            fetch_pages (Callable[[Any], Iterator[Tuple[Any, List[Dict[str, Any]]]]]):
+                Called with the position to resume from (None to start at the
+                beginning); yields the position following each page and its records.
+            since (Optional[pd.Timestamp], optional): Date of an incremental sync.
+                                                      Defaults to None.
+            key (Optional[str], optional): Column identifying a row. Defaults to None.
+        """
+        checkpoint = FetchCheckpoint(file_to_save)
+        writer = self.open_writer(file_to_save, columns, since, key)
+        state = checkpoint.load()
+        start = None
+        if state is not None and writer.resume(state["records"]):
+            start = state["position"]
+            print(f"{file_to_save.stem}: resuming after {state['records']} records")
+            logging.info(
+                f"{file_to_save.stem}: resuming after {state['records']} records"
+            )
+
+        with writer, self.telemetry.fetching(file_to_save):
+            for index, (position, records) in enumerate(fetch_pages(start), start=1):
+                writer.write_many(records)
+                self.telemetry.record_page(file_to_save, len(records))
+                if self.checkpoint_pages and index % self.checkpoint_pages == 0:
+                    writer.flush()
+                    checkpoint.save(position, writer.count)
+        checkpoint.clear()
+        catalog.record_file(file_to_save)
 
     def get_repo_info(self, repo_name: str) -> None:
         """Retrieve general information about the repository and saves it in
@@ -152,129 +387,252 @@ class RepoDataFetcher:
         """
 
         file_exist, file_to_save = self.check_file(repo_name, "repo_data")
-        if file_exist:
+        if file_exist and self.sync_mode == "skip":
             print(f"{repo_name} {file_to_save.stem} file already exists")
             logging.info(f"{repo_name} {file_to_save.stem} file already exists")
         else:
 
-            df_repo = pd.DataFrame()
             gh_user = self.get_github_user()
-            self.check_API_ratelimit(gh_user, 50)
-            repo = gh_user.get_repo(repo_name)
-            df_repo = df_repo.append(
-                {
-                    "repo_name": repo_name,
-                    "discription": repo.description,
-                    "language": repo.language,
-                    "user_Name": repo.url.split("/")[-2],
-                    "created_at": pd.to_datetime(repo.created_at),
-                    "pushed_at": pd.to_datetime(repo.pushed_at),
-                    "last_update_at": pd.to_datetime(repo.updated_at),
-                    "stars": repo.stargazers_count,
-                    "size": repo.size,
-                    "repo_url": repo.url,
-                    "repo_html_url": repo.html_url,
-                    "branch_count": repo.get_branches().totalCount,
-                    "milestone_count": repo.get_milestones(state="all").totalCount,
-                    "pullrequest_count": repo.get_pulls(state="all").totalCount,
-                    "release_count": repo.get_releases().totalCount,
-                    "workflow_count": repo.get_workflows().totalCount,
-                    "issues_count": repo.get_issues(state="all").totalCount,
-                    "watchers_count": repo.watchers_count,
-                    "subscribers_count": repo.subscribers_count,
-                    "has_wiki": bool(repo.has_wiki),
-                    "has_pages": bool(repo.has_pages),
-                    "has_projects": bool(repo.has_projects),
-                    "has_downloads": bool(repo.has_downloads),
-                },
-                ignore_index=True,
-            )
+            with self.telemetry.fetching(file_to_save):
+                repo = gh_user.get_repo(repo_name)
+                df_repo = pd.DataFrame(
+                    [
+                        {
+                            "repo_name": repo_name,
+                            "discription": repo.description,
+                            "language": repo.language,
+                            "user_Name": repo.url.split("/")[-2],
+                            "created_at": pd.to_datetime(repo.created_at),
+                            "pushed_at": pd.to_datetime(repo.pushed_at),
+                            "last_update_at": pd.to_datetime(repo.updated_at),
+                            "stars": repo.stargazers_count,
+                            "size": repo.size,
+                            "repo_url": repo.url,
+                            "repo_html_url": repo.html_url,
+                            "branch_count": repo.get_branches().totalCount,
+                            "milestone_count": repo.get_milestones(
+                                state="all"
+                            ).totalCount,
+                            "pullrequest_count": repo.get_pulls(state="all").totalCount,
+                            "release_count": repo.get_releases().totalCount,
+                            "workflow_count": repo.get_workflows().totalCount,
+                            "issues_count": repo.get_issues(state="all").totalCount,
+                            "watchers_count": repo.watchers_count,
+                            "subscribers_count": repo.subscribers_count,
+                            "has_wiki": bool(repo.has_wiki),
+                            "has_pages": bool(repo.has_pages),
+                            "has_projects": bool(repo.has_projects),
+                            "has_downloads": bool(repo.has_downloads),
+                        }
+                    ]
+                )
 
-            df_repo.to_csv(file_to_save, index=False)
+            storage.write_table(df_repo, file_to_save)
+            self.telemetry.record_page(file_to_save, len(df_repo))
+            catalog.record_file(file_to_save)
             print(f"{repo_name}: Repository Data file is created")
             logging.info(f"{repo_name}: Repository Data file is created")
 
-    def get_commits_his(self, repo_name:str)->None:
-        """Retrieve repository commits history and saves it in a corresponding
-         commits CSV file under the repository folder. 
+    def iter_commits_pages(
+        self,
+        repo_name: str,
+        since: Optional[pd.Timestamp] = None,
+        start: Optional[int] = None,
+    ) -> Iterator[Tuple[int, List[Dict[str, Any]]]]:
+        """Yields pages of commit records from the REST API.
 
         Args:
             repo_name (str): Repository's full name.
+            since (Optional[pd.Timestamp], optional): Only return commits committed
+                                                      after this date. Defaults to None.
+            start (Optional[int], optional): Page to resume from. Defaults to None.
+
+        Yields:
+            Iterator[Tuple[int, List[Dict[str, Any]]]]: Next page number and records of a page.
         """
+        gh_user = self.get_github_user()
+        repo = gh_user.get_repo(repo_name)
 
-        file_exist, file_to_save = self.check_file(repo_name, "commits")
-        if file_exist:
-            print(f"{repo_name} {file_to_save.stem} file already exists")
-            logging.info(f"{repo_name} {file_to_save.stem} file already exists")
+        r_commit_count = repo.get_commits().totalCount
+        if since is None:
+            repo_commits, total_count = repo.get_commits(), r_commit_count
         else:
-            df_repo = pd.DataFrame()
-            gh_user = self.get_github_user()
-            remaning = self.check_API_ratelimit(gh_user, 100)
-            repo = gh_user.get_repo(repo_name)
-
-            repo_commits = repo.get_commits()
-            r_commit_count = len(list(repo_commits))
+            repo_commits, total_count = (
+                repo.get_commits(since=since.to_pydatetime()),
+                None,
+            )
 
-            for index, commit in enumerate(repo_commits):
-                remaning = self.check_API_ratelimit(gh_user, 25)
+        for page, commits in self.paginate_pages(repo_commits, total_count, start):
+            records = []
+            for commit in commits:
                 commit_date = commit.commit.committer.date
-                print(index, remaning, repo_name, r_commit_count, commit, commit_date)
-                df_repo = df_repo.append(
+                if since is not None and utc_timestamp(commit_date) <= since:
+                    continue
+                records.append(
                     {
                         "repo_name": repo_name,
                         "commit_count": r_commit_count,
                         "commit_sha": commit,
                         "commit_date": commit_date,
-                    },
-                    ignore_index=True,
+                    }
                 )
+            yield page + 1, records
+
+    def get_commits_his(self, repo_name: str) -> None:
+        """Retrieve repository commits history and saves it in a corresponding
+         commits CSV file under the repository folder.
+
+        Args:
+            repo_name (str): Repository's full name.
+        """
+
+        file_exist, file_to_save = self.check_file(repo_name, "commits")
+        if file_exist and self.sync_mode == "skip":
+            print(f"{repo_name} {file_to_save.stem} file already exists")
+            logging.info(f"{repo_name} {file_to_save.stem} file already exists")
+        else:
+            since = self.get_sync_since(file_exist, file_to_save, "commit_date")
+            columns = ["repo_name", "commit_count", "commit_sha", "commit_date"]
+            self.write_pages(
+                file_to_save,
+                columns,
+                partial(self.iter_commits_pages, repo_name, since),
+                since,
+            )
 
-            df_repo.to_csv(file_to_save, index=False)
             print(f"{repo_name}: commits file is created")
             logging.info(f"{repo_name}: commits file is created")
 
-    def get_issues_and_pull_his(self, repo_name:str)-> None:
+    def iter_issues_pulls_pages(
+        self,
+        repo_name: str,
+        since: Optional[pd.Timestamp] = None,
+        start: Optional[int] = None,
+    ) -> Iterator[Tuple[int, List[Dict[str, Any]]]]:
+        """Yields pages of issue and pull request records from the REST API.
+
+        Args:
+            repo_name (str): Repository's full name.
+            since (Optional[pd.Timestamp], optional): Only return issues and pull
+                                                      requests updated at or after
+                                                      this date. Defaults to None.
+            start (Optional[int], optional): Page to resume from. Defaults to None.
+
+        Yields:
+            Iterator[Tuple[int, List[Dict[str, Any]]]]: Next page number and records of a page.
+        """
+        gh_user = self.get_github_user()
+
+        repo = gh_user.get_repo(repo_name)
+
+        if since is None:
+            r_all_issues = repo.get_issues(state="all")
+        else:
+            r_all_issues = repo.get_issues(state="all", since=since.to_pydatetime())
+        for page, repo_issues in self.paginate_pages(r_all_issues, start_page=start):
+            yield page + 1, [
+                {
+                    "repo_name": repo_name,
+                    "issue_pull": (
+                        "pull request" if repo_issue.pull_request else "Issue"
+                    ),
+                    "pr_iss_number": repo_issue.number,
+                    "pr_iss_state": repo_issue.state,
+                    "pr_iss_opened_at": repo_issue.created_at,
+                    "pr_iss_updated_at": repo_issue.updated_at,
+                    "pr_iss_closed_at": repo_issue.closed_at,
+                }
+                for repo_issue in repo_issues
+            ]
+
+    def get_issues_and_pull_his(self, repo_name: str) -> None:
         """Retrieve repository pull requests andissues history and saves it in a corresponding
-         issues_pulls CSV file under the repository folder. 
+         issues_pulls CSV file under the repository folder.
 
         Args:
             repo_name (str): Repository's full name.
         """
         file_exist, file_to_save = self.check_file(repo_name, "issues_pulls")
-        if file_exist:
+        if file_exist and self.sync_mode == "skip":
             print(f"{repo_name} {file_to_save.stem} file already exists")
             logging.info(f"{repo_name} {file_to_save.stem} file already exists")
         else:
-            df_repo = pd.DataFrame()
-            gh_user = self.get_github_user()
-
-            repo = gh_user.get_repo(repo_name)
-
-            r_all_issues = repo.get_issues(state="all")
-            for index, repo_issue in enumerate(r_all_issues):
-                self.check_API_ratelimit(gh_user, 50)
-                if repo_issue.pull_request:
-                    Issue_or_pull = "pull request"
-                else:
-                    Issue_or_pull = "Issue"
-                df_repo = df_repo.append(
-                    {
-                        "repo_name": repo_name,
-                        "issue_pull": Issue_or_pull,
-                        "pr_iss_state": repo_issue.state,
-                        "pr_iss_opened_at": repo_issue.created_at,
-                        "pr_iss_updated_at": repo_issue.updated_at,
-                        "pr_iss_closed_at": repo_issue.closed_at,
-                    },
-                    ignore_index=True,
+            # Updated issues are fetched again and replace their stored row,
+            # which needs the issue number (missing in files of older runs).
+            since = self.get_sync_since(
+                file_exist, file_to_save, "pr_iss_updated_at", key="pr_iss_number"
+            )
+            if self.backend == "graphql":
+                fetch_pages = partial(
+                    self.graphql.iter_issues_pulls_pages, repo_name, since
                 )
-            df_repo.to_csv(file_to_save, index=False)
+            else:
+                fetch_pages = partial(self.iter_issues_pulls_pages, repo_name, since)
+            columns = [
+                "repo_name",
+                "issue_pull",
+                "pr_iss_number",
+                "pr_iss_state",
+                "pr_iss_opened_at",
+                "pr_iss_updated_at",
+                "pr_iss_closed_at",
+            ]
+            self.write_pages(
+                file_to_save, columns, fetch_pages, since, key="pr_iss_number"
+            )
             print(f"{repo_name}: Issues and pull requests file is created")
             logging.info(f"{repo_name}: Issues and pull requests file is created")
 
-    def get_forks_his(self, repo_name:str)-> None:
+    def iter_forks_pages(
+        self,
+        repo_name: str,
+        since: Optional[pd.Timestamp] = None,
+        start: Optional[int] = None,
+    ) -> Iterator[Tuple[int, List[Dict[str, Any]]]]:
+        """Yields pages of fork records from the REST API.
+
+        Forks are listed newest first, so with ``since`` the listing stops at
+        the first fork that is already stored.
+
+        Args:
+            repo_name (str): Repository's full name.
+            since (Optional[pd.Timestamp], optional): Only return forks created after
+                                                      this date. Defaults to None.
+            start (Optional[int], optional): Page to resume from. Defaults to None.
+
+        Yields:
+            Iterator[Tuple[int, List[Dict[str, Any]]]]: Next page number and records of a page.
+        """
+        gh_user = self.get_github_user()
+
+        repo = gh_user.get_repo(repo_name)
+
+        repo_fork = repo.get_forks()
+        fork_count = repo_fork.totalCount
+
+        for page, forks in self.paginate_pages(
+            repo_fork, fork_count if since is None else None, start
+        ):
+            newer = [
+                fork
+                for fork in forks
+                if since is None or utc_timestamp(fork.created_at) > since
+            ]
+            yield page + 1, [
+                {
+                    "repo_name": repo_name,
+                    "fork_count": fork_count,
+                    "forked_user": fork.full_name,
+                    "forked_at": fork.created_at,
+                }
+                for fork in newer
+            ]
+            if len(newer) < len(forks):
+                return
+
+    def get_forks_his(self, repo_name: str) -> None:
         """Retrieve repository forks history and saves it in a corresponding
-            forks CSV file under the repository folder. 
+            forks CSV file under the repository folder.
 
 
         Args:
@@ -282,183 +640,456 @@ class RepoDataFetcher:
         """
 
         file_exist, file_to_save = self.check_file(repo_name, "forks")
-        if file_exist:
+        if file_exist and self.sync_mode == "skip":
             print(f"{repo_name} {file_to_save.stem} file already exists")
             logging.info(f"{repo_name} {file_to_save.stem} file already exists")
         else:
-            df_repo = pd.DataFrame()
-            gh_user = self.get_github_user()
-
-            repo = gh_user.get_repo(repo_name)
-
-            repo_fork = repo.get_forks()
+            since = self.get_sync_since(file_exist, file_to_save, "forked_at")
+            if self.backend == "graphql":
+                fetch_pages = partial(self.graphql.iter_forks_pages, repo_name, since)
+            else:
+                fetch_pages = partial(self.iter_forks_pages, repo_name, since)
 
-            for index, fork in enumerate(repo_fork):
-                self.check_API_ratelimit(gh_user, 25)
-                df_repo = df_repo.append(
-                    {
-                        "repo_name": repo_name,
-                        "fork_count": repo_fork.totalCount,
-                        "forked_user": fork.full_name,
-                        "forked_at": fork.created_at,
-                    },
-                    ignore_index=True,
-                )
+            columns = ["repo_name", "fork_count", "forked_user", "forked_at"]
+            self.write_pages(file_to_save, columns, fetch_pages, since)
 
-            df_repo.to_csv(file_to_save, index=False)
             print(f"{repo_name}: forks file is created")
             logging.info(f"{repo_name}: forks file is created")
 
-    def get_watchers_his(self, repo_name: str)-> None:
+    def iter_watchers_pages(
+        self, repo_name: str, start: Optional[int] = None
+    ) -> Iterator[Tuple[int, List[Dict[str, Any]]]]:
+        """Yields pages of watcher (subscriber) records from the REST API.
+
+        Args:
+            repo_name (str): Repository's full name.
+            start (Optional[int], optional): Page to resume from. Defaults to None.
+
+        Yields:
+            Iterator[Tuple[int, List[Dict[str, Any]]]]: Next page number and records of a page.
+        """
+        gh_user = self.get_github_user()
+
+        repo = gh_user.get_repo(repo_name)
+
+        repo_subscribers = repo.get_subscribers()
+        for page, subscribers in self.paginate_pages(
+            repo_subscribers, repo.subscribers_count, start
+        ):
+            yield page + 1, [
+                {
+                    "repo_name": repo_name,
+                    "watchers_count": repo.watchers_count,
+                    "subscribers_count": repo.subscribers_count,
+                    "subscriber": subscriber,
+                    "subscriber_username": subscriber.login,
+                    "subscribed_at": subscriber.created_at,
+                }
+                for subscriber in subscribers
+            ]
+
+    def get_watchers_his(self, repo_name: str) -> None:
         """Retrieve repository Watchers history and saves it in a corresponding
-            watchers CSV file under the repository folder. 
+            watchers CSV file under the repository folder.
 
         Args:
             repo_name (str): Repository's full name.
         """
 
         file_exist, file_to_save = self.check_file(repo_name, "watchers")
-        if file_exist:
+        if file_exist and self.sync_mode == "skip":
             print(f"{repo_name} {file_to_save.stem} file already exists")
             logging.info(f"{repo_name} {file_to_save.stem} file already exists")
         else:
-            df_repo = pd.DataFrame()
-            gh_user = self.get_github_user()
-
-            repo = gh_user.get_repo(repo_name)
-
-            repo_subscribers = repo.get_subscribers()
-            for index, subscriber in enumerate(repo_subscribers):
-                self.check_API_ratelimit(gh_user, 25)
-                df_repo = df_repo.append(
-                    {
-                        "repo_name": repo_name,
-                        "watchers_count": repo.watchers_count,
-                        "subscribers_count": repo.subscribers_count,
-                        "subscriber": subscriber,
-                        "subscriber_username": subscriber.login,
-                        "subscribed_at": subscriber.created_at,
-                    },
-                    ignore_index=True,
-                )
-            df_repo.to_csv(file_to_save, index=False)
+            columns = [
+                "repo_name",
+                "watchers_count",
+                "subscribers_count",
+                "subscriber",
+                "subscriber_username",
+                "subscribed_at",
+            ]
+            self.write_pages(
+                file_to_save, columns, partial(self.iter_watchers_pages, repo_name)
+            )
             print(f"{repo_name} : watchers/subscriber file is created")
             logging.info(f"{repo_name} : watchers/subscriber file is created")
-    
-    def get_contributors_his(self, repo_name:str)-> None:
+
+    def iter_contributors_pages(
+        self, repo_name: str, start: Optional[int] = None
+    ) -> Iterator[Tuple[int, List[Dict[str, Any]]]]:
+        """Yields pages of contributor records from the REST API.
+
+        Args:
+            repo_name (str): Repository's full name.
+            start (Optional[int], optional): Page to resume from. Defaults to None.
+
+        Yields:
+            Iterator[Tuple[int, List[Dict[str, Any]]]]: Next page number and records of a page.
+        """
+        gh_user = self.get_github_user()
+        repo = gh_user.get_repo(repo_name)
+        all_contributos = repo.get_contributors(True).totalCount
+        author_contributos = repo.get_contributors()
+
+        contributers_count = author_contributos.totalCount
+        print(
+            f"Github provides only data of the {contributers_count} / {all_contributos} Contributors"
+        )
+        logging.info(
+            f"Github provides only data of the {contributers_count} / {all_contributos} Contributors"
+        )
+
+        for page, contributers in self.paginate_pages(
+            author_contributos, contributers_count, start
+        ):
+            yield page + 1, [
+                {
+                    "repo_name": repo_name,
+                    "contributors_count": contributers_count,
+                    "contributor": contributer.login,
+                    "contributed_date": contributer.created_at,
+                }
+                for contributer in contributers
+            ]
+
+    def get_contributors_his(self, repo_name: str) -> None:
         """Retrieve repository Contributors history and saves it in a corresponding
-            Contributors CSV file under the repository folder. 
+            Contributors CSV file under the repository folder.
 
         Args:
             repo_name (str): Repository's full name.
         """
 
         file_exist, file_to_save = self.check_file(repo_name, "Contributors")
-        if file_exist:
+        if file_exist and self.sync_mode == "skip":
             print(f"{repo_name} {file_to_save.stem} file already exists")
             logging.info(f"{repo_name} {file_to_save.stem} file already exists")
         else:
-            df_repo = pd.DataFrame()
-            gh_user = self.get_github_user()
-            repo = gh_user.get_repo(repo_name)
-            all_contributos = repo.get_contributors(True).totalCount
-            author_contributos = repo.get_contributors()
-
-            contributers_count = author_contributos.totalCount
-            print(
-                f"Github provides only data of the {contributers_count} / {all_contributos} Contributors"
+            columns = [
+                "repo_name",
+                "contributors_count",
+                "contributor",
+                "contributed_date",
+            ]
+            self.write_pages(
+                file_to_save, columns, partial(self.iter_contributors_pages, repo_name)
             )
-            logging.info(
-                f"Github provides only data of the {contributers_count} / {all_contributos} Contributors"
-            )
-
-            for index, contributer in enumerate(author_contributos):
-                self.check_API_ratelimit(gh_user, 25)
-                df_repo = df_repo.append(
-                    {
-                        "repo_name": repo_name,
-                        "contributors_count": contributers_count,
-                        "contributor": contributer.login,
-                        "contributed_date": contributer.created_at,
-                    },
-                    ignore_index=True,
-                )
 
-            df_repo.to_csv(file_to_save, index=False)
             print(f"{repo_name}:  Contributors file is created")
             logging.info(f"{repo_name}:  Contributors file is created")
 
-    def get_stargazer_his(self, repo_name: str)-> None:
-        """Retrieve repository stargazer history and saves it in a corresponding
-            stargazer CSV file under the repository folder. 
+    def iter_stargazer_pages(
+        self,
+        repo_name: str,
+        since: Optional[pd.Timestamp] = None,
+        stored: int = 0,
+        start: Optional[int] = None,
+    ) -> Iterator[Tuple[int, List[Dict[str, Any]]]]:
+        """Yields pages of stargazer records from the REST API.
+
+        Stargazers are listed oldest first, so with ``since`` the listing
+        starts at the page holding the last stored star (one page earlier, in
+        case stars were removed meanwhile) instead of the first page.
 
         Args:
             repo_name (str): Repository's full name.
+            since (Optional[pd.Timestamp], optional): Only return stars given after
+                                                      this date. Defaults to None.
+            stored (int, optional): Number of stars already stored. Defaults to 0.
+            start (Optional[int], optional): Page to resume from. Defaults to None.
+
+        Yields:
+            Iterator[Tuple[int, List[Dict[str, Any]]]]: Next page number and records of a page.
         """
+        gh_user = self.get_github_user()
+        repo = gh_user.get_repo(repo_name)
+        repo_stars = repo.get_stargazers_with_dates()
+        if start is None and since is not None:
+            start = max(0, stored // self.client_pool.per_page - 1)
+        num_stars_returned = 0
+        for page, stars in self.paginate_pages(
+            repo_stars, repo.stargazers_count, start
+        ):
+            num_stars_returned += len(stars)
+            yield page + 1, [
+                {
+                    "repo_name": repo_name,
+                    "starred_user": star.user,
+                    "starred_at": star.starred_at,
+                }
+                for star in stars
+                if since is None or utc_timestamp(star.starred_at) > since
+            ]
+
+        if since is None and not start and num_stars_returned < repo.stargazers_count:
+            print(f"Because stars are more than {num_stars_returned}")
+            print(f"Only the first {num_stars_returned} are returned from Github")
+            print("#" * 25)
+
+    def get_stargazer_his(self, repo_name: str) -> None:
+        """Retrieve repository stargazer history and saves it in a corresponding
+            stargazer CSV file under the repository folder.
 
+        Args:
+            repo_name (str): Repository's full name.
+        """
 
         file_exist, file_to_save = self.check_file(repo_name, "stargazer")
-        if file_exist:
+        if file_exist and self.sync_mode == "skip":
             print(f"{repo_name} {file_to_save.stem} file already exists")
             logging.info(f"{repo_name} {file_to_save.stem} file already exists")
         else:
-            df_repo = pd.DataFrame()
-            gh_user = self.get_github_user()
-            repo = gh_user.get_repo(repo_name)
-            repo_stars = repo.get_stargazers_with_dates()
-            num_stars_returned = 0
-            for index, star in enumerate(repo_stars):
-                self.check_API_ratelimit(gh_user, 25)
-                num_stars_returned = index + 1
-                df_repo = df_repo.append(
-                    {
-                        "repo_name": repo_name,
-                        "starred_user": star.user,
-                        "starred_at": star.starred_at,
-                    },
-                    ignore_index=True,
+            since = self.get_sync_since(file_exist, file_to_save, "starred_at")
+            if self.backend == "graphql":
+                fetch_pages = partial(
+                    self.graphql.iter_stargazers_pages, repo_name, since
                 )
+            else:
+                stored = storage.count_rows(file_to_save) if since is not None else 0
+                fetch_pages = partial(
+                    self.iter_stargazer_pages, repo_name, since, stored
+                )
+            columns = ["repo_name", "starred_user", "starred_at"]
+            self.write_pages(file_to_save, columns, fetch_pages, since)
 
-            if num_stars_returned < repo.stargazers_count:
-                print(f"Because stars are more than {num_stars_returned}")
-                print(f"Only the first {num_stars_returned} are returned from Github")
-                print("#" * 25)
-
-            df_repo.to_csv(file_to_save, index=False)
             print(f"{repo_name}: stargazer file has been created")
             logging.info(f"{repo_name}: stargazer file is created")
-    
-    def get_repo_data(self, repo_name:str)-> None:
-        """ Gets all repository data.
+
+    def get_repo_data(self, repo_name: str) -> Dict[str, str]:
+        """Gets all repository data.
+
+        The feature files are fetched concurrently when ``feature_workers``
+        is greater than one. A failing feature does not stop the others.
 
         Args:
             repo_name (str): Repository's full name.
+
+        Returns:
+            Dict[str, str]: Status ("ok" or the error message) of each feature fetcher.
         """
-        self.get_github_user()
         self.create_repo_dir(repo_name, show_msg=True)
-        self.get_repo_info(repo_name)
-        self.get_commits_his(repo_name)
-        self.get_forks_his(repo_name)
-        self.get_issues_and_pull_his(repo_name)
-        self.get_stargazer_his(repo_name)
-        self.get_watchers_his(repo_name)
-        self.get_contributors_his(repo_name)
-
-        print(f"{repo_name}: Repository data is successfully extracted.")
-        logging.info(f"{repo_name}: Repository data is successfully extracted.")
 
-@hydra.main(config_path="conf", config_name="config", version_base=None)
-def main(cfg: ReposConfig):
+        status = {}
+        with ThreadPoolExecutor(max_workers=self.feature_workers) as executor:
+            futures = {
+                executor.submit(getattr(self, fetcher), repo_name): fetcher
+                for fetcher in self.FEATURE_FETCHERS
+            }
+            for future in as_completed(futures):
+                fetcher = futures[future]
+                try:
+                    future.result()
+                    status[fetcher] = "ok"
+                except Exception as e:
+                    status[fetcher] = f"{type(e).__name__}: {e}"
+                    print(f"{repo_name}: {fetcher} failed: {e}")
+                    logging.error(f"{repo_name}: {fetcher} failed: {e}")
+
+        if all(state == "ok" for state in status.values()):
+            print(f"{repo_name}: Repository data is successfully extracted.")
+            logging.info(f"{repo_name}: Repository data is successfully extracted.")
+        return status
+
+
+def fetch_repo(fetcher: RepoDataFetcher, repo_name: str) -> Dict[str, str]:
+    """Fetches all data of one repository (module level so that it can be
+    sent to a process pool).
+
+    Args:
+        fetcher (RepoDataFetcher): Fetcher used to retrieve the data.
+        repo_name (str): Repository's full name.
+
+    Returns:
+        Dict[str, str]: Status of each feature fetcher.
+    """
+    return fetcher.get_repo_data(repo_name)
+
+
+def fetch_repo_process(
+    fetcher: RepoDataFetcher, repo_name: str
+) -> Tuple[Dict[str, str], FetchTelemetry]:
+    """Fetches all data of one repository in a worker process.
+
+    The worker counts into its own copy of the telemetry, which is sent back
+    to be merged into the counters of the run.
+
+    Args:
+        fetcher (RepoDataFetcher): Fetcher used to retrieve the data.
+        repo_name (str): Repository's full name.
+
+    Returns:
+        Tuple[Dict[str, str], FetchTelemetry]: Status of each feature fetcher and
+                                               the counters of the repository.
+    """
+    fetcher.telemetry.detach()
+    return fetcher.get_repo_data(repo_name), fetcher.telemetry
+
+
+def fetch_repos(
+    fetcher: RepoDataFetcher,
+    repo_names: List[str],
+    workers: int = 1,
+    executor: str = "thread",
+) -> Dict[str, Dict[str, str]]:
+    """Fetches several repositories concurrently.
+
+    Args:
+        fetcher (RepoDataFetcher): Fetcher used to retrieve the data.
+        repo_names (List[str]): Full names of the repositories to fetch.
+        workers (int, optional): Number of repositories fetched at once. Defaults to 1.
+        executor (str, optional): "thread" or "process" pool. Defaults to "thread".
+
+    Raises:
+        ValueError: If the executor type is unknown.
+
+    Returns:
+        Dict[str, Dict[str, str]]: Status of each feature fetcher per repository.
+    """
+    pools = {"thread": ThreadPoolExecutor, "process": ProcessPoolExecutor}
+    if executor not in pools:
+        raise ValueError(f"Unknown executor: {executor!r}, use one of {list(pools)}")
+
+    fetcher.create_repos_dir()
+    fetch = fetch_repo_process if executor == "process" else fetch_repo
+    summary = {}
+    with pools[executor](max_workers=max(1, workers)) as pool:
+        futures = {
+            pool.submit(fetch, fetcher, repo_name): repo_name
+            for repo_name in repo_names
+        }
+        for future in as_completed(futures):
+            repo_name = futures[future]
+            try:
+                summary[repo_name] = future.result()
+                if executor == "process":
+                    summary[repo_name], telemetry = summary[repo_name]
+                    fetcher.telemetry.merge(telemetry)
+            except Exception as e:
+                summary[repo_name] = {"get_repo_data": f"{type(e).__name__}: {e}"}
+                print(f"{repo_name}: failed: {e}")
+                logging.error(f"{repo_name}: failed: {e}")
+            if executor == "process":
+                # Files written by a worker process are not in this catalog yet.
+                catalog.refresh_dir(Path(fetcher.save_path, repo_name.split("/")[-1]))
+            fetcher.telemetry.repo_done()
+    return summary
+
+
+def print_fetch_summary(summary: Dict[str, Dict[str, str]]) -> None:
+    """Prints and logs one consolidated summary of a fetch run.
+
+    Args:
+        summary (Dict[str, Dict[str, str]]): Status of each feature fetcher per repository.
+    """
+    failed = {
+        repo_name: {
+            fetcher: state for fetcher, state in status.items() if state != "ok"
+        }
+        for repo_name, status in summary.items()
+        if any(state != "ok" for state in status.values())
+    }
+    print("#" * 25)
+    print(f"Repositories fetched: {len(summary) - len(failed)} / {len(summary)}")
+    logging.info(f"Repositories fetched: {len(summary) - len(failed)} / {len(summary)}")
+    for repo_name, errors in failed.items():
+        for fetcher, error in errors.items():
+            print(f"  {repo_name} {fetcher}: {error}")
+            logging.info(f"Failed {repo_name} {fetcher}: {error}")
+    print("#" * 25)
+
+
+def run_fetch(
+    cfg: ReposConfig, tokens: Optional[List[str]] = None
+) -> Dict[str, Dict[str, str]]:
+    """Fetches the data of all repositories listed in the configured repos file.
+
+    Args:
+        cfg (ReposConfig): Configuration of the run.
+        tokens (Optional[List[str]], optional): GitHub access tokens. Defaults to
+                                                the tokens of the .env file.
+
+    Raises:
+        ValueError: If the fetch engine is unknown.
+
+    Returns:
+        Dict[str, Dict[str, str]]: Status of each feature fetcher per repository.
+    """
     repos, save_path = utils.set_path(cfg.repos.repos_dir, cfg.paths.raw_data)
+    catalog.configure(cfg.catalog.enabled, cfg.catalog.manifest, cfg.catalog.verify)
 
-    repo_data_fetch = RepoDataFetcher(repos, save_path)
+    cache = None
+    if cfg.fetch.cache_dir:
+        cache = ResponseCache(
+            Path(cfg.fetch.cache_dir),
+            max_bytes=cfg.fetch.cache_max_mb * 1024 * 1024,
+            max_age=cfg.fetch.cache_max_age_days * 24 * 3600,
+        )
 
     df = pd.read_csv(repos)
-    for index, repo_name in enumerate(df["repo_name"]):
-        repo_data_fetch.get_repo_data(repo_name)
-        print("Processing....")
+    telemetry = FetchTelemetry(cfg.fetch.progress_seconds, total_repos=len(df))
+    repo_data_fetch = RepoDataFetcher(
+        repos,
+        save_path,
+        feature_workers=cfg.fetch.feature_workers,
+        tokens=tokens,
+        api_url=cfg.fetch.api_url,
+        pool_size=cfg.fetch.pool_size,
+        batch_size=cfg.fetch.batch_size,
+        prefetch_pages=cfg.fetch.prefetch_pages,
+        backend=cfg.fetch.backend,
+        sync_mode=cfg.fetch.sync_mode,
+        checkpoint_pages=cfg.fetch.checkpoint_pages,
+        cache=cache,
+        min_remaining=cfg.fetch.min_remaining,
+        file_format=cfg.storage.format,
+        telemetry=telemetry,
+    )
+    catalog.open_catalog(repo_data_fetch.create_repos_dir())
+
+    if cfg.fetch.engine == "async":
+        # Imported here as async_fetch builds on this module.
+        from async_fetch import AsyncRepoDataFetcher
+
+        async_fetch = AsyncRepoDataFetcher(repo_data_fetch, cfg.fetch.concurrency)
+        summary = asyncio.run(
+            async_fetch.fetch_repos(list(df["repo_name"]), workers=cfg.fetch.workers)
+        )
+    elif cfg.fetch.engine == "sync":
+        summary = fetch_repos(
+            repo_data_fetch,
+            list(df["repo_name"]),
+            workers=cfg.fetch.workers,
+            executor=cfg.fetch.executor,
+        )
+    else:
+        raise ValueError(f"Unknown engine: {cfg.fetch.engine!r}, use 'sync' or 'async'")
+    repo_data_fetch.client_pool.close()
+    catalog.save_catalogs()
+    print_fetch_summary(summary)
+    print(repo_data_fetch.client_pool.scheduler.report())
+    logging.info(repo_data_fetch.client_pool.scheduler.report())
+    if cache is not None:
+        cache.evict()
+        print(cache.report())
+        logging.info(cache.report())
+    telemetry.progress(force=True)
+    if cfg.fetch.metrics_dir:
+        metrics_file = telemetry.save(
+            Path(cfg.fetch.metrics_dir),
+            {"rate_limit": repo_data_fetch.client_pool.scheduler.stats},
+        )
+        print(f"Fetch metrics are saved in {metrics_file}")
+        logging.info(f"Fetch metrics are saved in {metrics_file}")
+    return summary
+
+
+@hydra.main(config_path="conf", config_name="config", version_base=None)
+def main(cfg: ReposConfig):
+    run_fetch(cfg)
     print("All repository are processed.")
     logging.info("All repository are processed.")
 
+
 if __name__ == "__main__":
     main()
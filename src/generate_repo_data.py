@@ -0,0 +1,378 @@
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List
+
+import hydra
+import numpy as np
+import pandas as pd
+from hydra.core.config_store import ConfigStore
+
+import storage
+from config import ReposConfig
+
+cs = ConfigStore.instance()
+cs.store(name="repo_config", node=ReposConfig)
+
+# Lists of a repository and their record count field.
+HISTORIES = ("commits", "stars", "forks", "issues", "watchers", "contributors")
+SIZE_DISTRIBUTIONS = ("fixed", "lognormal")
+# Spread of the lognormal repository sizes; a few repositories get most records.
+SIZE_SIGMA = 1.0
+LANGUAGES = ("Python", "JavaScript", "TypeScript", "Java", "Go", "C++", "Rust", "Ruby")
+
+
+@dataclass
+class SyntheticRepo:
+    """Size and activity period of a synthetic repository."""
+
+    full_name: str
+    created_at: pd.Timestamp
+    pushed_at: pd.Timestamp
+    commits: int
+    stars: int
+    forks: int
+    issues: int
+    watchers: int
+    contributors: int
+
+
+def repo_sizes(
+    count: int, mean: int, distribution: str, rng: np.random.Generator
+) -> np.ndarray:
+    """Returns the record counts of a history for ``count`` repositories.
+
+    Args:
+        count (int): Number of repositories.
+        mean (int): Mean number of records per repository.
+        distribution (str): "fixed" gives every repository ``mean`` records,
+                            "lognormal" heavy tailed sizes with that mean.
+        rng (np.random.Generator): Random generator.
+
+    Raises:
+        ValueError: If the distribution is unknown.
+
+    Returns:
+        np.ndarray: Number of records of each repository, at least one.
+    """
+    if distribution == "fixed":
+        return np.full(count, max(mean, 1))
+    if distribution == "lognormal":
+        sizes = mean * rng.lognormal(-(SIZE_SIGMA**2) / 2, SIZE_SIGMA, count)
+        return np.maximum(np.rint(sizes).astype(np.int64), 1)
+    raise ValueError(
+        f"Unknown size distribution: {distribution!r}, use one of {list(SIZE_DISTRIBUTIONS)}"
+    )
+
+
+def plan_repos(
+    count: int,
+    sizes: Dict[str, int],
+    distribution: str = "lognormal",
+    inactive: float = 0.3,
+    start: str = "2012-01-01",
+    end: str = "2022-08-01",
+    seed: int = 0,
+) -> List[SyntheticRepo]:
+    """Draws the sizes and activity periods of synthetic repositories.
+
+    Args:
+        count (int): Number of repositories.
+        sizes (Dict[str, int]): Mean number of records of each history, e.g.
+                                {"commits": 5000, ...}.
+        distribution (str, optional): "fixed" or "lognormal" sizes. Defaults to "lognormal".
+        inactive (float, optional): Share of repositories whose last push lies more
+                                    than a year before ``end``. Defaults to 0.3.
+        start (str, optional): Earliest creation date. Defaults to "2012-01-01".
+        end (str, optional): Date of the data snapshot. Defaults to "2022-08-01".
+        seed (int, optional): Random seed. Defaults to 0.
+
+    Returns:
+        List[SyntheticRepo]: Planned repositories.
+    """
+    rng = np.random.default_rng(seed)
+    start, end = pd.Timestamp(start), pd.Timestamp(end)
+    span = (end - start).total_seconds()
+
+    counts = {
+        name: repo_sizes(count, sizes[name], distribution, rng) for name in HISTORIES
+    }
+    # Repositories are created during the first 80% of the period.
+    created = start + pd.to_timedelta(rng.random(count) * 0.8 * span, unit="s")
+    # Active repositories were pushed in the last month, inactive ones stopped
+    # between their creation and a year before the snapshot.
+    stopped = rng.random(count) < inactive
+    last_year = end - pd.Timedelta(days=365)
+    pushed = end - pd.to_timedelta(rng.random(count) * 30, unit="D")
+    stop_span = np.maximum((last_year - created).total_seconds(), 0)
+    stopped_at = created + pd.to_timedelta(rng.random(count) * stop_span, unit="s")
+    pushed = pushed.where(~stopped, stopped_at)
+
+    return [
+        SyntheticRepo(
+            f"synthetic{index % 100}/repo{index:05d}",
+            created[index].floor("s"),
+            max(pushed[index], created[index]).floor("s"),
+            **{name: int(counts[name][index]) for name in HISTORIES},
+        )
+        for index in range(count)
+    ]
+
+
+def random_dates(
+    rng: np.random.Generator,
+    count: int,
+    start: pd.Timestamp,
+    end: pd.Timestamp,
+    growth: float = 0.0,
+) -> pd.DatetimeIndex:
+    """Returns ``count`` sorted random dates between two dates.
+
+    Args:
+        rng (np.random.Generator): Random generator.
+        count (int): Number of dates.
+        start (pd.Timestamp): Earliest date.
+        end (pd.Timestamp): Latest date.
+        growth (float, optional): Values above 0 make later dates more frequent,
+                                  like the stars of a growing project. Defaults to 0.0.
+
+    Returns:
+        pd.DatetimeIndex: Dates to the second.
+    """
+    offsets = rng.random(count)
+    if growth:
+        offsets = offsets ** (1 / (1 + growth))
+    offsets.sort()
+    seconds = (offsets * (end - start).total_seconds()).astype(np.int64)
+    return start + pd.to_timedelta(seconds, unit="s")
+
+
+def generate_repo(
+    repo: SyntheticRepo,
+    raw_data_dir: Path,
+    end: str = "2022-08-01",
+    seed: int = 0,
+    file_format: str = "csv",
+) -> Path:
+    """Writes the raw data files of a synthetic repository.
+
+    The files have the columns written by the ``RepoDataFetcher``, so the
+    preprocessing reads them like fetched repositories.
+
+    Args:
+        repo (SyntheticRepo): Planned repository.
+        raw_data_dir (Path): Directory of the raw repository data.
+        end (str, optional): Date of the data snapshot. Defaults to "2022-08-01".
+        seed (int, optional): Random seed. Defaults to 0.
+        file_format (str, optional): "csv" or "parquet". Defaults to "csv".
+
+    Returns:
+        Path: Directory of the repository files.
+    """
+    suffix = storage.check_format(file_format)
+    repo_name = repo.full_name
+    owner, name = repo_name.split("/")
+    # One generator per repository, so the data does not depend on the workers.
+    rng = np.random.default_rng([seed, int(name[len("repo") :])])
+    end = pd.Timestamp(end)
+    created, pushed = repo.created_at, repo.pushed_at
+    repo_dir = Path(raw_data_dir, name)
+    repo_dir.mkdir(parents=True, exist_ok=True)
+
+    def write(stem: str, data: Dict[str, object]) -> None:
+        storage.write_table(pd.DataFrame(data), (repo_dir / stem).with_suffix(suffix))
+
+    def hexes(count: int, digits: int) -> List[str]:
+        values = rng.integers(0, 2**62, size=(count, 3))
+        return [f"{a:016x}{b:016x}{c:016x}"[:digits] for a, b, c in values]
+
+    commit_dates = random_dates(rng, repo.commits, created, pushed)[::-1]
+    write(
+        "commits",
+        {
+            "repo_name": repo_name,
+            "commit_count": repo.commits,
+            "commit_sha": [f'Commit(sha="{sha}")' for sha in hexes(repo.commits, 40)],
+            "commit_date": commit_dates,
+        },
+    )
+
+    opened = random_dates(rng, repo.issues, created, end)[::-1]
+    open_days = pd.to_timedelta(rng.exponential(30, repo.issues), unit="D")
+    closed = pd.Series(opened + open_days).where(
+        (rng.random(repo.issues) < 0.7) & (opened + open_days < end)
+    )
+    updated = closed.fillna(
+        pd.Series(opened + pd.to_timedelta(rng.random(repo.issues) * 90, unit="D"))
+    ).clip(upper=end)
+    write(
+        "issues_pulls",
+        {
+            "repo_name": repo_name,
+            "issue_pull": np.where(
+                rng.random(repo.issues) < 0.5, "pull request", "Issue"
+            ),
+            "pr_iss_number": np.arange(repo.issues, 0, -1),
+            "pr_iss_state": np.where(closed.isna(), "open", "closed"),
+            "pr_iss_opened_at": opened,
+            "pr_iss_updated_at": updated.dt.floor("s"),
+            "pr_iss_closed_at": closed.dt.floor("s"),
+        },
+    )
+
+    write(
+        "forks",
+        {
+            "repo_name": repo_name,
+            "fork_count": repo.forks,
+            "forked_user": [f"user{user}/{name}" for user in hexes(repo.forks, 8)],
+            "forked_at": random_dates(rng, repo.forks, created, end, growth=1.0)[::-1],
+        },
+    )
+    star_dates = random_dates(rng, repo.stars, created, end, growth=1.0)
+    write(
+        "stargazer",
+        {
+            "repo_name": repo_name,
+            "starred_user": [f"user{user}" for user in hexes(repo.stars, 8)],
+            "starred_at": star_dates,
+        },
+    )
+
+    # Watchers and contributors carry the creation date of their account.
+    account_start = created - pd.Timedelta(days=3650)
+    watchers = [f"user{user}" for user in hexes(repo.watchers, 8)]
+    write(
+        "watchers",
+        {
+            "repo_name": repo_name,
+            "watchers_count": repo.stars,
+            "subscribers_count": repo.watchers,
+            "subscriber": [f'NamedUser(login="{login}")' for login in watchers],
+            "subscriber_username": watchers,
+            "subscribed_at": random_dates(rng, repo.watchers, account_start, end),
+        },
+    )
+    write(
+        "Contributors",
+        {
+            "repo_name": repo_name,
+            "contributors_count": repo.contributors,
+            "contributor": [f"user{user}" for user in hexes(repo.contributors, 8)],
+            "contributed_date": random_dates(
+                rng, repo.contributors, account_start, pushed
+            ),
+        },
+    )
+
+    # Stars keep updating a repository after its last push.
+    last_update = max(pushed, star_dates[-1])
+    write(
+        "repo_data",
+        {
+            "repo_name": [repo_name],
+            "discription": f"Synthetic repository {name}",
+            "language": LANGUAGES[rng.integers(len(LANGUAGES))],
+            "user_Name": owner,
+            "created_at": created,
+            "pushed_at": pushed,
+            "last_update_at": last_update,
+            "stars": repo.stars,
+            "size": int(rng.integers(100, 100_000)),
+            "repo_url": f"https://api.github.com/repos/{repo_name}",
+            "repo_html_url": f"https://github.com/{repo_name}",
+            "branch_count": int(rng.integers(1, 50)),
+            "milestone_count": int(rng.integers(0, 20)),
+            "pullrequest_count": repo.issues // 2,
+            "release_count": int(rng.integers(0, 100)),
+            "workflow_count": int(rng.integers(0, 10)),
+            "issues_count": repo.issues,
+            "watchers_count": repo.stars,
+            "subscribers_count": repo.watchers,
+            "has_wiki": bool(rng.random() < 0.5),
+            "has_pages": bool(rng.random() < 0.2),
+            "has_projects": bool(rng.random() < 0.5),
+            "has_downloads": True,
+        },
+    )
+    return repo_dir
+
+
+def generate_raw_data(
+    raw_data_dir: Path,
+    count: int,
+    sizes: Dict[str, int],
+    distribution: str = "lognormal",
+    inactive: float = 0.3,
+    start: str = "2012-01-01",
+    end: str = "2022-08-01",
+    seed: int = 0,
+    file_format: str = "csv",
+    workers: int = 1,
+) -> List[SyntheticRepo]:
+    """Writes a raw data tree of synthetic repositories.
+
+    Args:
+        raw_data_dir (Path): Directory of the raw repository data.
+        count (int): Number of repositories.
+        sizes (Dict[str, int]): Mean number of records of each history.
+        distribution (str, optional): "fixed" or "lognormal" sizes. Defaults to "lognormal".
+        inactive (float, optional): Share of inactive repositories. Defaults to 0.3.
+        start (str, optional): Earliest creation date. Defaults to "2012-01-01".
+        end (str, optional): Date of the data snapshot. Defaults to "2022-08-01".
+        seed (int, optional): Random seed. Defaults to 0.
+        file_format (str, optional): "csv" or "parquet". Defaults to "csv".
+        workers (int, optional): Processes writing repositories at once. Defaults to 1.
+
+    Returns:
+        List[SyntheticRepo]: Generated repositories.
+    """
+    storage.check_format(file_format)
+    repos = plan_repos(count, sizes, distribution, inactive, start, end, seed)
+    args = (
+        repos,
+        [raw_data_dir] * count,
+        [end] * count,
+        [seed] * count,
+        [file_format] * count,
+    )
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            list(
+                executor.map(
+                    generate_repo, *args, chunksize=max(1, count // (workers * 4))
+                )
+            )
+    else:
+        list(map(generate_repo, *args))
+    return repos
+
+
+def synthetic_sizes(cfg: ReposConfig) -> Dict[str, int]:
+    """Returns the mean history sizes of the ``synthetic`` config section."""
+    return {name: cfg.synthetic[name] for name in HISTORIES}
+
+
+@hydra.main(config_path="conf", config_name="config", version_base=None)
+def main(cfg: ReposConfig):
+    synthetic = cfg.synthetic
+    raw_data_dir = Path(synthetic.output_dir)
+    print(f"Generating {synthetic.repos} repositories in {raw_data_dir} ...")
+    repos = generate_raw_data(
+        raw_data_dir,
+        synthetic.repos,
+        synthetic_sizes(cfg),
+        synthetic.sizes,
+        synthetic.inactive,
+        synthetic.start,
+        synthetic.end,
+        synthetic.seed,
+        cfg.storage.format,
+        synthetic.workers,
+    )
+    records = sum(getattr(repo, name) for repo in repos for name in HISTORIES)
+    print(f"--- {len(repos)} repositories with {records} records are generated. ---")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+import threading
+from typing import Dict, List, Optional
+
+from dotenv import dotenv_values
+from github import Github
+
+from http_cache import ResponseCache, install_cache
+from rate_limit import RateLimitScheduler, install_rate_limiter, token_key
+from telemetry import FetchTelemetry
+
+DEFAULT_API_URL = "https://api.github.com"
+
+
+def load_tokens(env_file: str = ".env") -> List[str]:
+    """Reads the GitHub access tokens from the environment file.
+
+    ``TOKENS`` holds a comma separated list of tokens, ``TOKEN`` a single one.
+    Both are used if present.
+
+    Args:
+        env_file (str, optional): Path of the environment file. Defaults to ".env".
+
+    Returns:
+        List[str]: Unique, non-empty access tokens.
+    """
+    env = dotenv_values(env_file)
+    tokens = (env.get("TOKENS") or "").split(",") + [env.get("TOKEN") or ""]
+    tokens = [token.strip() for token in tokens if token and not token.isspace()]
+    return list(dict.fromkeys(tokens))
+
+
+class GithubClientPool:
+    """Long-lived GitHub clients, one per access token and thread.
+
+    PyGithub sends the requests of a client through one connection object,
+    which is not thread-safe, so every thread builds its own clients on first
+    use. Each client keeps its HTTP connection pool alive for the lifetime of
+    the pool, and ``get_client`` hands out the client whose token has the
+    most remaining requests, so N tokens give N x 5000 requests per hour.
+    All requests go through one ``RateLimitScheduler``.
+    """
+
+    def __init__(
+        self,
+        tokens: List[str],
+        api_url: str = DEFAULT_API_URL,
+        pool_size: int = 10,
+        timeout: int = 10,
+        retry: int = 50,
+        per_page: int = 100,
+        cache: Optional[ResponseCache] = None,
+        scheduler: Optional[RateLimitScheduler] = None,
+        telemetry: Optional[FetchTelemetry] = None,
+    ) -> None:
+        """Initialization of the GithubClientPool class.
+
+        Args:
+            tokens (List[str]): GitHub access tokens. An empty list gives one
+                                unauthenticated client (60 requests per hour).
+            api_url (str, optional): Base URL of the GitHub API. Defaults to DEFAULT_API_URL.
+            pool_size (int, optional): HTTP keep-alive connections per client. Defaults to 10.
+            timeout (int, optional): Request timeout in seconds. Defaults to 10.
+            retry (int, optional): Number of retries of a failed request. Defaults to 50.
+            per_page (int, optional): Items per page of paginated lists. Defaults to 100.
+            cache (Optional[ResponseCache], optional): Cache for conditional GET requests.
+                                                       Defaults to None.
+            scheduler (Optional[RateLimitScheduler], optional): Rate-limit scheduler
+                                                                shared by the clients.
+                                                                Defaults to a new one.
+            telemetry (Optional[FetchTelemetry], optional): Counters of the requests.
+                                                            Defaults to None.
+        """
+        if not tokens:
+            print(
+                "Tip: A GitHub access token has not been provided. Get the  \
+                access token from GitHub to get more requests from users to the \
+                the server (i.e. 5000 requests per hour instead of 60)."
+            )
+        self.tokens = list(tokens) or [None]
+        self.api_url = api_url
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.retry = retry
+        self.per_page = per_page
+        self.cache = cache
+        self.scheduler = scheduler if scheduler is not None else RateLimitScheduler()
+        self.telemetry = telemetry
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        # Clients of all threads, to close them.
+        self._all_clients: List[Github] = []
+
+    def __getstate__(self) -> dict:
+        # Clients hold sockets and locks; a process pool worker builds its own.
+        state = self.__dict__.copy()
+        state["_all_clients"] = []
+        del state["_lock"], state["_local"]
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def __len__(self) -> int:
+        return len(self.tokens)
+
+    @property
+    def clients(self) -> Dict[Optional[str], Github]:
+        """Clients of the calling thread by token, built once on first use."""
+        clients = getattr(self._local, "clients", None)
+        if clients is None:
+            clients = self._local.clients = {
+                token: Github(
+                    token,
+                    base_url=self.api_url,
+                    timeout=self.timeout,
+                    retry=self.retry,
+                    per_page=self.per_page,
+                    pool_size=self.pool_size,
+                    # Requests are paced by the rate-limit scheduler only.
+                    seconds_between_requests=None,
+                    seconds_between_writes=None,
+                )
+                for token in self.tokens
+            }
+            for token, client in clients.items():
+                if self.cache is not None:
+                    install_cache(client, self.cache)
+                install_rate_limiter(client, self.scheduler, token, self.telemetry)
+            with self._lock:
+                self._all_clients.extend(clients.values())
+        return clients
+
+    def get_client(self) -> Github:
+        """Returns the client whose token has the most remaining requests.
+
+        Returns:
+            Github: GitHub Authorized User.
+        """
+        clients = self.clients
+        if len(clients) == 1:
+            return next(iter(clients.values()))
+        token = max(
+            clients, key=lambda token: self.scheduler.remaining(token_key(token))
+        )
+        return clients[token]
+
+    def close(self) -> None:
+        """Closes the HTTP connections of the clients of all threads."""
+        with self._lock:
+            for client in self._all_clients:
+                client.close()
+            self._all_clients = []
+        self._local = threading.local()
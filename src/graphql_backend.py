@@ -0,0 +1,409 @@
+import itertools
+import threading
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+import pandas as pd
+import requests
+
+from github_client import DEFAULT_API_URL
+from rate_limit import RateLimitScheduler, token_key
+from telemetry import FetchTelemetry
+
+ISSUES_QUERY = """
+query($owner: String!, $name: String!, $first: Int!, $after: String, $order: IssueOrder) {
+  repository(owner: $owner, name: $name) {
+    items: %s(first: $first, after: $after, orderBy: $order) {
+      totalCount
+      pageInfo { hasNextPage endCursor }
+      nodes { number state createdAt updatedAt closedAt }
+    }
+  }
+}
+"""
+
+FORKS_QUERY = """
+query($owner: String!, $name: String!, $first: Int!, $after: String, $order: RepositoryOrder) {
+  repository(owner: $owner, name: $name) {
+    items: forks(first: $first, after: $after, orderBy: $order) {
+      totalCount
+      pageInfo { hasNextPage endCursor }
+      nodes { nameWithOwner createdAt }
+    }
+  }
+}
+"""
+
+STARGAZERS_QUERY = """
+query($owner: String!, $name: String!, $first: Int!, $after: String, $order: StarOrder) {
+  repository(owner: $owner, name: $name) {
+    items: stargazers(first: $first, after: $after, orderBy: $order) {
+      totalCount
+      pageInfo { hasNextPage endCursor }
+      edges { starredAt node { login } }
+    }
+  }
+}
+"""
+
+
+class GraphQLError(Exception):
+    """Exception raised when the GitHub GraphQL API returns errors"""
+
+    pass
+
+
+def graphql_url(api_url: str) -> str:
+    """Returns the GraphQL endpoint belonging to a REST API base URL.
+
+    Args:
+        api_url (str): Base URL of the GitHub REST API.
+
+    Returns:
+        str: URL of the GraphQL endpoint.
+    """
+    api_url = api_url.rstrip("/")
+    if api_url.endswith("/api/v3"):
+        # GitHub Enterprise serves GraphQL under /api/graphql.
+        return api_url[: -len("/v3")] + "/graphql"
+    return f"{api_url}/graphql"
+
+
+def to_timestamp(value: Optional[str]) -> Optional[pd.Timestamp]:
+    """Converts a GraphQL ISO-8601 date to a timestamp (None stays None)."""
+    return pd.to_datetime(value) if value else None
+
+
+def newest_first(field: str) -> Dict[str, str]:
+    """Returns a GraphQL ``orderBy`` argument sorting by a field, newest first."""
+    return {"field": field, "direction": "DESC"}
+
+
+class GraphQLFetcher:
+    """Fetches repository histories through the GitHub GraphQL API.
+
+    Only the fields written to the CSV files are requested, so a page of
+    issues or stargazers costs a fraction of the bytes of the REST objects.
+    Pages are requested with cursors and yield records with the same columns
+    as the REST fetchers of ``RepoDataFetcher``.
+    """
+
+    def __init__(
+        self,
+        tokens: List[str],
+        api_url: str = DEFAULT_API_URL,
+        per_page: int = 100,
+        timeout: int = 10,
+        scheduler: Optional[RateLimitScheduler] = None,
+        telemetry: Optional[FetchTelemetry] = None,
+    ) -> None:
+        """Initialization of the GraphQLFetcher class.
+
+        Args:
+            tokens (List[str]): GitHub access tokens (GraphQL requires at least one).
+            api_url (str, optional): Base URL of the GitHub REST API. Defaults to DEFAULT_API_URL.
+            per_page (int, optional): Items per page (at most 100). Defaults to 100.
+            timeout (int, optional): Request timeout in seconds. Defaults to 10.
+            scheduler (Optional[RateLimitScheduler], optional): Rate-limit scheduler
+                                                                shared with the REST
+                                                                clients. Defaults to a
+                                                                new one.
+            telemetry (Optional[FetchTelemetry], optional): Counters of the requests.
+                                                            Defaults to None.
+        """
+        if not tokens:
+            raise GraphQLError("The GraphQL API requires a GitHub access token.")
+        self.tokens = list(tokens)
+        self.url = graphql_url(api_url)
+        self.per_page = min(per_page, 100)
+        self.timeout = timeout
+        self.scheduler = scheduler if scheduler is not None else RateLimitScheduler()
+        self.telemetry = telemetry
+        self._lock = threading.Lock()
+        self._token_cycle = itertools.cycle(self.tokens)
+        self._session: Optional[requests.Session] = None
+
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        for attr in ("_lock", "_token_cycle", "_session"):
+            del state[attr]
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+        self._token_cycle = itertools.cycle(self.tokens)
+        self._session = None
+
+    @property
+    def session(self) -> requests.Session:
+        """Keep-alive HTTP session, created on first use."""
+        with self._lock:
+            if self._session is None:
+                self._session = requests.Session()
+            return self._session
+
+    def next_token(self) -> str:
+        """Returns the next token in round-robin order."""
+        with self._lock:
+            return next(self._token_cycle)
+
+    def query(self, query: str, variables: Dict[str, Any]) -> Dict[str, Any]:
+        """Runs one GraphQL query.
+
+        Args:
+            query (str): GraphQL query document.
+            variables (Dict[str, Any]): Query variables.
+
+        Raises:
+            GraphQLError: If the response contains errors.
+
+        Returns:
+            Dict[str, Any]: The ``data`` member of the response.
+        """
+        token = self.next_token()
+        key = token_key(token)
+        attempt = 0
+        repo = variables.get("name")
+        while True:
+            waited = self.scheduler.acquire(key, "graphql")
+            start = time.perf_counter()
+            response = self.session.post(
+                self.url,
+                json={"query": query, "variables": variables},
+                headers={"Authorization": f"bearer {token}"},
+                timeout=self.timeout,
+            )
+            if self.telemetry is not None:
+                if waited:
+                    self.telemetry.record_wait(self.url, waited, repo)
+                self.telemetry.record_request(
+                    self.url,
+                    response.status_code,
+                    time.perf_counter() - start,
+                    len(response.content),
+                    repo,
+                )
+            headers = {k.lower(): v for k, v in response.headers.items()}
+            wait = self.scheduler.retry_after(
+                key, "graphql", response.status_code, headers, response.text, attempt
+            )
+            if wait is None:
+                break
+            self.scheduler.sleep(wait)
+            if self.telemetry is not None:
+                self.telemetry.record_wait(self.url, wait, repo)
+            attempt += 1
+        response.raise_for_status()
+        body = response.json()
+        if body.get("errors"):
+            raise GraphQLError(body["errors"])
+        return body["data"]
+
+    def iter_connection(
+        self,
+        query: str,
+        repo_name: str,
+        after: Optional[str] = None,
+        order: Optional[Dict[str, str]] = None,
+    ) -> Iterator[Tuple[Optional[str], Dict[str, Any]]]:
+        """Pages through a repository connection with cursors.
+
+        Args:
+            query (str): Query selecting the connection under the alias ``items``.
+            repo_name (str): Repository's full name.
+            after (Optional[str], optional): Cursor to start after. Defaults to None.
+            order (Optional[Dict[str, str]], optional): ``orderBy`` argument of the
+                                                        connection. Defaults to None.
+
+        Yields:
+            Iterator[Tuple[Optional[str], Dict[str, Any]]]: Cursor to continue after the
+                                                            page and the connection of
+                                                            the page.
+        """
+        owner, name = repo_name.split("/")
+        while True:
+            variables = {
+                "owner": owner,
+                "name": name,
+                "first": self.per_page,
+                "after": after,
+                "order": order,
+            }
+            connection = self.query(query, variables)["repository"]["items"]
+            page_info = connection["pageInfo"]
+            yield page_info["endCursor"], connection
+            if not page_info["hasNextPage"]:
+                return
+            after = page_info["endCursor"]
+
+    def iter_newer_pages(
+        self,
+        query: str,
+        repo_name: str,
+        items: str,
+        date_of: Callable[[Dict[str, Any]], str],
+        since: Optional[pd.Timestamp],
+        order_field: str,
+        after: Optional[str] = None,
+    ) -> Iterator[Tuple[Optional[str], Dict[str, Any], List[Dict[str, Any]]]]:
+        """Pages through a connection, stopping at items older than ``since``.
+
+        Without ``since`` the whole connection is returned in its default order.
+        With ``since`` it is sorted newest first and only items at or after
+        ``since`` are returned.
+
+        Args:
+            query (str): Query selecting the connection under the alias ``items``.
+            repo_name (str): Repository's full name.
+            items (str): Member of the connection holding the items ("nodes" or "edges").
+            date_of (Callable[[Dict[str, Any]], str]): Returns the ISO-8601 date of an item.
+            since (Optional[pd.Timestamp]): Oldest date to return.
+            order_field (str): Field the connection is sorted by when ``since`` is given.
+            after (Optional[str], optional): Cursor to start after. Defaults to None.
+
+        Yields:
+            Iterator[Tuple[Optional[str], Dict[str, Any], List[Dict[str, Any]]]]:
+                Cursor, connection and the returned items of a page.
+        """
+        order = newest_first(order_field) if since is not None else None
+        for cursor, connection in self.iter_connection(
+            query, repo_name, after=after, order=order
+        ):
+            page_items = connection[items]
+            if since is None:
+                yield cursor, connection, page_items
+                continue
+            newer = [
+                item for item in page_items if to_timestamp(date_of(item)) >= since
+            ]
+            if newer:
+                yield cursor, connection, newer
+            if len(newer) < len(page_items):
+                return
+
+    def iter_issues_pulls_pages(
+        self,
+        repo_name: str,
+        since: Optional[pd.Timestamp] = None,
+        start: Optional[List[Any]] = None,
+    ) -> Iterator[Tuple[List[Any], List[Dict[str, Any]]]]:
+        """Yields pages of issue and pull request records.
+
+        Args:
+            repo_name (str): Repository's full name.
+            since (Optional[pd.Timestamp], optional): Only return issues and pull
+                                                      requests updated at or after
+                                                      this date. Defaults to None.
+            start (Optional[List[Any]], optional): Position to resume from, as
+                                                   yielded with a page. Defaults to None.
+
+        Yields:
+            Iterator[Tuple[List[Any], List[Dict[str, Any]]]]: Position to continue after
+                                                              the page (connection index
+                                                              and cursor) and its records.
+        """
+        start_index, after = start if start is not None else (0, None)
+        connections = (("issues", "Issue"), ("pullRequests", "pull request"))
+        for index, (connection_name, issue_pull) in enumerate(connections):
+            if index < start_index:
+                continue
+            query = ISSUES_QUERY % connection_name
+            for cursor, _, nodes in self.iter_newer_pages(
+                query,
+                repo_name,
+                "nodes",
+                lambda node: node["updatedAt"],
+                since,
+                "UPDATED_AT",
+                after if index == start_index else None,
+            ):
+                yield [index, cursor], [
+                    {
+                        "repo_name": repo_name,
+                        "issue_pull": issue_pull,
+                        "pr_iss_number": node["number"],
+                        # REST reports merged pull requests as closed.
+                        "pr_iss_state": "open" if node["state"] == "OPEN" else "closed",
+                        "pr_iss_opened_at": to_timestamp(node["createdAt"]),
+                        "pr_iss_updated_at": to_timestamp(node["updatedAt"]),
+                        "pr_iss_closed_at": to_timestamp(node["closedAt"]),
+                    }
+                    for node in nodes
+                ]
+
+    def iter_forks_pages(
+        self,
+        repo_name: str,
+        since: Optional[pd.Timestamp] = None,
+        start: Optional[str] = None,
+    ) -> Iterator[Tuple[Optional[str], List[Dict[str, Any]]]]:
+        """Yields pages of fork records.
+
+        Args:
+            repo_name (str): Repository's full name.
+            since (Optional[pd.Timestamp], optional): Only return forks created after
+                                                      this date. Defaults to None.
+            start (Optional[str], optional): Cursor to resume after. Defaults to None.
+
+        Yields:
+            Iterator[Tuple[Optional[str], List[Dict[str, Any]]]]: Cursor to continue after
+                                                                  the page and its records.
+        """
+        for cursor, connection, nodes in self.iter_newer_pages(
+            FORKS_QUERY,
+            repo_name,
+            "nodes",
+            lambda node: node["createdAt"],
+            since,
+            "CREATED_AT",
+            start,
+        ):
+            yield cursor, [
+                {
+                    "repo_name": repo_name,
+                    "fork_count": connection["totalCount"],
+                    "forked_user": node["nameWithOwner"],
+                    "forked_at": to_timestamp(node["createdAt"]),
+                }
+                for node in nodes
+                if since is None or to_timestamp(node["createdAt"]) > since
+            ]
+
+    def iter_stargazers_pages(
+        self,
+        repo_name: str,
+        since: Optional[pd.Timestamp] = None,
+        start: Optional[str] = None,
+    ) -> Iterator[Tuple[Optional[str], List[Dict[str, Any]]]]:
+        """Yields pages of stargazer records.
+
+        Args:
+            repo_name (str): Repository's full name.
+            since (Optional[pd.Timestamp], optional): Only return stars given after
+                                                      this date. Defaults to None.
+            start (Optional[str], optional): Cursor to resume after. Defaults to None.
+
+        Yields:
+            Iterator[Tuple[Optional[str], List[Dict[str, Any]]]]: Cursor to continue after
+                                                                  the page and its records.
+        """
+        for cursor, _, edges in self.iter_newer_pages(
+            STARGAZERS_QUERY,
+            repo_name,
+            "edges",
+            lambda edge: edge["starredAt"],
+            since,
+            "STARRED_AT",
+            start,
+        ):
+            yield cursor, [
+                {
+                    "repo_name": repo_name,
+                    # Written like the REST fetchers write PyGithub's NamedUser.
+                    "starred_user": f'NamedUser(login="{edge["node"]["login"]}")',
+                    "starred_at": to_timestamp(edge["starredAt"]),
+                }
+                for edge in edges
+                if since is None or to_timestamp(edge["starredAt"]) > since
+            ]
@@ -0,0 +1,260 @@
+import hashlib
+import json
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, ItemsView, Optional, Type
+
+from github import Github
+from github.Requester import HTTPRequestsConnectionClass, HTTPSRequestsConnectionClass
+
+
+class ResponseCache:
+    """Persistent on-disk cache of GitHub GET responses.
+
+    Every cached response keeps its ``ETag``/``Last-Modified`` validators, so
+    that a repeated request can be sent as a conditional request. GitHub
+    answers unchanged resources with ``304 Not Modified``, which does not
+    count against the rate limit, and the body is then served from disk.
+    Entries are keyed by URL and token, and evicted by age and total size.
+    """
+
+    def __init__(
+        self,
+        cache_dir: Path,
+        max_bytes: int = 1024 * 1024 * 1024,
+        max_age: float = 30 * 24 * 3600,
+    ) -> None:
+        """Initialization of the ResponseCache class.
+
+        Args:
+            cache_dir (Path): Directory of the cache entries.
+            max_bytes (int, optional): Maximum total size of the entries. Defaults to 1 GiB.
+            max_age (float, optional): Maximum age of an entry in seconds. Defaults to 30 days.
+        """
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.stats = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+        self._lock = threading.Lock()
+
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def key(self, url: str, authorization: Optional[str]) -> str:
+        """Returns the cache key of a URL requested with a token.
+
+        Args:
+            url (str): Requested URL (path and query).
+            authorization (Optional[str]): Authorization header of the request.
+
+        Returns:
+            str: Hex digest identifying the entry.
+        """
+        scope = hashlib.sha256((authorization or "").encode()).hexdigest()
+        return hashlib.sha256(f"{scope} {url}".encode()).hexdigest()
+
+    def entry_path(self, key: str) -> Path:
+        """Returns the file of a cache entry."""
+        return self.cache_dir / key[:2] / f"{key}.json"
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Returns a cache entry that is not older than ``max_age``.
+
+        Args:
+            key (str): Cache key.
+
+        Returns:
+            Optional[Dict[str, Any]]: Validators, headers and body of the response.
+        """
+        path = self.entry_path(key)
+        try:
+            if time.time() - path.stat().st_mtime > self.max_age:
+                return None
+            with open(path) as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def put(self, key: str, headers: Dict[str, str], body: str) -> None:
+        """Stores a response that carries an ``ETag`` or ``Last-Modified`` header.
+
+        Args:
+            key (str): Cache key.
+            headers (Dict[str, str]): Response headers (lower case names).
+            body (str): Response body.
+        """
+        path = self.entry_path(key)
+        path.parent.mkdir(exist_ok=True)
+        tmp_path = path.with_suffix(f".{threading.get_ident()}.tmp")
+        with open(tmp_path, "w") as f:
+            json.dump({"headers": headers, "body": body}, f)
+        tmp_path.replace(path)
+        self.count("stores")
+
+    def touch(self, key: str) -> None:
+        """Marks an entry as recently used (and revalidated)."""
+        self.entry_path(key).touch(exist_ok=True)
+
+    def count(self, stat: str) -> None:
+        """Increments one of the cache statistics."""
+        with self._lock:
+            self.stats[stat] += 1
+
+    def evict(self) -> int:
+        """Removes expired entries, then the least recently used ones until
+        the cache fits into ``max_bytes``.
+
+        Returns:
+            int: Number of removed entries.
+        """
+        now = time.time()
+        entries = []
+        removed = 0
+        for path in self.cache_dir.glob("*/*.json"):
+            stat = path.stat()
+            if now - stat.st_mtime > self.max_age:
+                path.unlink(missing_ok=True)
+                removed += 1
+            else:
+                entries.append((stat.st_mtime, stat.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+            removed += 1
+        with self._lock:
+            self.stats["evictions"] += removed
+        return removed
+
+    def hit_ratio(self) -> float:
+        """Share of the cacheable requests answered with ``304 Not Modified``."""
+        requests = self.stats["hits"] + self.stats["misses"]
+        return self.stats["hits"] / requests if requests else 0.0
+
+    def report(self) -> str:
+        """Returns a one line summary of the cache statistics."""
+        return (
+            f"HTTP cache: {self.stats['hits']} hits, {self.stats['misses']} misses "
+            f"({self.hit_ratio():.1%} hit ratio), {self.stats['stores']} stored, "
+            f"{self.stats['evictions']} evicted"
+        )
+
+
+class CachedResponse:
+    """Response served from the cache, mimicking PyGithub's ``RequestsResponse``."""
+
+    def __init__(self, headers: Dict[str, str], body: str) -> None:
+        self.status = 200
+        self.headers = headers
+        self.body = body
+
+    def getheaders(self) -> ItemsView[str, str]:
+        return self.headers.items()
+
+    def read(self) -> str:
+        return self.body
+
+
+def thread_local_attribute(name: str) -> property:
+    """Returns a property keeping an attribute of the request per thread."""
+    return property(
+        lambda self: getattr(self.thread_request, name),
+        lambda self, value: setattr(self.thread_request, name, value),
+    )
+
+
+class ThreadLocalRequest:
+    """Mixin keeping the request of a PyGithub connection per thread.
+
+    PyGithub stores the request on its persistent connection object in
+    ``request`` and sends it in ``getresponse``. Threads sharing a client, e.g.
+    the page prefetch, would overwrite each other's request in between.
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        # Request of the calling thread.
+        self.thread_request = threading.local()
+
+    verb = thread_local_attribute("verb")
+    url = thread_local_attribute("url")
+    input = thread_local_attribute("input")
+    headers = thread_local_attribute("headers")
+    stream = thread_local_attribute("stream")
+
+
+def caching_connection_class(
+    base: Type[HTTPRequestsConnectionClass], cache: ResponseCache
+) -> Type[HTTPRequestsConnectionClass]:
+    """Returns a PyGithub connection class that sends conditional requests.
+
+    Args:
+        base (Type[HTTPRequestsConnectionClass]): HTTP or HTTPS connection class.
+        cache (ResponseCache): Cache of the responses.
+
+    Returns:
+        Type[HTTPRequestsConnectionClass]: Connection class using the cache.
+    """
+
+    class CachingConnection(ThreadLocalRequest, base):
+        def getresponse(self):
+            verb, url, headers = self.verb, self.url, dict(self.headers)
+            if verb != "GET" or getattr(self.thread_request, "stream", False):
+                return super().getresponse()
+            key = cache.key(url, headers.get("Authorization"))
+            entry = cache.get(key)
+            if entry is not None:
+                if "etag" in entry["headers"]:
+                    headers["If-None-Match"] = entry["headers"]["etag"]
+                if "last-modified" in entry["headers"]:
+                    headers["If-Modified-Since"] = entry["headers"]["last-modified"]
+                self.headers = headers
+
+            response = super().getresponse()
+            if response.status == 304 and entry is not None:
+                cache.count("hits")
+                cache.touch(key)
+                # Keep the fresh rate-limit headers of the 304 response.
+                headers = dict(entry["headers"])
+                headers.update({k.lower(): v for k, v in response.getheaders()})
+                return CachedResponse(headers, entry["body"])
+
+            cache.count("misses")
+            headers = {k.lower(): v for k, v in response.getheaders()}
+            if response.status == 200 and (
+                "etag" in headers or "last-modified" in headers
+            ):
+                cache.put(key, headers, response.read())
+            return response
+
+    return CachingConnection
+
+
+def install_cache(client: Github, cache: ResponseCache) -> None:
+    """Routes the requests of a GitHub client through the response cache.
+
+    The connection class is replaced on the client's requester only, so the
+    client keeps its persistent keep-alive connection.
+
+    Args:
+        client (Github): GitHub client.
+        cache (ResponseCache): Cache of the responses.
+    """
+    requester = client._Github__requester
+    base = requester._Requester__connectionClass
+    if issubclass(base, HTTPSRequestsConnectionClass):
+        base = HTTPSRequestsConnectionClass
+    else:
+        base = HTTPRequestsConnectionClass
+    requester._Requester__connectionClass = caching_connection_class(base, cache)
+    requester._Requester__connection = None
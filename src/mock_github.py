@@ -0,0 +1,616 @@
+import hashlib
+import json
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlencode, urlparse
+
+import hydra
+import pandas as pd
+from hydra.core.config_store import ConfigStore
+
+import schema
+import storage
+import utils
+from config import ReposConfig
+
+cs = ConfigStore.instance()
+cs.store(name="repo_config", node=ReposConfig)
+
+START_DATE = datetime(2015, 1, 1, tzinfo=timezone.utc)
+END_DATE = datetime(2022, 8, 1, tzinfo=timezone.utc)
+
+# Lists of a repository and whether GitHub returns them newest first.
+REPO_LISTS = {
+    "commits": True,
+    "issues": True,
+    "forks": True,
+    "stargazers": False,
+    "subscribers": False,
+    "contributors": False,
+}
+# Lists that are only counted by the fetcher; the items are placeholders.
+COUNTED_LISTS = ("branches", "milestones", "pulls", "releases")
+# GitHub refuses pages past this limit for stargazers (422).
+STARGAZER_PAGE_LIMIT = 400
+
+
+def iso_date(date: Optional[datetime]) -> Optional[str]:
+    """Formats a date as returned by GitHub (naive dates are UTC)."""
+    if date is None or pd.isna(date):
+        return None
+    return pd.Timestamp(date).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def spread_date(index: int, count: int, start: datetime = START_DATE) -> datetime:
+    """Returns the date of the ``index``-th oldest of ``count`` items spread
+    evenly between ``start`` and ``END_DATE``."""
+    return start + (END_DATE - start) * (index + 1) / (count + 1)
+
+
+def user_created_at(login: str) -> datetime:
+    """Returns a stable, synthetic account creation date of a user."""
+    days = int(hashlib.md5(login.encode()).hexdigest()[:8], 16) % 3650
+    return START_DATE - pd.Timedelta(days=days)
+
+
+@dataclass
+class MockRepo:
+    """Repository served by the ``MockGithubServer``.
+
+    A synthetic repository generates the items of its lists from their
+    index on request, so that large histories need no memory. A replayed
+    repository serves the rows of a fetched repository directory instead.
+    """
+
+    full_name: str
+    commits: int = 100
+    stars: int = 100
+    forks: int = 10
+    issues: int = 50
+    watchers: int = 10
+    contributors: int = 10
+    description: str = "Synthetic repository"
+    language: str = "Python"
+    rows: Dict[str, List[Tuple]] = field(default_factory=dict)
+    users: Dict[str, datetime] = field(default_factory=dict)
+
+    def count(self, name: str) -> int:
+        """Returns the number of items of a list of the repository."""
+        if name in self.rows:
+            return len(self.rows[name])
+        counts = {
+            "commits": self.commits,
+            "issues": self.issues,
+            "forks": self.forks,
+            "stargazers": self.stars,
+            "subscribers": self.watchers,
+            "contributors": self.contributors,
+            "branches": 3,
+            "milestones": 2,
+            "pulls": self.issues // 2,
+            "releases": 2,
+        }
+        return counts[name]
+
+    def row(self, name: str, position: int) -> Tuple:
+        """Returns the item at a position of a list of the repository.
+
+        Args:
+            name (str): Name of the list, e.g. "commits".
+            position (int): Position of the item in the list as served.
+
+        Returns:
+            Tuple: Fields of the item (see ``render_item``).
+        """
+        if name in self.rows:
+            return self.rows[name][position]
+        count = self.count(name)
+        index = count - 1 - position if REPO_LISTS.get(name) else position
+        date = spread_date(index, count)
+        owner = self.full_name.split("/")[0]
+        if name == "commits":
+            sha = hashlib.sha1(f"{self.full_name}:{index}".encode()).hexdigest()
+            return (sha, date)
+        if name == "issues":
+            closed = date if index % 3 == 0 else None
+            state = "closed" if closed else "open"
+            return (index + 1, state, date, date, closed, index % 2 == 1)
+        if name == "forks":
+            return (f"{owner}-fork{index}/{self.full_name.split('/')[1]}", date)
+        if name == "stargazers":
+            return (f"stargazer{index}", date)
+        return (f"{name[:-1]}{index}",)
+
+    @classmethod
+    def from_repo_dir(cls, full_name: str, repo_dir: Path) -> "MockRepo":
+        """Builds a repository replaying the data files of a fetched repository.
+
+        Args:
+            full_name (str): Repository's full name.
+            repo_dir (Path): Directory of the repository data files (CSV or Parquet).
+
+        Returns:
+            MockRepo: Repository serving the stored items.
+        """
+        files = utils.list_repo_files(repo_dir)
+
+        def read(stem: str, columns: List[str]) -> Optional[pd.DataFrame]:
+            if stem not in files:
+                return None
+            df = storage.read_table(files[stem], columns=columns)
+            for column in columns:
+                if column in schema.DATE_COLUMNS:
+                    df[column] = storage.to_utc_dates(df[column])
+            return df
+
+        def login(value: str) -> str:
+            match = re.search(r'login="([^"]+)"', str(value))
+            return match.group(1) if match else str(value)
+
+        repo = cls(full_name)
+        rows = {}
+        users = {}
+        df = read("commits", ["commit_sha", "commit_date"])
+        if df is not None:
+            df = df.sort_values("commit_date", ascending=False)
+            shas = df["commit_sha"].astype(str).str.extract(r'sha="([^"]+)"')[0]
+            rows["commits"] = list(
+                zip(shas.fillna(df["commit_sha"]), df["commit_date"])
+            )
+        columns = [
+            "issue_pull",
+            "pr_iss_state",
+            "pr_iss_opened_at",
+            "pr_iss_updated_at",
+            "pr_iss_closed_at",
+        ]
+        df = read("issues_pulls", columns)
+        if df is not None:
+            # Sorted by update so that the ``since`` filter cuts the list once.
+            df = df.sort_values("pr_iss_updated_at", ascending=False)
+            rows["issues"] = [
+                (
+                    len(df) - position,
+                    row.pr_iss_state,
+                    row.pr_iss_opened_at,
+                    row.pr_iss_updated_at,
+                    row.pr_iss_closed_at,
+                    row.issue_pull == "pull request",
+                )
+                for position, row in enumerate(df.itertuples())
+            ]
+        df = read("forks", ["forked_user", "forked_at"])
+        if df is not None:
+            df = df.sort_values("forked_at", ascending=False)
+            rows["forks"] = list(zip(df["forked_user"], df["forked_at"]))
+        df = read("stargazer", ["starred_user", "starred_at"])
+        if df is not None:
+            df = df.sort_values("starred_at")
+            rows["stargazers"] = list(
+                zip(df["starred_user"].map(login), df["starred_at"])
+            )
+        for stem, name, columns in (
+            ("watchers", "subscribers", ["subscriber_username", "subscribed_at"]),
+            ("Contributors", "contributors", ["contributor", "contributed_date"]),
+        ):
+            df = read(stem, columns)
+            if df is not None:
+                rows[name] = [(user,) for user in df[columns[0]]]
+                users.update(zip(df[columns[0]], df[columns[1]]))
+        df = read("repo_data", ["discription", "language"])
+        if df is not None and not df.empty:
+            repo.description = df["discription"].iloc[0]
+            repo.language = df["language"].iloc[0]
+        repo.rows = rows
+        repo.users = {user: date for user, date in users.items() if not pd.isna(date)}
+        return repo
+
+
+def user_json(
+    api_url: str, login: str, created_at: Optional[datetime] = None
+) -> Dict[str, Any]:
+    """Returns the JSON of a user as listed (or, with a date, as requested) by GitHub."""
+    user = {"login": login, "url": f"{api_url}/users/{login}", "type": "User"}
+    if created_at is not None:
+        user["created_at"] = iso_date(created_at)
+    return user
+
+
+def render_item(api_url: str, repo: MockRepo, name: str, row: Tuple) -> Dict[str, Any]:
+    """Returns the JSON of a list item as returned by GitHub.
+
+    Args:
+        api_url (str): Base URL of the server.
+        repo (MockRepo): Repository of the list.
+        name (str): Name of the list.
+        row (Tuple): Fields of the item.
+
+    Returns:
+        Dict[str, Any]: JSON of the item.
+    """
+    repo_url = f"{api_url}/repos/{repo.full_name}"
+    if name == "commits":
+        sha, date = row
+        signature = {"name": "dev", "email": "dev@example.com", "date": iso_date(date)}
+        return {
+            "sha": sha,
+            "url": f"{repo_url}/commits/{sha}",
+            "commit": {
+                "author": signature,
+                "committer": signature,
+                "message": "change",
+            },
+        }
+    if name == "issues":
+        number, state, created, updated, closed, is_pull = row
+        issue = {
+            "url": f"{repo_url}/issues/{number}",
+            "number": number,
+            "state": state,
+            "title": f"Issue {number}",
+            "created_at": iso_date(created),
+            "updated_at": iso_date(updated),
+            "closed_at": iso_date(closed),
+            "pull_request": {"url": f"{repo_url}/pulls/{number}"} if is_pull else None,
+        }
+        return issue
+    if name == "forks":
+        full_name, created = row
+        return {
+            "full_name": full_name,
+            "name": full_name.split("/")[-1],
+            "url": f"{api_url}/repos/{full_name}",
+            "created_at": iso_date(created),
+        }
+    if name == "stargazers":
+        login, starred_at = row
+        return {"starred_at": iso_date(starred_at), "user": user_json(api_url, login)}
+    if name in ("subscribers", "contributors"):
+        return user_json(api_url, row[0])
+    return {"name": row[0]}
+
+
+class MockGithubHandler(BaseHTTPRequestHandler):
+    """Request handler of the ``MockGithubServer``."""
+
+    protocol_version = "HTTP/1.1"
+    # Headers and body are written separately; without TCP_NODELAY the body
+    # waits for the client's delayed ACK on keep-alive connections.
+    disable_nagle_algorithm = True
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+    def do_GET(self) -> None:
+        mock: "MockGithubServer" = self.server.mock
+        if mock.latency:
+            time.sleep(mock.latency)
+        url = urlparse(self.path)
+        params = {key: values[0] for key, values in parse_qs(url.query).items()}
+        api_url = f"http://{self.headers.get('Host', mock.host)}"
+        parts = [part for part in url.path.split("/") if part]
+
+        headers = {}
+        status, body = self.route(api_url, parts, params, headers)
+        payload = json.dumps(body).encode()
+        etag = f'"{hashlib.md5(payload).hexdigest()}"'
+        if status == 200 and self.headers.get("If-None-Match") == etag:
+            # Like GitHub, answers to conditional requests are not counted.
+            status, payload = 304, b""
+        remaining, limit, reset = mock.take_request(
+            self.headers.get("Authorization"), charge=status != 304
+        )
+        if remaining < 0:
+            status, payload = (
+                403,
+                json.dumps({"message": "API rate limit exceeded"}).encode(),
+            )
+            headers.pop("Link", None)
+        headers.update(
+            {
+                "X-RateLimit-Limit": str(limit),
+                "X-RateLimit-Remaining": str(max(0, remaining)),
+                "X-RateLimit-Reset": str(int(reset)),
+                "X-RateLimit-Resource": "core",
+            }
+        )
+        if status in (200, 304):
+            headers["ETag"] = etag
+
+        self.send_response(status)
+        for key, value in headers.items():
+            self.send_header(key, value)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+        mock.count_response(status, len(payload))
+
+    def route(
+        self,
+        api_url: str,
+        parts: List[str],
+        params: Dict[str, str],
+        headers: Dict[str, str],
+    ) -> Tuple[int, Any]:
+        """Returns the status and JSON body of a request."""
+        mock: "MockGithubServer" = self.server.mock
+        not_found = (404, {"message": "Not Found"})
+        if len(parts) == 2 and parts[0] == "users":
+            created = mock.users.get(parts[1]) or user_created_at(parts[1])
+            return 200, user_json(api_url, parts[1], created)
+        if len(parts) < 3 or parts[0] != "repos":
+            return not_found
+        repo = mock.repos.get(f"{parts[1]}/{parts[2]}")
+        if repo is None:
+            return not_found
+        if len(parts) == 3:
+            return 200, mock.repo_json(api_url, repo)
+        name = "/".join(parts[3:])
+        if name == "actions/workflows":
+            return 200, {"total_count": 1, "workflows": [{"id": 1, "name": "ci"}]}
+        if name not in REPO_LISTS and name not in COUNTED_LISTS:
+            return not_found
+        return self.page(api_url, repo, name, params, headers)
+
+    def page(
+        self,
+        api_url: str,
+        repo: MockRepo,
+        name: str,
+        params: Dict[str, str],
+        headers: Dict[str, str],
+    ) -> Tuple[int, Any]:
+        """Returns one page of a list and sets its ``Link`` header."""
+        per_page = min(100, int(params.get("per_page", 30)))
+        page = max(1, int(params.get("page", 1)))
+        count = repo.count(name)
+        if "since" in params and name in ("commits", "issues"):
+            since = pd.Timestamp(params["since"])
+            date_field = 1 if name == "commits" else 3
+            count = first_older(
+                count, lambda position: repo.row(name, position)[date_field], since
+            )
+        if name == "stargazers" and page > STARGAZER_PAGE_LIMIT:
+            return 422, {"message": "Pagination is limited for this resource."}
+
+        last = max(1, -(-count // per_page))
+        start = (page - 1) * per_page
+        items = [
+            render_item(api_url, repo, name, repo.row(name, position))
+            for position in range(start, min(count, start + per_page))
+        ]
+        if last > 1:
+
+            def link(number: int, rel: str) -> str:
+                query = urlencode({**params, "per_page": per_page, "page": number})
+                return f'<{api_url}/repos/{repo.full_name}/{name}?{query}>; rel="{rel}"'
+
+            links = []
+            if page < last:
+                links += [link(page + 1, "next"), link(last, "last")]
+            if page > 1:
+                links += [link(page - 1, "prev"), link(1, "first")]
+            headers["Link"] = ", ".join(links)
+        return 200, items
+
+
+def first_older(
+    count: int, date_at: Callable[[int], datetime], since: pd.Timestamp
+) -> int:
+    """Returns the number of items of a newest first list dated at or after ``since``.
+
+    Args:
+        count (int): Number of items of the list.
+        date_at (Callable[[int], datetime]): Date of the item at a position.
+        since (pd.Timestamp): Timezone aware date.
+
+    Returns:
+        int: Position of the first older item.
+    """
+    since = pd.Timestamp(since).tz_convert("UTC")
+    low, high = 0, count
+    while low < high:
+        middle = (low + high) // 2
+        date = pd.Timestamp(date_at(middle))
+        if date.tzinfo is None:
+            date = date.tz_localize("UTC")
+        if date >= since:
+            low = middle + 1
+        else:
+            high = middle
+    return low
+
+
+class MockGithubServer:
+    """Local stand-in for the GitHub REST API.
+
+    Serves the repository, list and user endpoints used by the fetchers,
+    with ``Link`` pagination, ``ETag`` conditional requests, a per-token
+    rate limit and a configurable latency per request, and counts the
+    requests and bytes served.
+    """
+
+    def __init__(
+        self,
+        repos: List[MockRepo],
+        latency: float = 0.0,
+        rate_limit: int = 5000,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ) -> None:
+        """Initialization of the MockGithubServer class.
+
+        Args:
+            repos (List[MockRepo]): Repositories to serve.
+            latency (float, optional): Seconds added to each response. Defaults to 0.0.
+            rate_limit (int, optional): Requests per token and hour. Defaults to 5000.
+            host (str, optional): Interface to listen on. Defaults to "127.0.0.1".
+            port (int, optional): Port to listen on, 0 picks a free one. Defaults to 0.
+        """
+        self.repos = {repo.full_name: repo for repo in repos}
+        self.users = {user: date for repo in repos for user, date in repo.users.items()}
+        self.latency = latency
+        self.rate_limit = rate_limit
+        self.host = host
+        self.port = port
+        self.stats = {"requests": 0, "not_modified": 0, "errors": 0, "bytes": 0}
+        self._budgets: Dict[Optional[str], List[float]] = {}
+        self._lock = threading.Lock()
+        self._httpd: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def __enter__(self) -> "MockGithubServer":
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.stop()
+
+    @property
+    def url(self) -> str:
+        """Base URL of the running server, to be used as API URL."""
+        return f"http://{self.host}:{self.port}"
+
+    def start(self) -> "MockGithubServer":
+        """Starts serving in a background thread."""
+        self._httpd = ThreadingHTTPServer((self.host, self.port), MockGithubHandler)
+        self._httpd.daemon_threads = True
+        self._httpd.mock = self
+        self.port = self._httpd.server_address[1]
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stops the server."""
+        if self._httpd is not None:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._httpd = None
+
+    def take_request(
+        self, token: Optional[str], charge: bool = True
+    ) -> Tuple[int, int, float]:
+        """Counts a request against the hourly budget of a token.
+
+        Args:
+            token (Optional[str]): Authorization header of the request.
+            charge (bool, optional): Whether the request uses up the budget. Defaults to True.
+
+        Returns:
+            Tuple[int, int, float]: Remaining requests (negative if exceeded),
+                                    limit and reset time.
+        """
+        limit = self.rate_limit if token else 60
+        now = time.time()
+        with self._lock:
+            budget = self._budgets.get(token)
+            if budget is None or budget[1] <= now:
+                budget = self._budgets[token] = [limit, now + 3600]
+            if charge:
+                budget[0] -= 1
+            return int(budget[0]), limit, budget[1]
+
+    def count_response(self, status: int, size: int) -> None:
+        """Adds a response to the statistics."""
+        with self._lock:
+            self.stats["requests"] += 1
+            self.stats["bytes"] += size
+            if status == 304:
+                self.stats["not_modified"] += 1
+            elif status >= 400:
+                self.stats["errors"] += 1
+
+    def repo_json(self, api_url: str, repo: MockRepo) -> Dict[str, Any]:
+        """Returns the JSON of a repository as returned by GitHub."""
+        owner, name = repo.full_name.split("/")
+        return {
+            "id": int(hashlib.md5(repo.full_name.encode()).hexdigest()[:8], 16),
+            "name": name,
+            "full_name": repo.full_name,
+            "owner": user_json(api_url, owner),
+            "url": f"{api_url}/repos/{repo.full_name}",
+            "html_url": f"https://github.com/{repo.full_name}",
+            "description": repo.description,
+            "language": repo.language,
+            "created_at": iso_date(START_DATE),
+            "pushed_at": iso_date(END_DATE),
+            "updated_at": iso_date(END_DATE),
+            "stargazers_count": repo.count("stargazers"),
+            "watchers_count": repo.count("stargazers"),
+            "subscribers_count": repo.count("subscribers"),
+            "forks_count": repo.count("forks"),
+            "open_issues_count": repo.count("issues"),
+            "size": 1024,
+            "has_wiki": True,
+            "has_pages": False,
+            "has_projects": True,
+            "has_downloads": True,
+        }
+
+
+def synthetic_repos(
+    count: int,
+    commits: int,
+    stars: int,
+    forks: int,
+    issues: int,
+    watchers: int,
+    contributors: int,
+) -> List[MockRepo]:
+    """Returns ``count`` synthetic repositories of the same size."""
+    return [
+        MockRepo(
+            f"mock/repo{index}", commits, stars, forks, issues, watchers, contributors
+        )
+        for index in range(count)
+    ]
+
+
+def replayed_repos(raw_data_dir: Path) -> List[MockRepo]:
+    """Returns repositories replaying a directory of fetched repositories."""
+    return [
+        MockRepo.from_repo_dir(f"{repo_dir.parent.name}/{repo_dir.name}", repo_dir)
+        for repo_dir in utils.list_repos_dirs(Path(raw_data_dir))
+    ]
+
+
+@hydra.main(config_path="conf", config_name="config", version_base=None)
+def main(cfg: ReposConfig):
+    bench = cfg.benchmark.fetch
+    if bench.replay_dir:
+        repos = replayed_repos(Path(bench.replay_dir))
+    else:
+        repos = synthetic_repos(
+            bench.repos,
+            bench.commits,
+            bench.stars,
+            bench.forks,
+            bench.issues,
+            bench.watchers,
+            bench.contributors,
+        )
+    server = MockGithubServer(
+        repos, latency=bench.latency, rate_limit=bench.rate_limit, port=bench.port
+    )
+    with server:
+        print(f"Mock GitHub API serving {len(repos)} repositories at {server.url}")
+        for repo in repos:
+            print(f"  {repo.full_name}")
+        print("Fetch with fetch.api_url=" + server.url + " (Ctrl-C to stop)")
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            pass
+    print(f"Served {server.stats['requests']} requests")
+
+
+if __name__ == "__main__":
+    main()
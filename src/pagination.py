@@ -0,0 +1,67 @@
+import math
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Iterator, List, Optional, Tuple
+
+from github.GithubException import GithubException
+from github.PaginatedList import PaginatedList
+
+
+def iter_pages(
+    paginated_list: PaginatedList,
+    per_page: int,
+    start_page: int = 0,
+    prefetch: int = 1,
+    total_count: Optional[int] = None,
+) -> Iterator[Tuple[int, List[Any]]]:
+    """Yields the pages of a paginated GitHub list in a single pass.
+
+    While the caller processes one page, the next ``prefetch`` pages are
+    already requested in the background, so the HTTP round-trip of the next
+    page overlaps with the processing of the current one.
+
+    Args:
+        paginated_list (PaginatedList): Paginated list returned by PyGithub.
+        per_page (int): Items per page requested by the client.
+        start_page (int, optional): First page (zero based) to fetch. Defaults to 0.
+        prefetch (int, optional): Pages requested ahead of the current one. Defaults to 1.
+        total_count (Optional[int], optional): Known number of items, used to stop
+                                               without requesting an empty page.
+                                               Defaults to None.
+
+    Yields:
+        Iterator[Tuple[int, List[Any]]]: Page number and the items of the page.
+    """
+    last_page = math.ceil(total_count / per_page) if total_count is not None else None
+    if last_page is not None and start_page >= last_page:
+        return
+
+    def fetch(page: int) -> List[Any]:
+        try:
+            return paginated_list.get_page(page)
+        except GithubException as e:
+            # GitHub refuses pages past its pagination limit (e.g. 400 pages
+            # of stargazers); treat them as the end of the list.
+            if e.status == 422:
+                return []
+            raise
+
+    with ThreadPoolExecutor(max_workers=max(1, prefetch)) as executor:
+        next_page = start_page
+        pending = deque()
+        while True:
+            while len(pending) <= prefetch and (
+                last_page is None or next_page < last_page
+            ):
+                pending.append((next_page, executor.submit(fetch, next_page)))
+                next_page += 1
+            if not pending:
+                return
+            page, future = pending.popleft()
+            items = future.result()
+            if items:
+                yield page, items
+            if len(items) < per_page:
+                for _, future in pending:
+                    future.cancel()
+                return
@@ -0,0 +1,160 @@
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import pandas as pd
+
+import storage
+import utils
+from change_tracker import build_target
+from preprocess_repo_data import (
+    DAYS_COLUMNS,
+    RowRepoDataProcessor,
+    add_maintenance_state,
+    add_repos_age,
+    parse_dates,
+)
+
+# Stages writing the outputs of a run, in pipeline order.
+STAGES = ("repo_features", "generic_repos_data", "maintenance_state")
+
+
+class PreprocessPipeline:
+    """Runs the preprocessing stages of one run, passing their results in memory.
+
+    Every stage runs at most once and its result is kept for the stages
+    using it. The generic repository data is read once for the ages and the
+    maintenance states, and every output file is written once: the feature
+    files of each repository (with the copy of all features in the final
+    data directory), the generic data with the ages in the processed data
+    directory, and with the maintenance states in the final data directory.
+    """
+
+    def __init__(
+        self,
+        processor: RowRepoDataProcessor,
+        raw_dir: str,
+        processed_dir: str,
+        final_dir: str,
+        periods: List[int],
+    ):
+        """Pipeline of one preprocessing run.
+
+        Args:
+            processor (RowRepoDataProcessor): Processor running the stages.
+            raw_dir (str): Directory of the raw repository data.
+            processed_dir (str): Directory of the processed repositories.
+            final_dir (str): Directory of the final data.
+            periods (List[int]): Maintenance periods in weeks.
+        """
+        self.processor = processor
+        self.raw_dir, self.processed_dir = utils.set_path(raw_dir, processed_dir)
+        self.final_dir = utils.set_path(raw_dir, final_dir)[1]
+        self.periods = list(periods)
+        # Results of the stages that already ran.
+        self.results: Dict[str, Any] = {}
+        self.stages: Dict[str, Callable[[], Any]] = {
+            "repo_features": self.repo_features,
+            "generic_inputs": self.generic_inputs,
+            "generic_data": self.generic_data,
+            "repos_age": self.repos_age,
+            "generic_repos_data": self.generic_repos_data,
+            "maintenance_state": self.maintenance_state,
+        }
+
+    def __repr__(self):
+        return f"PreprocessPipeline({str(self.raw_dir)!r}, done={list(self.results)})"
+
+    def get(self, stage: str) -> Any:
+        """Returns the result of a stage, running it on first use.
+
+        The run is timed by the processor's profile, if any.
+
+        Args:
+            stage (str): Name of the stage, e.g. "repos_age".
+
+        Returns:
+            Any: Result of the stage.
+        """
+        if stage not in self.results:
+            profile = self.processor.profile
+            if profile is None:
+                self.results[stage] = self.stages[stage]()
+            else:
+                with profile.stage(stage):
+                    self.results[stage] = self.stages[stage]()
+        return self.results[stage]
+
+    def run(self) -> Dict[str, Any]:
+        """Runs the stages writing the outputs.
+
+        Returns:
+            Dict[str, Any]: Result of each output stage.
+        """
+        for stage in STAGES:
+            self.get(stage)
+        self.processor.save_state()
+        return {stage: self.results[stage] for stage in STAGES}
+
+    def repo_features(self) -> Dict[str, str]:
+        """Aggregates the features of each repository, see ``agg_repo_feat``."""
+        return self.processor.agg_repo_feat(
+            str(self.raw_dir), str(self.processed_dir), copy_to=str(self.final_dir)
+        )
+
+    def generic_inputs(self) -> Dict[str, Optional[List[int]]]:
+        """Returns the generic data file of each repository with its signature."""
+        return self.processor.generic_inputs(self.raw_dir)
+
+    def generic_data(self) -> pd.DataFrame:
+        """Reads the generic data of the repositories, with parsed dates."""
+        generic_df = self.processor.read_generic_data(list(self.get("generic_inputs")))
+        return parse_dates(generic_df, DAYS_COLUMNS)
+
+    def repos_age(self) -> pd.DataFrame:
+        """Returns the generic data with the age of each repository."""
+        return add_repos_age(self.get("generic_data").copy())
+
+    def write_generic_data(
+        self,
+        stage: str,
+        save_to: Path,
+        build: Callable[[], pd.DataFrame],
+        params: Optional[Dict[str, Any]] = None,
+    ) -> Path:
+        """Writes a generic data file unless it is up to date.
+
+        Args:
+            stage (str): Name of the build target's stage, shared with the
+                         ``RowRepoDataProcessor`` method writing the same file.
+            save_to (Path): Directory of the file.
+            build (Callable[[], pd.DataFrame]): Builds the content of the file.
+            params (Optional[Dict[str, Any]], optional): Settings of the build.
+                                                        Defaults to None.
+
+        Returns:
+            Path: Path of the file.
+        """
+        saving_path = self.processor.generic_data_path(self.raw_dir, save_to)
+        target = build_target(stage, self.raw_dir, saving_path)
+        inputs = self.get("generic_inputs")
+        if self.processor.is_up_to_date(target, inputs, params):
+            print(f"{saving_path.name} is up to date")
+            return saving_path
+        storage.write_table(build(), saving_path)
+        self.processor.record_build(target, inputs, [saving_path], params)
+        return saving_path
+
+    def generic_repos_data(self) -> Path:
+        """Writes the generic data with the ages to the processed data directory."""
+        return self.write_generic_data(
+            "gen_repos_age", self.processed_dir, lambda: self.get("repos_age")
+        )
+
+    def maintenance_state(self) -> Path:
+        """Writes the generic data with the maintenance states to the final data directory."""
+        return self.write_generic_data(
+            "set_maintainability_state",
+            self.final_dir,
+            lambda: add_maintenance_state(self.get("repos_age").copy(), self.periods),
+            {"periods": self.periods},
+        )
@@ -1,36 +1,73 @@
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple, Union
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
 
 import hydra
 import matplotlib.pyplot as plt
+import numpy as np
 import pandas as pd
 from hydra.core.config_store import ConfigStore
 
+import catalog
+import change_tracker
+import daily_agg
+import profiling
+import schema
+import storage
 import utils
+from change_tracker import ChangeTracker, build_target
 from config import ReposConfig
+from daily_agg import DailyCounts
+from profiling import RunProfile
+from utils import FileDirEmptyError, NotFoundError
 
 cs = ConfigStore.instance()
 cs.store(name="repo_config", node=ReposConfig)
 
-
-class NotFoundError(Exception):
-    """Exception raised when there is no File"""
-
-    pass
-
-
-class FileDirEmptyError(Exception):
-    """Exception raised when there File or Directory is Empty"""
-
-    pass
+# Date columns of the generic repository data.
+DAYS_COLUMNS = ["created_at", "pushed_at", "last_update_at"]
 
 
 class RowRepoDataProcessor:
     """class to prepocess the raw repository data"""
 
-    def __init__(self):
-        """Row repository data processor"""
-        pass
+    def __init__(
+        self,
+        file_format: str = "csv",
+        workers: int = 1,
+        tracker: Optional[ChangeTracker] = None,
+        rollups: Optional[List[str]] = None,
+        chunk_rows: int = 0,
+        profile: Optional[RunProfile] = None,
+    ):
+        """Row repository data processor
+
+        Args:
+            file_format (str, optional): Storage format of the processed files, "csv"
+                                         or "parquet". Defaults to "csv".
+            workers (int, optional): Worker processes aggregating repositories at once,
+                                     0 uses all cores. Defaults to 1.
+            tracker (Optional[ChangeTracker], optional): Skips the outputs whose inputs
+                                                         did not change since the last
+                                                         run. Defaults to None (all
+                                                         outputs are rebuilt).
+            rollups (Optional[List[str]], optional): Coarser frequencies ("W", "M",
+                                                     "Q") of the file with all
+                                                     features, saved next to it.
+                                                     Defaults to None (daily only).
+            chunk_rows (int, optional): Read the raw feature files in chunks of this
+                                        many rows instead of whole. Defaults to 0.
+            profile (Optional[RunProfile], optional): Collects the timings of the
+                                                      repositories. Defaults to None.
+        """
+        storage.check_format(file_format)
+        self.file_format = file_format
+        self.workers = workers or os.cpu_count() or 1
+        self.tracker = tracker
+        self.rollups = daily_agg.check_rollups(rollups or [])
+        self.chunk_rows = chunk_rows
+        self.profile = profile
 
     def __str__(self):
         return "Row repository data processor "
@@ -38,6 +75,97 @@ class RowRepoDataProcessor:
     def __repr__(self):
         return "Row repository data processor "
 
+    def __getstate__(self):
+        # Worker processes only build; the changes are checked and recorded by
+        # the parent, so the state is not sent with every repository.
+        state = self.__dict__.copy()
+        state["tracker"] = None
+        state["profile"] = None
+        return state
+
+    def is_up_to_date(
+        self,
+        target: str,
+        inputs: Dict[str, Optional[List[int]]],
+        params: Optional[Dict] = None,
+    ) -> bool:
+        """Checks whether a build target can be skipped.
+
+        Args:
+            target (str): Name of the build target.
+            inputs (Dict[str, Optional[List[int]]]): Signatures of its inputs.
+            params (Optional[Dict], optional): Settings of the build besides the
+                                               file format. Defaults to None.
+
+        Returns:
+            bool: True if incremental and the target is up to date.
+        """
+        if self.tracker is None:
+            return False
+        params = {"file_format": self.file_format, **(params or {})}
+        return self.tracker.is_current(target, inputs, params)
+
+    def record_build(
+        self,
+        target: str,
+        inputs: Dict[str, Optional[List[int]]],
+        outputs: List[Path],
+        params: Optional[Dict] = None,
+    ) -> None:
+        """Records a built target, see ``ChangeTracker.update``."""
+        if self.tracker is None:
+            return
+        params = {"file_format": self.file_format, **(params or {})}
+        self.tracker.update(target, inputs, outputs, params)
+
+    def save_feature(
+        self,
+        data: Union[pd.DataFrame, pd.Series],
+        feature_name: str,
+        repo_path: Path,
+        save_to: Path,
+    ) -> Path:
+        """Saves a processed time series of a repository.
+
+        Args:
+            data (Union[pd.DataFrame, pd.Series]): Daily time series data.
+            feature_name (str): Feature of the repository, names the file.
+            repo_path (Path): Directory of the repository.
+            save_to (Path): Directory to save the processed repositories.
+
+        Returns:
+            Path: Path of the processed file.
+        """
+        processed_file_path = utils.get_save_path(
+            feature_name, repo_path, save_to, True, self.file_format
+        )
+        storage.write_table(data, processed_file_path, index=True)
+        catalog.record_file(processed_file_path)
+        return processed_file_path
+
+    def process_feature(
+        self, feature: str, feature_name: str, repo_dir: str, save_path: str
+    ) -> Union[pd.DataFrame, pd.Series]:
+        """Creates(Returns) the daily time series data of a feature.
+
+        Args:
+            feature (str): Raw feature file, see ``daily_agg.FEATURE_TABLES``.
+            feature_name (str): Feature of repository to be processed, names the file.
+            repo_dir (str): Directory path of the repository to be processed.
+            save_path (str):  Directory path to save the time series data.
+
+        Returns:
+            Union[pd.DataFrame, pd.Series]: Daily time series data.
+        """
+        repo_path, save_to = utils.set_path(repo_dir, save_path)
+        events, index_name = daily_agg.FEATURE_TABLES[feature]
+        counts = DailyCounts.from_files(repo_path, events, self.chunk_rows)
+        feat_resample = counts.frame(events, index_name)
+        if feature == "commits":
+            feat_resample = feat_resample[events[0]]
+        self.save_feature(feat_resample, feature_name, repo_path, save_to)
+        return feat_resample
+
     def process_commits(
         self, feature_name: str, repo_dir: str, save_path: str
     ) -> Union[pd.DataFrame, pd.Series]:
@@ -51,19 +179,9 @@ class RowRepoDataProcessor:
         Returns:
             Union[pd.DataFrame, None]: Returns Dataframe of the Commits time series data.
         """
-
-        repo_path, save_to = utils.set_path(repo_dir, save_path)
-        raw_file = utils.get_feat_file(feature_name, repo_path)
-
-        feat_df = pd.read_csv(
-            raw_file, parse_dates=["commit_date"], index_col="commit_date"
+        feat_resample = self.process_feature(
+            "commits", feature_name, repo_dir, save_path
         )
-        feat_resample = feat_df.commit_count.resample("D").count()
-
-        processed_file_path = utils.get_save_path(
-            feature_name, repo_path, save_to, True
-        )
-        feat_resample.to_csv(processed_file_path)
         print("Commits processed successfully")
         return feat_resample
 
@@ -80,19 +198,7 @@ class RowRepoDataProcessor:
         Returns:
             Union[pd.DataFrame, None]: Returns Dataframe of the Forks time series data.
         """
-
-        repo_path, save_to = utils.set_path(repo_dir, save_path)
-        raw_file = utils.get_feat_file(feature_name, repo_path)
-        print(raw_file)
-
-        feat_df = pd.read_csv(raw_file, parse_dates=["forked_at"])
-        feat_df = feat_df.groupby(pd.Grouper(key="forked_at", freq="D"))
-        feat_resample = feat_df["forked_at"].count().to_frame(name="forks_count")
-
-        processed_file_path = utils.get_save_path(
-            feature_name, repo_path, save_to, True
-        )
-        feat_resample.to_csv(processed_file_path)
+        feat_resample = self.process_feature("forks", feature_name, repo_dir, save_path)
         print("Forks processed successfully")
         return feat_resample
 
@@ -109,64 +215,7 @@ class RowRepoDataProcessor:
         Returns:
             Union[pd.DataFrame, None]: Returns Dataframe of the Stars time series data.
         """
-
-        repo_path, save_to = utils.set_path(repo_dir, save_path)
-        raw_file = utils.get_feat_file("issues_pulls", repo_path)
-
-        feat_resample = pd.read_csv(
-            raw_file,
-            parse_dates=[
-                "pr_iss_opened_at",
-                "pr_iss_updated_at",
-                "pr_iss_closed_at",
-            ],
-            infer_datetime_format=True,
-        )
-
-        pris_open_df = feat_resample.groupby(
-            pd.Grouper(key="pr_iss_opened_at", freq="D")
-        )
-        pris_grp_open_df = (
-            pris_open_df["pr_iss_opened_at"].count().to_frame(name="pr_iss_Open_count")
-        )
-
-        pris_lt_update = feat_resample.groupby(
-            pd.Grouper(key="pr_iss_updated_at", freq="D")
-        )
-        pris_grp_ltpdate_df = (
-            pris_lt_update["pr_iss_updated_at"]
-            .count()
-            .to_frame(name="pr_iss_updated_count")
-        )
-        pris_closed_df = feat_resample.groupby(
-            pd.Grouper(key="pr_iss_closed_at", freq="D")
-        )
-        pris_grp_closed_df = (
-            pris_closed_df["pr_iss_closed_at"]
-            .count()
-            .to_frame(name="pr_is_closed_count")
-        )
-
-        ps_merged_df = pd.merge(
-            pris_grp_open_df,
-            pris_grp_ltpdate_df,
-            how="outer",
-            left_index=True,
-            right_index=True,
-        )
-        ps_merged_df = pd.merge(
-            ps_merged_df,
-            pris_grp_closed_df,
-            how="outer",
-            left_index=True,
-            right_index=True,
-        )
-        processed_file_path = utils.get_save_path(
-            feature_name, repo_path, save_to, True
-        )
-        ps_merged_df.to_csv(processed_file_path)
-
-        return ps_merged_df
+        return self.process_feature("issues_pulls", feature_name, repo_dir, save_path)
 
     def process_stargazer(
         self, feature_name: str, repo_dir: str, save_path: str
@@ -181,108 +230,330 @@ class RowRepoDataProcessor:
         Returns:
             Optional[pd.DataFrame]: Returns Dataframe of the Stars time series data.
         """
+        return self.process_feature("stargazer", feature_name, repo_dir, save_path)
 
-        repo_path, save_to = utils.set_path(repo_dir, save_path)
-        raw_file = utils.get_feat_file(feature_name, repo_path)
+    def agg_one_repo_feat(
+        self,
+        repo_path: Path,
+        save_path: str,
+        copy_to: Optional[str] = None,
+        timings: Optional[Dict[str, float]] = None,
+    ) -> Path:
+        """Aggregates the feature data of one repository.
 
-        feat_df = pd.read_csv(raw_file, parse_dates=["starred_at"])
-        feat_df = feat_df.groupby(pd.Grouper(key="starred_at", freq="D"))
-        feat_resample = feat_df["starred_at"].count().to_frame(name="Stars_count")
+        The events of all features are read once and counted per day in one
+        pass; the feature time series are slices of these counts.
 
-        processed_file_path = utils.get_save_path(
-            feature_name, repo_path, save_to, True
-        )
-        feat_resample.to_csv(processed_file_path)
+        Args:
+            repo_path (Path): Directory of the repository to be processed.
+            save_path (str): Path of Directory to save the  processed repositories.
+            copy_to (Optional[str], optional): Directory to also save the file with all
+                                               features to, as ``get_all_feat_data``
+                                               does. Defaults to None.
+            timings (Optional[Dict[str, float]], optional): Adds the time spent
+                reading and counting the events ("count_seconds") and building and
+                writing the tables ("write_seconds"). Defaults to None.
 
-        return feat_resample
+        Returns:
+            Path: Path of the file with all features of the repository.
+        """
+        print(repo_path)
+        save_to = Path(save_path)
+
+        with profiling.timed(timings, "count_seconds"):
+            counts = DailyCounts.from_files(repo_path, chunk_rows=self.chunk_rows)
+        with profiling.timed(timings, "write_seconds"):
+            for feature, (events, index_name) in daily_agg.FEATURE_TABLES.items():
+                feat_resample = counts.frame(events, index_name)
+                self.save_feature(feat_resample, feature, repo_path, save_to)
+            all_feat_df = counts.frame(list(daily_agg.EVENTS), "date", fillna=True)
+            all_feature = self.save_feature(
+                all_feat_df, "all_feature", repo_path, save_to
+            )
+            # Rolled up from the daily counts, not by resampling the daily table.
+            for freq in self.rollups:
+                self.save_feature(
+                    counts.rollup(list(daily_agg.EVENTS), freq, "date"),
+                    f"all_feature_{daily_agg.ROLLUPS[freq]}",
+                    repo_path,
+                    save_to,
+                )
+            if copy_to is not None:
+                # Saved from memory instead of reading the file back.
+                ff_save = self.all_feature_copy_path(all_feature.parent, Path(copy_to))
+                storage.write_table(all_feat_df, ff_save, index=True)
+        return all_feature
+
+    def add_repo_record(
+        self, record: Dict[str, Any], inputs: Dict[str, Optional[List[int]]]
+    ) -> None:
+        """Adds the timings of an aggregated repository to the run profile, if any.
 
-    def agg_repo_feat(self, row_data_dir: str, save_path: str) -> None:
+        Args:
+            record (Dict[str, Any]): Timings of the repository, see ``agg_repo``.
+            inputs (Dict[str, Optional[List[int]]]): Signatures of its raw feature files.
+        """
+        if self.profile is None:
+            return
+        sizes = [signature[0] for signature in inputs.values() if signature is not None]
+        record["input_mb"] = sum(sizes) / profiling.MiB
+        self.profile.add_repo(record)
+
+    def save_state(self) -> None:
+        """Saves the state of the change tracker, if incremental."""
+        if self.tracker is not None:
+            self.tracker.save()
+
+    def feature_inputs(self, repo_path: Path) -> Dict[str, Optional[List[int]]]:
+        """Returns the signatures of the raw feature files of a repository."""
+        repo_files = utils.list_repo_files(repo_path)
+        features = [
+            feature for feature in daily_agg.FEATURE_TABLES if feature in repo_files
+        ]
+        return change_tracker.signatures([repo_files[feature] for feature in features])
+
+    def record_repo_build(
+        self,
+        repo_build: Tuple[str, Dict[str, Optional[List[int]]]],
+        all_feature: Path,
+        copy_to: Optional[str] = None,
+    ) -> None:
+        """Records the files written by aggregating a repository.
+
+        Args:
+            repo_build (Tuple[str, Dict[str, Optional[List[int]]]]): Build target
+                and signatures of the raw feature files of the repository.
+            all_feature (Path): Path of the file with all features.
+            copy_to (Optional[str], optional): Directory the file with all features
+                                               was copied to. Defaults to None.
+        """
+        outputs = feature_outputs(all_feature, self.rollups)
+        self.record_build(*repo_build, outputs, {"rollups": self.rollups})
+        if copy_to is not None:
+            ff_save = self.all_feature_copy_path(all_feature.parent, Path(copy_to))
+            self.record_build(
+                build_target("get_all_feat_data", all_feature.parent, ff_save),
+                change_tracker.signatures([all_feature]),
+                [ff_save],
+            )
+
+    def agg_repo_feat(
+        self, row_data_dir: str, save_path: str, copy_to: Optional[str] = None
+    ) -> Dict[str, str]:
         """Aggregates individual repository feature data.
+
+        With more than one worker the repositories are spread across a process
+        pool. A failing repository does not stop the others. Repositories whose
+        raw feature files did not change since the last run are skipped.
+
         Args:
             repos_dir (str): Path of Directory of the repositories to be processed.
             save_path (str): Path of Directory to save the  processed repositories.
+            copy_to (Optional[str], optional): Directory to also save the files with
+                                               all features to, as ``get_all_feat_data``
+                                               does. Defaults to None.
 
+        Returns:
+            Dict[str, str]: Status ("ok" or the error message) of each repository.
         """
 
         row_data_path, save_to = utils.set_path(row_data_dir, save_path)
         dir_list = utils.list_repos_dirs(row_data_path)
         print(f"Aggrigating {len(dir_list)} repositories feature....")
+        # Catalog the processed files as they are written.
+        catalog.open_catalog(save_to)
+        summary = {}
+        builds = {}
         for repo_path in dir_list:
-            print(repo_path)
+            target = build_target("agg_repo_feat", repo_path, save_to)
+            inputs = self.feature_inputs(repo_path)
+            if self.is_up_to_date(target, inputs, {"rollups": self.rollups}):
+                summary[repo_path.name] = "ok"
+                if copy_to is not None:
+                    all_feature = utils.get_save_path(
+                        "all_feature", repo_path, save_to, True, self.file_format
+                    )
+                    self.copy_all_feature(all_feature.parent, Path(copy_to))
+            else:
+                builds[repo_path] = (target, inputs)
+        if len(builds) < len(dir_list):
+            print(f"{len(dir_list) - len(builds)} repositories are up to date")
+
+        trace_memory = self.profile is not None and self.profile.trace_memory
+        if self.workers > 1 and len(builds) > 1:
+            with ProcessPoolExecutor(
+                max_workers=min(self.workers, len(builds))
+            ) as pool:
+                futures = {
+                    pool.submit(
+                        agg_repo, self, repo_path, save_path, copy_to, trace_memory
+                    ): repo_path
+                    for repo_path in builds
+                }
+                for future in as_completed(futures):
+                    repo_path = futures[future]
+                    summary[repo_path.name] = repo_status(future.result)
+                    if summary[repo_path.name] == "ok":
+                        # Written by a worker process, not recorded in this catalog.
+                        all_feature, record = future.result()
+                        catalog.refresh_dir(all_feature.parent)
+                        self.record_repo_build(builds[repo_path], all_feature, copy_to)
+                        self.add_repo_record(record, builds[repo_path][1])
+        else:
+            for repo_path in builds:
+
+                def process() -> None:
+                    all_feature, record = agg_repo(
+                        self, repo_path, save_path, copy_to, trace_memory
+                    )
+                    self.record_repo_build(builds[repo_path], all_feature, copy_to)
+                    self.add_repo_record(record, builds[repo_path][1])
+
+                summary[repo_path.name] = repo_status(process)
+        self.save_state()
+        print_preprocess_summary(summary)
+        print("Repository features has been merged successfully")
+        return summary
+
+    def generic_inputs(self, repos_path: Path) -> Dict[str, Optional[List[int]]]:
+        """Returns the signatures of the raw generic data files of the repositories."""
+        return change_tracker.signatures(
+            [
+                utils.get_feat_file("repo_data", repo_path)
+                for repo_path in utils.list_repos_dirs(repos_path)
+            ]
+        )
 
-            commits = self.process_commits("commits", str(repo_path), save_path)
-            forks = self.process_forks("forks", str(repo_path), save_path)
-            stars = self.process_stargazer("stargazer", str(repo_path), save_path)
-            pris = self.process_issue_pullrequest(
-                "issues_pulls", str(repo_path), save_path
-            )
+    def read_generic_data(self, raw_files: List[str]) -> pd.DataFrame:
+        """Reads the generic data of the repositories into one table.
 
-            merged_df = pd.merge(
-                commits, forks, how="outer", left_index=True, right_index=True
-            )
-            merged_df = pd.merge(
-                merged_df, stars, how="outer", left_index=True, right_index=True
-            )
-            merged_df = pd.merge(
-                merged_df, pris, how="outer", left_index=True, right_index=True
-            )
-            merged_NaN_df = merged_df.fillna(0)
-            processed_file_path = utils.get_save_path(
-                "all_feature", repo_path, save_to, True
-            )
-            merged_NaN_df.to_csv(processed_file_path, index_label="date")
-        print("Repository features has been merged successfully")
+        The files are read at once (see ``storage.read_tables``), so the time
+        grows linearly with the number of repositories. The columns are kept
+        in compact types, see ``schema.compact``.
+
+        Args:
+            raw_files (List[str]): Generic data file of each repository.
 
-    def agg_repos_generic_data(self, repos_dir: str, save_path: str) -> Optional[Path]:
+        Returns:
+            pd.DataFrame: Generic data, one row per repository and language.
+        """
+        paths = [Path(raw_file) for raw_file in raw_files]
+        concat_df = schema.compact(storage.read_tables(paths, self.workers))
+        concat_df.drop_duplicates(subset=["repo_name", "language"], inplace=True)
+        return concat_df
+
+    def generic_data_path(self, repos_path: Path, save_to: Path) -> Path:
+        """Returns the path of the generic data file of the repositories."""
+        return utils.get_save_path(
+            "generic_repos_data", repos_path, save_to, False, self.file_format
+        )
+
+    def agg_repos_generic_data(
+        self, repos_dir: str, save_path: str, force: bool = False
+    ) -> Optional[Path]:
         """Aggregates all repositoreies generic data in to one File.
 
         Args:
             repos_dir (str): Path of Directory of the repositories to be processed.
             save_path (str): Path of Directory to save the  processed repositories.
+            force (bool, optional): Rebuild even if no generic data changed since the
+                                    last run. Defaults to False.
 
         Returns:
             Optional[Path]: Path, where the generic data is saved.
         """
         repos_path, save_to = utils.set_path(repos_dir, save_path)
-
-        concat_df = pd.DataFrame()
-        for repo_path in utils.list_repos_dirs(repos_path):
-            raw_file = utils.get_feat_file("repo_data", repo_path)
-            temp_df = pd.read_csv(raw_file)
-            concat_df = pd.concat([concat_df, temp_df], ignore_index=True)
-        concat_df.drop_duplicates(subset=["repo_name", "language"], inplace=True)
-        saving_path = utils.get_save_path(
-            "generic_repos_data", repos_path, save_to, False
-        )
-        concat_df.to_csv(saving_path, index=False)
+        saving_path = self.generic_data_path(repos_path, save_to)
+        target = build_target("agg_repos_generic_data", repos_path, saving_path)
+        inputs = self.generic_inputs(repos_path)
+        if not force and self.is_up_to_date(target, inputs):
+            print(f"{saving_path.name} is up to date")
+            return saving_path
+
+        concat_df = self.read_generic_data(list(inputs))
+        storage.write_table(concat_df, saving_path)
+        self.record_build(target, inputs, [saving_path])
+        self.save_state()
 
         return saving_path
 
-    def gen_repos_age(self, repos_dir: str, save_path: str) -> None:
+    def gen_repos_age(
+        self, repos_dir: str, save_path: str, force: bool = False
+    ) -> None:
         """Genrates repository age in days.
 
         Args:
             repos_dir (str): Path of Directory of the repositories to be processed.
             save_path (str): Path of Directory to save the  processed repositories.
+            force (bool, optional): Rebuild even if no generic data changed since the
+                                    last run. Defaults to False.
         """
 
         repos_path, save_to = utils.set_path(repos_dir, save_path)
-        generic_data = self.agg_repos_generic_data(repos_dir, save_path)
+        saving_path = self.generic_data_path(repos_path, save_to)
+        target = build_target("gen_repos_age", repos_path, saving_path)
+        inputs = self.generic_inputs(repos_path)
+        if not force and self.is_up_to_date(target, inputs):
+            print(f"{saving_path.name} ages are up to date")
+            return schema.compact(
+                storage.read_table(saving_path, parse_dates=DAYS_COLUMNS)
+            )
 
-        days_cols = ["created_at", "pushed_at", "last_update_at"]
-        age_df = pd.read_csv(
-            generic_data, parse_dates=days_cols, infer_datetime_format=True
-        )
-        age_df["age_in_weeks"] = age_df.apply(
-            lambda row: ((row.last_update_at - row.created_at).days) // 7, axis=1
-        )
-        saving_path = utils.get_save_path(
-            "generic_repos_data", repos_path, save_to, False
+        # The generic data file is rewritten with the ages, so it is rebuilt
+        # rather than read back with the columns of an earlier run.
+        generic_data = self.agg_repos_generic_data(repos_dir, save_path, force=True)
+
+        age_df = schema.compact(
+            storage.read_table(generic_data, parse_dates=DAYS_COLUMNS)
         )
-        age_df.to_csv(saving_path, index=False)
+        add_repos_age(age_df)
+        storage.write_table(age_df, saving_path)
+        self.record_build(target, inputs, [saving_path])
+        self.save_state()
 
         return age_df
 
+    def all_feature_copy_path(self, repo_path: Path, save_to: Path) -> Path:
+        """Returns the path of the copy of a processed file with all features.
+
+        Args:
+            repo_path (Path): Directory of the processed repository.
+            save_to (Path): Directory of the copies.
+
+        Returns:
+            Path: Path of the copy.
+        """
+        parent = list(repo_path.parents)[0].name
+        return utils.get_save_path(
+            f"all_feature_{parent}", repo_path, save_to, False, self.file_format
+        )
+
+    def copy_all_feature(self, repo_path: Path, save_to: Path) -> bool:
+        """Copies the file with all features of a processed repository, unless
+        the copy is up to date.
+
+        Args:
+            repo_path (Path): Directory of the processed repository.
+            save_to (Path): Directory of the copies.
+
+        Returns:
+            bool: Whether the file was copied.
+        """
+        ff = utils.get_feat_file("all_feature", repo_path)
+        ff_save = self.all_feature_copy_path(repo_path, save_to)
+        target = build_target("get_all_feat_data", repo_path, ff_save)
+        inputs = change_tracker.signatures([ff])
+        if self.is_up_to_date(target, inputs):
+            return False
+
+        feat_df = schema.compact(storage.read_table(ff))
+        if "date" in feat_df.columns:
+            # CSV files store the date index as a column.
+            feat_df = feat_df.set_index("date")
+        storage.write_table(feat_df, ff_save, index=True)
+        self.record_build(target, inputs, [ff_save])
+        return True
+
     def get_all_feat_data(self, repos_dir: str, save_path: str) -> None:
         """Gets the file contains all features of a repository.
 
@@ -294,57 +565,239 @@ class RowRepoDataProcessor:
         repo_dir, save_to = utils.set_path(repos_dir, save_path)
         dir_list = utils.list_repos_dirs(repo_dir)
         print(f"Aggrigating {len(dir_list)} repositories feature....")
-        for repo_path in utils.list_repos_dirs(repo_dir):
-
-            parent = list(repo_path.parents)[0].name
-            ff = utils.get_feat_file("all_feature", repo_path)
-            feat_df = pd.read_csv(ff)
-
-            ff_save = utils.get_save_path(
-                f"all_feature_{parent}", repo_path, save_to, False
-            )
-            feat_df.to_csv(ff_save, index=False)
+        up_to_date = 0
+        for repo_path in dir_list:
+            if not self.copy_all_feature(repo_path, save_to):
+                up_to_date += 1
+        if up_to_date:
+            print(f"{up_to_date} repositories are up to date")
+        self.save_state()
 
     def set_maintainability_state(
-        self, repos_dir: str, period: int, save_path: str
+        self, repos_dir: str, period: Union[int, List[int]], save_path: str
     ) -> None:
         """defiens the maintenance state of a repository based on a last update.
 
+        With several periods, ``maintenance_state`` holds the state for the first
+        one and ``maintenance_state_<period>w`` the state for each period.
+
         Args:
             repos_dir (str): Path of Directory of the repositories to be processed.
-            period (int): Time length to define maintainbility
+            period (Union[int, List[int]]): Time length(s) in weeks to define maintainbility
             save_path (str): Path of Directory to save the  processed repositories.
         """
         repos_path, save_to = utils.set_path(repos_dir, save_path)
-        generic_data = self.agg_repos_generic_data(repos_dir, save_path)
-        df = self.gen_repos_age(repos_dir, save_path)
-
-        df["without_updates"] = df.apply(
-            lambda row: abs((row.last_update_at - row.pushed_at).days // 7), axis=1
-        )
-        df["maintenance_state"] = df.apply(
-            lambda row: "Not Active" if row.without_updates > period else "Active",
-            axis=1,
-        )
-        saving_path = utils.get_save_path(
-            "generic_repos_data", repos_path, save_to, False
-        )
-        df.to_csv(saving_path, index=False)
+        periods = [period] if isinstance(period, int) else list(period)
+        saving_path = self.generic_data_path(repos_path, save_to)
+        target = build_target("set_maintainability_state", repos_path, saving_path)
+        inputs = self.generic_inputs(repos_path)
+        if self.is_up_to_date(target, inputs, {"periods": periods}):
+            print(f"{saving_path.name} maintenance states are up to date")
+            return schema.compact(storage.read_table(saving_path))
+
+        df = self.gen_repos_age(repos_dir, save_path, force=True)
+        add_maintenance_state(df, periods)
+        storage.write_table(df, saving_path)
+        self.record_build(target, inputs, [saving_path], {"periods": periods})
+        self.save_state()
 
         return df
 
 
+def parse_dates(df: pd.DataFrame, columns: List[str]) -> pd.DataFrame:
+    """Parses date columns in place, as reading them from a CSV file does.
+
+    Args:
+        df (pd.DataFrame): Table with the date columns.
+        columns (List[str]): Date columns.
+
+    Returns:
+        pd.DataFrame: The same table.
+    """
+    for column in columns:
+        if not pd.api.types.is_datetime64_any_dtype(df[column]):
+            df[column] = pd.to_datetime(df[column])
+    return df
+
+
+def add_repos_age(df: pd.DataFrame) -> pd.DataFrame:
+    """Adds the age in weeks to the generic data of the repositories (in place).
+
+    Args:
+        df (pd.DataFrame): Generic data with parsed dates.
+
+    Returns:
+        pd.DataFrame: The same table.
+    """
+    df["age_in_weeks"] = weeks_between(df.created_at, df.last_update_at)
+    return df
+
+
+def add_maintenance_state(df: pd.DataFrame, periods: List[int]) -> pd.DataFrame:
+    """Adds the maintenance state to the generic data of the repositories (in place).
+
+    Args:
+        df (pd.DataFrame): Generic data with parsed dates.
+        periods (List[int]): Maximum weeks without updates of an active repository;
+                             the first one labels ``maintenance_state``.
+
+    Returns:
+        pd.DataFrame: The same table.
+    """
+    df["without_updates"] = weeks_between(df.pushed_at, df.last_update_at).abs()
+    states = maintenance_states(df.without_updates, periods)
+    df["maintenance_state"] = states[periods[0]]
+    if len(periods) > 1:
+        for column_period, column in states.items():
+            df[f"maintenance_state_{column_period}w"] = column
+    return df
+
+
+def weeks_between(start: pd.Series, end: pd.Series) -> pd.Series:
+    """Returns the number of whole weeks between two date columns.
+
+    Computed on the datetime64 arrays; like ``timedelta.days // 7`` the
+    weeks are rounded down and missing dates give NaN.
+
+    Args:
+        start (pd.Series): Start dates.
+        end (pd.Series): End dates.
+
+    Returns:
+        pd.Series: Weeks from start to end.
+    """
+    return (end - start) // pd.Timedelta(weeks=1)
+
+
+def maintenance_states(without_updates: pd.Series, periods: List[int]) -> pd.DataFrame:
+    """Labels repositories as "Active" or "Not Active" for several periods at once.
+
+    Args:
+        without_updates (pd.Series): Weeks without updates of each repository.
+        periods (List[int]): Maximum weeks without updates of an active repository.
+
+    Returns:
+        pd.DataFrame: One state column per period, labelled by the period.
+    """
+    # One comparison of all repositories against all periods.
+    not_active = without_updates.to_numpy()[:, np.newaxis] > np.asarray(periods)
+    states = np.where(not_active, "Not Active", "Active")
+    return pd.DataFrame(states, index=without_updates.index, columns=periods)
+
+
+def feature_outputs(
+    all_feature: Path, rollups: Optional[List[str]] = None
+) -> List[Path]:
+    """Returns the processed feature files written with an all_feature file."""
+    features = list(daily_agg.FEATURE_TABLES) + [
+        f"all_feature_{daily_agg.ROLLUPS[freq]}" for freq in rollups or []
+    ]
+    return [
+        all_feature.with_name(f"{feature}{all_feature.suffix}") for feature in features
+    ] + [all_feature]
+
+
+def agg_repo(
+    processor: RowRepoDataProcessor,
+    repo_path: Path,
+    save_path: str,
+    copy_to: Optional[str] = None,
+    trace_memory: bool = False,
+) -> Tuple[Path, Dict[str, Any]]:
+    """Aggregates the feature data of one repository (module level so that it
+    can be sent to a process pool).
+
+    Args:
+        processor (RowRepoDataProcessor): Processor used to aggregate the data.
+        repo_path (Path): Directory of the repository to be processed.
+        save_path (str): Path of Directory to save the  processed repositories.
+        copy_to (Optional[str], optional): Directory to also save the file with all
+                                           features to. Defaults to None.
+        trace_memory (bool, optional): Trace the peak Python memory of the
+                                       repository. Defaults to False.
+
+    Returns:
+        Tuple[Path, Dict[str, Any]]: Path of the file with all features of the
+                                     repository and its timings.
+    """
+    with profiling.measure({"repo": repo_path.name}, trace_memory) as record:
+        all_feature = processor.agg_one_repo_feat(repo_path, save_path, copy_to, record)
+    return all_feature, record
+
+
+def repo_status(process: Callable[[], Any]) -> str:
+    """Runs the processing of a repository and returns its status.
+
+    Args:
+        process (Callable[[], Any]): Processing of the repository, e.g. the result
+                                      method of its future.
+
+    Returns:
+        str: "ok" or the error message.
+    """
+    try:
+        process()
+        return "ok"
+    # utils exits on a missing or empty directory, which is an error of this
+    # repository only.
+    except (Exception, SystemExit) as e:
+        print(f"Failed: {type(e).__name__}: {e}")
+        return f"{type(e).__name__}: {e}"
+
+
+def print_preprocess_summary(summary: Dict[str, str]) -> None:
+    """Prints one consolidated summary of the aggregated repositories.
+
+    Args:
+        summary (Dict[str, str]): Status of each repository.
+    """
+    failed = {name: state for name, state in summary.items() if state != "ok"}
+    print("#" * 25)
+    print(f"Repositories aggregated: {len(summary) - len(failed)} / {len(summary)}")
+    for repo_name, error in failed.items():
+        print(f"  {repo_name}: {error}")
+    print("#" * 25)
+
+
 @hydra.main(config_path="conf", config_name="config", version_base=None)
 def main(cfg: ReposConfig):
 
-    repo_processor = RowRepoDataProcessor()
-    repo_processor.agg_repo_feat(cfg.paths.raw_data, cfg.paths.processed_data)
-    repo_processor.get_all_feat_data(cfg.paths.processed_data, cfg.paths.final_data)
-    repo_processor.agg_repos_generic_data(cfg.paths.raw_data, cfg.paths.processed_data)
-    repo_processor.gen_repos_age(cfg.paths.raw_data, cfg.paths.processed_data)
-    repo_processor.set_maintainability_state(
-        cfg.paths.raw_data, 24, cfg.paths.final_data
+    catalog.configure(cfg.catalog.enabled, cfg.catalog.manifest, cfg.catalog.verify)
+    tracker = None
+    if cfg.preprocess.incremental:
+        tracker = ChangeTracker(
+            Path(cfg.paths.processed_data, change_tracker.STATE_FILE)
+        )
+    profile = None
+    if cfg.profiling.enabled:
+        profile = RunProfile(
+            cfg.profiling.top, cfg.profiling.cprofile, cfg.profiling.tracemalloc
+        )
+    repo_processor = RowRepoDataProcessor(
+        cfg.storage.format,
+        cfg.preprocess.workers,
+        tracker,
+        list(cfg.preprocess.rollups),
+        cfg.preprocess.chunk_rows,
+        profile,
     )
+    # Imported here as pipeline builds on this module.
+    from pipeline import PreprocessPipeline
+
+    if profile is not None:
+        profile.start()
+    PreprocessPipeline(
+        repo_processor,
+        cfg.paths.raw_data,
+        cfg.paths.processed_data,
+        cfg.paths.final_data,
+        list(cfg.preprocess.maintenance_periods),
+    ).run()
+    catalog.save_catalogs()
+    if profile is not None:
+        profile.stop()
+        report_file = profile.save(Path(cfg.profiling.report_dir))
+        print(f"Run report is saved in {report_file}")
 
     print("--- Process has been Done. ---")
 
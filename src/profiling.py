@@ -0,0 +1,213 @@
+import contextlib
+import cProfile
+import io
+import json
+import pstats
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+from benchmark import git_revision, peak_rss_mb
+
+MiB = 1024 * 1024
+
+
+@contextlib.contextmanager
+def measure(
+    record: Dict[str, Any], trace_memory: bool = False
+) -> Iterator[Dict[str, Any]]:
+    """Measures the wall time, CPU time and memory of a block into a record.
+
+    Args:
+        record (Dict[str, Any]): Record of the block, e.g. {"repo": name}.
+        trace_memory (bool, optional): Also trace the peak memory allocated by
+                                       Python in the block (slower). Defaults to False.
+
+    Yields:
+        Iterator[Dict[str, Any]]: The record, filled in when the block ends.
+    """
+    if trace_memory:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+    start_wall, start_cpu = time.perf_counter(), time.process_time()
+    try:
+        yield record
+    finally:
+        record["wall_seconds"] = time.perf_counter() - start_wall
+        record["cpu_seconds"] = time.process_time() - start_cpu
+        record["peak_rss_mb"] = peak_rss_mb()
+        if trace_memory:
+            record["traced_peak_mb"] = tracemalloc.get_traced_memory()[1] / MiB
+
+
+@contextlib.contextmanager
+def timed(timings: Optional[Dict[str, float]], key: str) -> Iterator[None]:
+    """Adds the wall time of a block to a timing, if timings are collected.
+
+    Args:
+        timings (Optional[Dict[str, float]]): Timings of a repository, None to skip.
+        key (str): Name of the timing, e.g. "read_seconds".
+    """
+    if timings is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[key] = timings.get(key, 0.0) + time.perf_counter() - start
+
+
+def slowest(records: List[Dict[str, Any]], key: str, top: int) -> List[Dict[str, Any]]:
+    """Returns the records with the largest values of a key, largest first."""
+    return sorted(records, key=lambda record: record.get(key, 0.0), reverse=True)[:top]
+
+
+class RunProfile:
+    """Timings of the stages and repositories of one preprocessing run.
+
+    Stages may run inside each other (e.g. the ages read the generic data),
+    so every stage records its own time besides the time of the stages it
+    ran. The repositories are timed where they are processed, also in the
+    worker processes, and sent back with their results. cProfile only sees
+    the main process, so the repositories are included with one worker.
+    """
+
+    def __init__(
+        self, top: int = 10, cprofile: bool = False, trace_memory: bool = False
+    ):
+        """Empty profile of a run.
+
+        Args:
+            top (int, optional): Slowest stages and repositories listed in the
+                                 report. Defaults to 10.
+            cprofile (bool, optional): Profile the functions called by the main
+                                       process. Defaults to False.
+            trace_memory (bool, optional): Trace the peak Python memory of each
+                                           stage and repository. Defaults to False.
+        """
+        self.top = top
+        self.trace_memory = trace_memory
+        self.profiler = cProfile.Profile() if cprofile else None
+        self.stages: List[Dict[str, Any]] = []
+        self.repos: List[Dict[str, Any]] = []
+        # Stages running, innermost last.
+        self.running: List[Dict[str, Any]] = []
+        self.started = datetime.now()
+        self.start_wall = time.perf_counter()
+
+    def __repr__(self):
+        return f"RunProfile({len(self.stages)} stages, {len(self.repos)} repositories)"
+
+    def start(self) -> None:
+        """Starts the profiler, if any."""
+        if self.profiler is not None:
+            self.profiler.enable()
+
+    def stop(self) -> None:
+        """Stops the profiler, if any."""
+        if self.profiler is not None:
+            self.profiler.disable()
+
+    @contextlib.contextmanager
+    def stage(self, name: str) -> Iterator[Dict[str, Any]]:
+        """Times a stage of the run.
+
+        Args:
+            name (str): Name of the stage, e.g. "repo_features".
+
+        Yields:
+            Iterator[Dict[str, Any]]: Record of the stage.
+        """
+        parent = self.running[-1] if self.running else None
+        record = {
+            "stage": name,
+            "parent": parent and parent["stage"],
+            "nested_seconds": 0.0,
+        }
+        self.running.append(record)
+        try:
+            with measure(record, self.trace_memory):
+                yield record
+        finally:
+            self.running.pop()
+            record["self_seconds"] = record["wall_seconds"] - record.pop(
+                "nested_seconds"
+            )
+            if parent is not None:
+                parent["nested_seconds"] += record["wall_seconds"]
+            self.stages.append(record)
+
+    def add_repo(self, record: Dict[str, Any]) -> None:
+        """Adds the timings of a processed repository, see ``measure``."""
+        self.repos.append(record)
+
+    def functions(self) -> List[Dict[str, Any]]:
+        """Returns the functions with the most cumulative time, if profiled."""
+        if self.profiler is None:
+            return []
+        stats = pstats.Stats(self.profiler, stream=io.StringIO())
+        rows = []
+        for (file_name, line, function), (
+            _,
+            calls,
+            own,
+            total,
+            _,
+        ) in stats.stats.items():
+            rows.append(
+                {
+                    "function": f"{Path(file_name).name}:{line}({function})",
+                    "calls": calls,
+                    "own_seconds": own,
+                    "cumulative_seconds": total,
+                }
+            )
+        return slowest(rows, "cumulative_seconds", self.top * 3)
+
+    def report(self) -> Dict[str, Any]:
+        """Returns the report of the run.
+
+        Returns:
+            Dict[str, Any]: Total time, the stages in the order they finished,
+                            the slowest stages (own time) and repositories, and
+                            the profiled functions.
+        """
+        repo_seconds = [record["wall_seconds"] for record in self.repos]
+        return {
+            "created_at": self.started.isoformat(timespec="seconds"),
+            "revision": git_revision(),
+            "wall_seconds": time.perf_counter() - self.start_wall,
+            "peak_rss_mb": peak_rss_mb(),
+            "stages": self.stages,
+            "slowest_stages": slowest(self.stages, "self_seconds", self.top),
+            "repos": {
+                "count": len(self.repos),
+                "total_seconds": sum(repo_seconds),
+                "mean_seconds": (
+                    sum(repo_seconds) / len(repo_seconds) if repo_seconds else 0.0
+                ),
+            },
+            "slowest_repos": slowest(self.repos, "wall_seconds", self.top),
+            "functions": self.functions(),
+        }
+
+    def save(self, report_dir: Path, name: str = "preprocess") -> Path:
+        """Saves the report as JSON file named after the run and its start time.
+
+        Args:
+            report_dir (Path): Directory of the reports.
+            name (str, optional): Name of the run. Defaults to "preprocess".
+
+        Returns:
+            Path: Path of the report file.
+        """
+        report_dir = Path(report_dir)
+        report_dir.mkdir(parents=True, exist_ok=True)
+        report_file = report_dir / f"{name}-{self.started:%Y%m%d-%H%M%S}.json"
+        with open(report_file, "w") as f:
+            json.dump(self.report(), f, indent=2)
+        return report_file
@@ -0,0 +1,316 @@
+import hashlib
+import logging
+import math
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, Mapping, Optional, Tuple, Type
+
+from github import Github
+from github.Requester import HTTPRequestsConnectionClass
+
+from http_cache import ThreadLocalRequest
+from telemetry import FetchTelemetry
+
+RATE_LIMIT_STATUSES = (403, 429)
+
+
+def token_key(token: Optional[str]) -> str:
+    """Returns a short, non-secret identifier of an access token."""
+    return hashlib.sha256((token or "").encode()).hexdigest()[:12]
+
+
+def resource_of(url: str) -> str:
+    """Returns the GitHub rate-limit resource a request URL is counted against."""
+    path = url.split("?")[0]
+    if path.endswith("/graphql"):
+        return "graphql"
+    if "/search/" in path:
+        return "search"
+    return "core"
+
+
+@dataclass
+class TokenBudget:
+    """Request budget of one token and rate-limit resource."""
+
+    remaining: int
+    limit: int
+    reset: float
+
+
+class RateLimitScheduler:
+    """Token bucket shared by all fetch workers and tokens.
+
+    The bucket of each token and resource (core, graphql, search) is filled
+    from the ``X-RateLimit-*`` headers of every response and drained by one
+    request at a time, so concurrent workers see the same budget. When the
+    budget falls to ``min_remaining`` the requesting worker sleeps exactly until
+    the reset time. Secondary (abuse) limits are retried after ``Retry-After``
+    or an exponential backoff. Worker processes each own a scheduler, but since
+    the buckets are refreshed from the headers they still follow the shared
+    quota reported by GitHub.
+    """
+
+    def __init__(
+        self,
+        min_remaining: int = 50,
+        max_backoff: float = 900.0,
+        clock: Callable[[], float] = time.time,
+        sleeper: Callable[[float], None] = time.sleep,
+    ) -> None:
+        """Initialization of the RateLimitScheduler class.
+
+        Args:
+            min_remaining (int, optional): Requests kept in reserve per token. Defaults to 50.
+            max_backoff (float, optional): Longest backoff in seconds after a secondary
+                                           rate limit. Defaults to 900.0.
+            clock (Callable[[], float], optional): Current epoch time, compared with the
+                                                   reset times. Defaults to time.time.
+            sleeper (Callable[[float], None], optional): Waits the given seconds.
+                                                         Defaults to time.sleep.
+        """
+        self.min_remaining = min_remaining
+        self.max_backoff = max_backoff
+        self.clock = clock
+        self.sleeper = sleeper
+        self.stats = {"waits": 0, "waited_seconds": 0.0, "secondary_limits": 0}
+        self._budgets: Dict[Tuple[str, str], TokenBudget] = {}
+        self._lock = threading.Lock()
+
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def remaining(self, key: str, resource: str = "core") -> float:
+        """Returns the remaining requests of a token (infinite while unknown)."""
+        with self._lock:
+            budget = self._budgets.get((key, resource))
+            if budget is None or budget.reset <= self.clock():
+                return math.inf
+            return budget.remaining
+
+    def reserve(self, key: str, resource: str = "core") -> float:
+        """Takes one request from the bucket if the budget allows it.
+
+        Args:
+            key (str): Token identifier.
+            resource (str, optional): Rate-limit resource. Defaults to "core".
+
+        Returns:
+            float: 0 if the request may be sent, otherwise the seconds until reset.
+        """
+        now = self.clock()
+        with self._lock:
+            budget = self._budgets.get((key, resource))
+            if budget is None or budget.reset <= now:
+                return 0.0
+            if budget.remaining > self.min_remaining:
+                budget.remaining -= 1
+                return 0.0
+            return budget.reset - now + 1
+
+    def acquire(self, key: str, resource: str = "core") -> float:
+        """Blocks until the bucket of the token has budget for one request.
+
+        Args:
+            key (str): Token identifier.
+            resource (str, optional): Rate-limit resource. Defaults to "core".
+
+        Returns:
+            float: Seconds waited for the budget.
+        """
+        waited = 0.0
+        while True:
+            wait = self.reserve(key, resource)
+            if wait <= 0:
+                return waited
+            minutes = math.ceil(wait / 60)
+            print(f"Waiting for {minutes} minutes to refresh request limit...")
+            logging.info(
+                f"{resource} rate limit reached, waiting {wait:.0f}s until reset"
+            )
+            self.sleep(wait)
+            waited += wait
+
+    def update(self, key: str, resource: str, headers: Mapping[str, str]) -> None:
+        """Refills the bucket of a token from the rate-limit headers of a response.
+
+        Args:
+            key (str): Token identifier.
+            resource (str): Rate-limit resource of the request.
+            headers (Mapping[str, str]): Response headers (lower case names).
+        """
+        if "x-ratelimit-remaining" not in headers:
+            return
+        resource = headers.get("x-ratelimit-resource", resource)
+        remaining = int(headers["x-ratelimit-remaining"])
+        limit = int(headers.get("x-ratelimit-limit", remaining))
+        reset = float(headers.get("x-ratelimit-reset", self.clock() + 3600))
+        with self._lock:
+            budget = self._budgets.get((key, resource))
+            if budget is None or reset > budget.reset:
+                self._budgets[(key, resource)] = TokenBudget(remaining, limit, reset)
+            else:
+                # Responses of concurrent requests arrive out of order.
+                budget.remaining = min(budget.remaining, remaining)
+
+    def retry_after(
+        self,
+        key: str,
+        resource: str,
+        status: int,
+        headers: Mapping[str, str],
+        body: str,
+        attempt: int,
+    ) -> Optional[float]:
+        """Updates the bucket from a response and tells whether to retry it.
+
+        Args:
+            key (str): Token identifier.
+            resource (str): Rate-limit resource of the request.
+            status (int): HTTP status of the response.
+            headers (Mapping[str, str]): Response headers (lower case names).
+            body (str): Response body (only inspected for 403/429 responses).
+            attempt (int): Number of previous retries of the request.
+
+        Returns:
+            Optional[float]: Seconds to wait before retrying, or None if the
+                             response is not rate limited.
+        """
+        self.update(key, resource, headers)
+        if status not in RATE_LIMIT_STATUSES:
+            return None
+        if "retry-after" in headers:
+            self.count_secondary()
+            return float(headers["retry-after"])
+        if headers.get("x-ratelimit-remaining") == "0":
+            reset = float(headers.get("x-ratelimit-reset", self.clock() + 60))
+            return max(0.0, reset - self.clock()) + 1
+        if status == 429 or "secondary rate limit" in body.lower():
+            self.count_secondary()
+            return min(self.max_backoff, 60.0 * 2**attempt)
+        return None
+
+    def count_secondary(self) -> None:
+        """Records a secondary (abuse) rate limit in the statistics."""
+        with self._lock:
+            self.stats["secondary_limits"] += 1
+
+    def report(self) -> str:
+        """Returns a one line summary of the rate-limit statistics."""
+        return (
+            f"Rate limit: {self.stats['waits']} waits "
+            f"({self.stats['waited_seconds']:.0f}s), "
+            f"{self.stats['secondary_limits']} secondary limits"
+        )
+
+    def count_wait(self, seconds: float) -> None:
+        """Records a wait for the rate limit in the statistics."""
+        with self._lock:
+            self.stats["waits"] += 1
+            self.stats["waited_seconds"] += seconds
+
+    def sleep(self, seconds: float) -> None:
+        """Sleeps and records the wait in the statistics."""
+        self.count_wait(seconds)
+        self.sleeper(seconds)
+
+
+def response_size(response) -> int:
+    """Returns the bytes of a response body received from GitHub (0 if cached)."""
+    received = getattr(response, "response", None)
+    return len(received.content) if received is not None else 0
+
+
+def rate_limited_connection_class(
+    base: Type[HTTPRequestsConnectionClass],
+    scheduler: RateLimitScheduler,
+    key: str,
+    telemetry: Optional[FetchTelemetry] = None,
+) -> Type[HTTPRequestsConnectionClass]:
+    """Returns a PyGithub connection class that requests through the scheduler.
+
+    Args:
+        base (Type[HTTPRequestsConnectionClass]): Connection class to extend.
+        scheduler (RateLimitScheduler): Shared rate-limit scheduler.
+        key (str): Identifier of the client's token.
+        telemetry (Optional[FetchTelemetry], optional): Counters of the requests
+                                                        and waits. Defaults to None.
+
+    Returns:
+        Type[HTTPRequestsConnectionClass]: Rate-limited connection class.
+    """
+
+    # The caching connection keeps the request per thread already.
+    bases = (
+        (base,) if issubclass(base, ThreadLocalRequest) else (ThreadLocalRequest, base)
+    )
+
+    class RateLimitedConnection(*bases):
+        def getresponse(self):
+            # Sent again as it is on a retry.
+            url = self.url
+            request = (self.verb, url, self.input, dict(self.headers))
+            stream = getattr(self.thread_request, "stream", None)
+            resource = resource_of(url)
+            attempt = 0
+            while True:
+                if attempt:
+                    self.request(
+                        *request, **({} if stream is None else {"stream": stream})
+                    )
+                waited = scheduler.acquire(key, resource)
+                start = time.perf_counter()
+                response = super().getresponse()
+                if telemetry is not None:
+                    if waited:
+                        telemetry.record_wait(url, waited)
+                    telemetry.record_request(
+                        url,
+                        response.status,
+                        time.perf_counter() - start,
+                        response_size(response),
+                    )
+                headers = {k.lower(): v for k, v in response.getheaders()}
+                body = response.read() if response.status in RATE_LIMIT_STATUSES else ""
+                wait = scheduler.retry_after(
+                    key, resource, response.status, headers, body, attempt
+                )
+                if wait is None:
+                    return response
+                logging.info(f"Rate limited on {url}, retrying in {wait:.0f}s")
+                scheduler.sleep(wait)
+                if telemetry is not None:
+                    telemetry.record_wait(url, wait)
+                attempt += 1
+
+    return RateLimitedConnection
+
+
+def install_rate_limiter(
+    client: Github,
+    scheduler: RateLimitScheduler,
+    token: Optional[str],
+    telemetry: Optional[FetchTelemetry] = None,
+) -> None:
+    """Routes the requests of a GitHub client through the rate-limit scheduler.
+
+    Args:
+        client (Github): GitHub client.
+        scheduler (RateLimitScheduler): Shared rate-limit scheduler.
+        token (Optional[str]): Access token of the client.
+        telemetry (Optional[FetchTelemetry], optional): Counters of the requests
+                                                        and waits. Defaults to None.
+    """
+    requester = client._Github__requester
+    base = requester._Requester__connectionClass
+    requester._Requester__connectionClass = rate_limited_connection_class(
+        base, scheduler, token_key(token), telemetry
+    )
+    requester._Requester__connection = None
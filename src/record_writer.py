@@ -0,0 +1,177 @@
+import shutil
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import pandas as pd
+
+import storage
+
+
+class RecordWriter:
+    """Streams records to a CSV file in fixed-size batches.
+
+    Records are buffered in memory and appended to a ``.part`` file every
+    ``batch_size`` records, so memory use stays flat and the write cost is
+    linear in the number of records. The ``.part`` file is merged into the
+    final file on ``close``, so the final file only changes once the records
+    are complete. The ``.part`` file is always CSV; a final file with the
+    ".parquet" suffix is converted to Parquet on ``close``.
+    """
+
+    MODES = ("write", "append", "prepend", "upsert")
+
+    def __init__(
+        self,
+        file_path: Path,
+        columns: List[str],
+        batch_size: int = 1000,
+        mode: str = "write",
+        key: Optional[str] = None,
+        snapshot: Optional[List[str]] = None,
+    ) -> None:
+        """Initialization of the RecordWriter class.
+
+        Args:
+            file_path (Path): Path of the final file.
+            columns (List[str]): Column names in the order they are written.
+            batch_size (int, optional): Number of records buffered before a flush.
+                                        Defaults to 1000.
+            mode (str, optional): How the records are merged into an existing final
+                                  file: "write" replaces it, "append" adds them to its
+                                  end, "prepend" to its start (files listed newest
+                                  first) and "upsert" replaces the rows whose ``key``
+                                  was written again. Defaults to "write".
+            key (Optional[str], optional): Column identifying a row in "upsert" mode.
+                                           Defaults to None.
+            snapshot (Optional[List[str]], optional): Columns holding a total at fetch
+                                                      time (e.g. commit_count); the
+                                                      existing rows take the value of
+                                                      the new records. Defaults to None.
+
+        Raises:
+            ValueError: If the mode is unknown or "upsert" has no key.
+        """
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown mode: {mode!r}, use one of {self.MODES}")
+        if mode == "upsert" and key is None:
+            raise ValueError("The upsert mode requires a key column")
+        self.mode = mode
+        self.key = key
+        self.snapshot = snapshot or []
+        self.file_path = Path(file_path)
+        self.part_path = self.file_path.with_suffix(self.file_path.suffix + ".part")
+        self.columns = columns
+        self.batch_size = max(1, batch_size)
+        self.count = 0
+        self._batch: List[Dict[str, Any]] = []
+        self._started = False
+
+    def __enter__(self) -> "RecordWriter":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            # Keep what has been fetched so far in the .part file.
+            self.flush()
+
+    def resume(self, records: int) -> bool:
+        """Continues an interrupted ``.part`` file after its first ``records`` records.
+
+        Records flushed after the last checkpoint are cut off, so that they are
+        not written twice when their page is fetched again.
+
+        Args:
+            records (int): Number of records to keep.
+
+        Returns:
+            bool: True if the ``.part`` file holds at least ``records`` records.
+        """
+        if not self.part_path.exists():
+            return False
+        with open(self.part_path, "r+b") as part:
+            if not part.readline():
+                return False
+            for _ in range(records):
+                if not part.readline():
+                    return False
+            part.truncate(part.tell())
+        self._started = True
+        self.count = records
+        return True
+
+    def write(self, record: Dict[str, Any]) -> None:
+        """Buffers one record and flushes the batch once it is full.
+
+        Args:
+            record (Dict[str, Any]): Record keyed by column name.
+        """
+        self._batch.append(record)
+        self.count += 1
+        if len(self._batch) >= self.batch_size:
+            self.flush()
+
+    def write_many(self, records: List[Dict[str, Any]]) -> None:
+        """Buffers several records and flushes the batch once it is full.
+
+        Args:
+            records (List[Dict[str, Any]]): Records keyed by column name.
+        """
+        self._batch.extend(records)
+        self.count += len(records)
+        if len(self._batch) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        """Appends the buffered records to the ``.part`` file."""
+        if self._started and not self._batch:
+            return
+        batch_df = pd.DataFrame.from_records(self._batch, columns=self.columns)
+        batch_df.to_csv(
+            self.part_path,
+            mode="a" if self._started else "w",
+            header=not self._started,
+            index=False,
+        )
+        self._started = True
+        self._batch = []
+
+    def close(self) -> Path:
+        """Flushes the remaining records and merges them into the final file.
+
+        Returns:
+            Path: Path of the final file.
+        """
+        self.flush()
+        merge = self.mode != "write" and self.file_path.exists()
+        if not storage.is_parquet(self.file_path) and not merge:
+            self.part_path.replace(self.file_path)
+        elif (
+            not storage.is_parquet(self.file_path)
+            and self.mode == "append"
+            and not self.snapshot
+        ):
+            with open(self.part_path) as part, open(self.file_path, "a") as final:
+                part.readline()  # header
+                shutil.copyfileobj(part, final)
+            self.part_path.unlink()
+        else:
+            new_df = pd.read_csv(self.part_path)
+            if merge:
+                old_df = storage.read_table(self.file_path)
+                if len(new_df):
+                    for column in self.snapshot:
+                        old_df[column] = new_df[column].iloc[0]
+                if self.mode == "upsert":
+                    old_df = old_df[~old_df[self.key].isin(new_df[self.key])]
+                    new_df = pd.concat([new_df, old_df], ignore_index=True)
+                elif self.mode == "prepend":
+                    new_df = pd.concat([new_df, old_df], ignore_index=True)
+                else:
+                    new_df = pd.concat([old_df, new_df], ignore_index=True)
+            tmp_path = self.part_path.with_suffix(".tmp" + self.file_path.suffix)
+            storage.write_table(new_df[self.columns], tmp_path)
+            tmp_path.replace(self.file_path)
+            self.part_path.unlink()
+        return self.file_path
@@ -0,0 +1,109 @@
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+# Columns stored as timestamps in Parquet files.
+DATE_COLUMNS = frozenset(
+    [
+        "commit_date",
+        "forked_at",
+        "starred_at",
+        "subscribed_at",
+        "contributed_date",
+        "pr_iss_opened_at",
+        "pr_iss_updated_at",
+        "pr_iss_closed_at",
+        "created_at",
+        "pushed_at",
+        "last_update_at",
+    ]
+)
+# String columns always kept as categories.
+CATEGORY_COLUMNS = frozenset(["repo_name"])
+# Other string columns become categories when at most this share of their
+# values is distinct, e.g. the languages or the users starring several
+# repositories. Mostly distinct strings (urls, shas) are cheaper as they are.
+CATEGORY_RATIO = 0.5
+# Integer columns of the raw and processed files holding counts (or numbers).
+COUNT_COLUMNS = frozenset(
+    [
+        "commit_count",
+        "forks_count",
+        "Stars_count",
+        "pr_iss_Open_count",
+        "pr_iss_updated_count",
+        "pr_is_closed_count",
+        "fork_count",
+        "watchers_count",
+        "subscribers_count",
+        "contributors_count",
+        "stars",
+        "branch_count",
+        "milestone_count",
+        "pullrequest_count",
+        "release_count",
+        "workflow_count",
+        "issues_count",
+        "pr_iss_number",
+    ]
+)
+# Smallest type of the counts: sums and differences of counts stay in range.
+COUNT_DTYPE = np.int32
+
+
+def count_dtype(values: np.ndarray) -> np.dtype:
+    """Returns the count type holding some integer values, see ``COUNT_DTYPE``."""
+    limits = np.iinfo(COUNT_DTYPE)
+    if len(values) and (values.min() < limits.min or values.max() > limits.max):
+        return np.dtype(np.int64)
+    return np.dtype(COUNT_DTYPE)
+
+
+def count_array(counts: np.ndarray, valid: Optional[np.ndarray] = None):
+    """Returns counts in the count type, missing where not valid.
+
+    Args:
+        counts (np.ndarray): Integer counts.
+        valid (Optional[np.ndarray], optional): Mask of the known counts.
+                                                Defaults to None (all known).
+
+    Returns:
+        Union[np.ndarray, pd.arrays.IntegerArray]: The counts, a nullable integer
+                                                   array if some are missing.
+    """
+    counts = counts.astype(count_dtype(counts), copy=False)
+    if valid is None or valid.all():
+        return counts
+    return pd.arrays.IntegerArray(counts, ~valid)
+
+
+def is_repeated(values: pd.Series) -> bool:
+    """Tells whether a string column repeats its values enough to be a category."""
+    return values.nunique() <= CATEGORY_RATIO * len(values)
+
+
+def compact(df: pd.DataFrame) -> pd.DataFrame:
+    """Converts the columns of a table to compact types (in place).
+
+    Repeated strings become categories and integer counts the count type.
+    Dates are parsed when the files are read (and stored as timestamps in
+    Parquet files), so they are already ``datetime64``.
+
+    Args:
+        df (pd.DataFrame): Table read from or written to a data file.
+
+    Returns:
+        pd.DataFrame: The same table.
+    """
+    for column in df.columns:
+        values = df[column]
+        if isinstance(values.dtype, pd.CategoricalDtype) or column in DATE_COLUMNS:
+            continue
+        if values.dtype == object or isinstance(values.dtype, pd.StringDtype):
+            if column in CATEGORY_COLUMNS or is_repeated(values):
+                df[column] = values.astype("category")
+        elif column in COUNT_COLUMNS and pd.api.types.is_integer_dtype(values):
+            if isinstance(values.dtype, np.dtype):
+                df[column] = values.astype(count_dtype(values.to_numpy()))
+    return df
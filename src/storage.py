@@ -0,0 +1,252 @@
+import io
+import itertools
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Iterator, List, Optional, Tuple, Union
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet support is optional
+    pa = pq = None
+
+import schema
+
+FORMATS = {"csv": ".csv", "parquet": ".parquet"}
+
+
+def check_format(file_format: str) -> str:
+    """Checks that a storage format is known and available.
+
+    Args:
+        file_format (str): "csv" or "parquet".
+
+    Raises:
+        ValueError: If the format is unknown.
+        ImportError: If the format is "parquet" and pyarrow is not installed.
+
+    Returns:
+        str: File suffix of the format.
+    """
+    if file_format not in FORMATS:
+        raise ValueError(
+            f"Unknown storage format: {file_format!r}, use one of {list(FORMATS)}"
+        )
+    if file_format == "parquet" and pq is None:
+        raise ImportError(
+            "The parquet storage format requires pyarrow (pip install pyarrow)"
+        )
+    return FORMATS[file_format]
+
+
+def is_parquet(file_path: Path) -> bool:
+    """Tells whether a data file is stored as Parquet."""
+    return Path(file_path).suffix == FORMATS["parquet"]
+
+
+def to_utc_dates(values: pd.Series) -> pd.Series:
+    """Parses dates to naive UTC timestamps, as written by PyGithub.
+
+    Args:
+        values (pd.Series): Naive (UTC) or timezone aware dates or strings.
+
+    Returns:
+        pd.Series: Naive UTC timestamps.
+    """
+    try:
+        dates = pd.to_datetime(values, utc=True)
+    except ValueError:
+        # Files written by different PyGithub versions mix naive and aware dates.
+        dates = pd.to_datetime(
+            values.map(lambda value: pd.Timestamp(value), na_action="ignore"), utc=True
+        )
+    return dates.dt.tz_localize(None)
+
+
+def read_columns(file_path: Path) -> List[str]:
+    """Returns the column names of a data file without reading its rows.
+
+    Args:
+        file_path (Path): Path of the data file.
+
+    Returns:
+        List[str]: Column names.
+    """
+    if is_parquet(file_path):
+        names = pq.read_schema(file_path).names
+        return [name for name in names if not name.startswith("__index_level_")]
+    return list(pd.read_csv(file_path, nrows=0).columns)
+
+
+def count_rows(file_path: Path) -> int:
+    """Counts the records of a data file.
+
+    Args:
+        file_path (Path): Path of the data file.
+
+    Returns:
+        int: Number of records.
+    """
+    if is_parquet(file_path):
+        return pq.ParquetFile(file_path).metadata.num_rows
+    with open(file_path, "rb") as f:
+        return max(0, sum(1 for _ in f) - 1)
+
+
+def read_table(
+    file_path: Path,
+    columns: Optional[List[str]] = None,
+    parse_dates: Optional[List[str]] = None,
+    **read_csv_kwargs: Any,
+) -> pd.DataFrame:
+    """Reads a CSV or Parquet data file.
+
+    Only the requested columns are read. Parquet files keep their column
+    types, so dates are only parsed for CSV files.
+
+    Args:
+        file_path (Path): Path of the data file.
+        columns (Optional[List[str]], optional): Columns to read. Defaults to all.
+        parse_dates (Optional[List[str]], optional): Date columns of a CSV file.
+                                                     Defaults to None.
+        **read_csv_kwargs (Any): Further arguments for ``pd.read_csv``.
+
+    Returns:
+        pd.DataFrame: Content of the file.
+    """
+    if is_parquet(file_path):
+        return pd.read_parquet(file_path, columns=columns)
+    return pd.read_csv(
+        file_path, usecols=columns, parse_dates=parse_dates or False, **read_csv_kwargs
+    )
+
+
+def iter_table(
+    file_path: Path,
+    chunk_rows: int,
+    columns: Optional[List[str]] = None,
+    parse_dates: Optional[List[str]] = None,
+) -> Iterator[pd.DataFrame]:
+    """Reads a CSV or Parquet data file in chunks of rows, see ``read_table``.
+
+    Args:
+        file_path (Path): Path of the data file.
+        chunk_rows (int): Maximum number of rows of a chunk.
+        columns (Optional[List[str]], optional): Columns to read. Defaults to all.
+        parse_dates (Optional[List[str]], optional): Date columns of a CSV file.
+                                                     Defaults to None.
+
+    Yields:
+        Iterator[pd.DataFrame]: Consecutive rows of the file.
+    """
+    if is_parquet(file_path):
+        parquet_file = pq.ParquetFile(file_path)
+        for batch in parquet_file.iter_batches(batch_size=chunk_rows, columns=columns):
+            yield batch.to_pandas()
+        return
+    with pd.read_csv(
+        file_path,
+        usecols=columns,
+        parse_dates=parse_dates or False,
+        chunksize=chunk_rows,
+    ) as reader:
+        yield from reader
+
+
+def read_raw(file_path: Path) -> Tuple[Tuple[str, bytes], Any]:
+    """Reads a data file without converting it to a DataFrame.
+
+    Args:
+        file_path (Path): Path of the data file.
+
+    Returns:
+        Tuple[Tuple[str, bytes], Any]: Format and CSV header of the file, and its
+                                       Arrow table or CSV rows.
+    """
+    if is_parquet(file_path):
+        check_format("parquet")
+        # The files are read in parallel already.
+        return ("parquet", b""), pq.ParquetFile(file_path).read(use_threads=False)
+    header, _, rows = Path(file_path).read_bytes().partition(b"\n")
+    if rows and not rows.endswith(b"\n"):
+        rows += b"\n"
+    return ("csv", header), rows
+
+
+def read_tables(file_paths: List[Path], workers: int = 1) -> pd.DataFrame:
+    """Reads many small data files into one table.
+
+    The files are read by a thread pool, then consecutive CSV files with the
+    same header are parsed as one file and Parquet files are concatenated as
+    Arrow tables. A table is built once instead of once per file, so reading
+    costs little more than the file system access.
+
+    Args:
+        file_paths (List[Path]): Paths of the data files, in the order of the rows.
+        workers (int, optional): Threads reading the files. Defaults to 1.
+
+    Returns:
+        pd.DataFrame: Rows of all files.
+    """
+    if not file_paths:
+        return pd.DataFrame()
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(file_paths)))) as pool:
+        contents = list(pool.map(read_raw, file_paths))
+
+    frames = []
+    runs = itertools.groupby(contents, key=lambda content: content[0])
+    for (file_format, header), run in runs:
+        parts = [part for _, part in run]
+        if file_format == "csv":
+            frames.append(pd.read_csv(io.BytesIO(header + b"\n" + b"".join(parts))))
+            continue
+        try:
+            frame = pa.concat_tables(parts).to_pandas()
+        except pa.ArrowInvalid:
+            # Files written with different columns.
+            frames.extend(part.to_pandas() for part in parts)
+            continue
+        # The dictionaries of the files are merged in the order the values
+        # appear; sorted, as converting the values to a category does.
+        for column, dtype in frame.dtypes.items():
+            if isinstance(dtype, pd.CategoricalDtype):
+                frame[column] = frame[column].cat.reorder_categories(
+                    dtype.categories.sort_values()
+                )
+        frames.append(frame)
+    return frames[0] if len(frames) == 1 else pd.concat(frames, ignore_index=True)
+
+
+def write_table(
+    data: Union[pd.DataFrame, pd.Series],
+    file_path: Path,
+    index: bool = False,
+    compression: str = "snappy",
+) -> Path:
+    """Writes a data file in the format given by its suffix.
+
+    Parquet files store the dates as timestamps, and the columns in the
+    compact types of ``schema.compact`` (repeated strings dictionary encoded).
+
+    Args:
+        data (Union[pd.DataFrame, pd.Series]): Data to write.
+        file_path (Path): Path of the data file (".csv" or ".parquet").
+        index (bool, optional): Whether to write the index. Defaults to False.
+        compression (str, optional): Parquet compression codec. Defaults to "snappy".
+
+    Returns:
+        Path: Path of the data file.
+    """
+    if not is_parquet(file_path):
+        data.to_csv(file_path, index=index)
+        return file_path
+
+    check_format("parquet")
+    df = data.to_frame() if isinstance(data, pd.Series) else data.copy()
+    for column in df.columns:
+        if column in schema.DATE_COLUMNS:
+            df[column] = to_utc_dates(df[column])
+    schema.compact(df).to_parquet(file_path, index=index, compression=compression)
+    return file_path
@@ -0,0 +1,340 @@
+import contextlib
+import json
+import logging
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Tuple
+from urllib.parse import urlparse
+
+# Upper bounds (seconds) of the latency histogram buckets; the last bucket
+# holds the slower requests.
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Data file fetched from each repository endpoint; the other repository
+# endpoints (branches, releases, ...) are requested for the repository data.
+ENDPOINT_FEATURES = {
+    "commits": "commits",
+    "forks": "forks",
+    "issues": "issues_pulls",
+    "stargazers": "stargazer",
+    "subscribers": "watchers",
+    # Written as "Contributors.csv" by the fetchers.
+    "contributors": "Contributors",
+}
+REQUEST_COUNTERS = ("requests", "errors", "bytes", "waits", "waited_seconds")
+FILE_COUNTERS = ("pages", "records", "seconds")
+
+
+def split_url(url: str) -> Tuple[Optional[str], str, Optional[str]]:
+    """Splits a request URL into the repository, the endpoint and the data file.
+
+    Args:
+        url (str): Requested URL or path, e.g. "/repos/owner/name/commits?page=2".
+
+    Returns:
+        Tuple[Optional[str], str, Optional[str]]: Repository name (as its data
+            directory, None outside a repository), endpoint with placeholders,
+            e.g. "/repos/{owner}/{repo}/commits", and the data file it is
+            fetched for.
+    """
+    parts = [part for part in urlparse(url).path.split("/") if part]
+    if "graphql" in parts:
+        return None, "/graphql", "graphql"
+    if "repos" in parts and len(parts) > parts.index("repos") + 2:
+        position = parts.index("repos")
+        rest = ["{id}" if part.isdigit() else part for part in parts[position + 3 :]]
+        endpoint = "/".join(["/repos/{owner}/{repo}"] + rest)
+        feature = ENDPOINT_FEATURES.get(rest[0], "repo_data") if rest else "repo_data"
+        return parts[position + 2], endpoint, feature
+    if not parts:
+        return None, "/", None
+    return None, "/" + parts[0] + ("/{name}" if len(parts) > 1 else ""), None
+
+
+def new_endpoint() -> Dict[str, Any]:
+    """Returns the empty statistics of an endpoint."""
+    return {
+        "requests": 0,
+        "errors": 0,
+        "bytes": 0,
+        "seconds": 0.0,
+        "max_seconds": 0.0,
+        "histogram": [0] * (len(LATENCY_BUCKETS) + 1),
+    }
+
+
+class FetchTelemetry:
+    """Counters of a fetch run, shared by all fetch workers.
+
+    Requests are counted per endpoint, with a latency histogram, and per
+    repository and data file, together with the bytes received and the
+    waits for the rate limit. Requests outside a repository (e.g. of the
+    users of the stargazers) only count per endpoint and in the totals.
+    The fetchers add the pages and records they write and the time spent on
+    each file. A progress line is printed at most every ``progress_seconds``
+    instead of a line per item, and the counters are saved as a JSON metrics
+    file at the end of the run.
+    """
+
+    def __init__(self, progress_seconds: float = 10.0, total_repos: int = 0) -> None:
+        """Initialization of the FetchTelemetry class.
+
+        Args:
+            progress_seconds (float, optional): Seconds between two progress lines;
+                                                0 disables them. Defaults to 10.0.
+            total_repos (int, optional): Repositories of the run. Defaults to 0.
+        """
+        self.progress_seconds = progress_seconds
+        self.total_repos = total_repos
+        self.started = datetime.now()
+        self.start_time = time.perf_counter()
+        self._lock = threading.Lock()
+        self.clear()
+
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def clear(self) -> None:
+        """Resets the counters."""
+        self.endpoints: Dict[str, Dict[str, Any]] = {}
+        self.files: Dict[Tuple[str, str], Dict[str, float]] = {}
+        self.totals = dict.fromkeys(REQUEST_COUNTERS + FILE_COUNTERS, 0)
+        self.repos_done = 0
+        self.last_progress = time.perf_counter()
+
+    def detach(self) -> None:
+        """Starts empty counters without progress lines, e.g. in a worker process
+        whose counters are merged into the run's afterwards."""
+        with self._lock:
+            self.clear()
+            self.progress_seconds = 0
+
+    def file_counters(self, repo: str, feature: str) -> Dict[str, float]:
+        """Returns the counters of a data file (lock held by the caller)."""
+        counters = self.files.get((repo, feature))
+        if counters is None:
+            counters = self.files[(repo, feature)] = dict.fromkeys(
+                REQUEST_COUNTERS + FILE_COUNTERS, 0
+            )
+        return counters
+
+    def count(self, counters: Optional[Dict[str, float]], **values: float) -> None:
+        """Adds values to the counters of a data file (if any) and to the totals."""
+        for name, value in values.items():
+            if counters is not None:
+                counters[name] += value
+            self.totals[name] += value
+
+    def record_request(
+        self,
+        url: str,
+        status: int,
+        seconds: float,
+        size: int,
+        repo: Optional[str] = None,
+    ) -> None:
+        """Records a response.
+
+        Args:
+            url (str): Requested URL or path.
+            status (int): HTTP status of the response.
+            seconds (float): Time from sending the request to the response.
+            size (int): Bytes received.
+            repo (Optional[str], optional): Repository of a request whose URL does
+                                            not name it (GraphQL). Defaults to None.
+        """
+        url_repo, endpoint, feature = split_url(url)
+        repo = url_repo or repo
+        bucket = next(
+            (
+                position
+                for position, bound in enumerate(LATENCY_BUCKETS)
+                if seconds <= bound
+            ),
+            len(LATENCY_BUCKETS),
+        )
+        error = int(status >= 400)
+        with self._lock:
+            stats = self.endpoints.get(endpoint)
+            if stats is None:
+                stats = self.endpoints[endpoint] = new_endpoint()
+            stats["requests"] += 1
+            stats["errors"] += error
+            stats["bytes"] += size
+            stats["seconds"] += seconds
+            stats["max_seconds"] = max(stats["max_seconds"], seconds)
+            stats["histogram"][bucket] += 1
+            counters = self.file_counters(repo, feature or endpoint) if repo else None
+            self.count(counters, requests=1, errors=error, bytes=size)
+
+    def record_wait(self, url: str, seconds: float, repo: Optional[str] = None) -> None:
+        """Records a wait for the rate limit before (re)sending a request.
+
+        Args:
+            url (str): Requested URL or path.
+            seconds (float): Time waited.
+            repo (Optional[str], optional): Repository of the request, if the URL
+                                            does not name it. Defaults to None.
+        """
+        url_repo, endpoint, feature = split_url(url)
+        repo = url_repo or repo
+        with self._lock:
+            counters = self.file_counters(repo, feature or endpoint) if repo else None
+            self.count(counters, waits=1, waited_seconds=seconds)
+
+    def record_page(self, file_to_save: Path, records: int) -> None:
+        """Records a page written to a data file.
+
+        Args:
+            file_to_save (Path): Data file of the repository.
+            records (int): Records of the page.
+        """
+        with self._lock:
+            counters = self.file_counters(file_to_save.parent.name, file_to_save.stem)
+            self.count(counters, pages=1, records=records)
+        self.progress()
+
+    @contextlib.contextmanager
+    def fetching(self, file_to_save: Path) -> Iterator[None]:
+        """Times the fetch of a data file.
+
+        Args:
+            file_to_save (Path): Data file of the repository.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            with self._lock:
+                counters = self.file_counters(
+                    file_to_save.parent.name, file_to_save.stem
+                )
+                self.count(counters, seconds=seconds)
+
+    def repo_done(self) -> None:
+        """Records a fetched repository."""
+        with self._lock:
+            self.repos_done += 1
+        self.progress()
+
+    def merge(self, other: "FetchTelemetry") -> None:
+        """Adds the counters of another run part, e.g. of a worker process.
+
+        Args:
+            other (FetchTelemetry): Counters to add.
+        """
+        with self._lock:
+            for endpoint, stats in other.endpoints.items():
+                own = self.endpoints.setdefault(endpoint, new_endpoint())
+                for name in ("requests", "errors", "bytes", "seconds"):
+                    own[name] += stats[name]
+                own["max_seconds"] = max(own["max_seconds"], stats["max_seconds"])
+                own["histogram"] = [
+                    a + b for a, b in zip(own["histogram"], stats["histogram"])
+                ]
+            for (repo, feature), counters in other.files.items():
+                for name, value in counters.items():
+                    self.file_counters(repo, feature)[name] += value
+            for name, value in other.totals.items():
+                self.totals[name] += value
+            self.repos_done += other.repos_done
+
+    def progress(self, force: bool = False) -> None:
+        """Prints a progress line if ``progress_seconds`` passed since the last one.
+
+        Args:
+            force (bool, optional): Print it anyway. Defaults to False.
+        """
+        if not self.progress_seconds and not force:
+            return
+        now = time.perf_counter()
+        with self._lock:
+            if not force and now - self.last_progress < self.progress_seconds:
+                return
+            self.last_progress = now
+            totals, repos_done = dict(self.totals), self.repos_done
+        elapsed = now - self.start_time
+        line = (
+            f"Fetched {repos_done}/{self.total_repos or '?'} repositories: "
+            f"{totals['requests']} requests, {totals['bytes'] / 2**20:.1f} MiB, "
+            f"{totals['records']} records ({totals['records'] / elapsed:.0f}/s), "
+            f"{totals['waits']} rate-limit waits ({totals['waited_seconds']:.0f}s)"
+        )
+        print(line, flush=True)
+        logging.info(line)
+
+    def report(self) -> Dict[str, Any]:
+        """Returns the counters of the run.
+
+        Returns:
+            Dict[str, Any]: Totals, statistics per endpoint (with the latency
+                            histogram) and per repository and data file.
+        """
+        elapsed = time.perf_counter() - self.start_time
+        with self._lock:
+            # Files are fetched concurrently, so their times do not add up.
+            totals = {
+                name: value for name, value in self.totals.items() if name != "seconds"
+            }
+            endpoints = {
+                endpoint: {
+                    **{name: stats[name] for name in ("requests", "errors", "bytes")},
+                    "mean_seconds": stats["seconds"] / stats["requests"],
+                    "max_seconds": stats["max_seconds"],
+                    "histogram": dict(
+                        zip(
+                            [f"<={bound}s" for bound in LATENCY_BUCKETS] + ["slower"],
+                            stats["histogram"],
+                        )
+                    ),
+                }
+                for endpoint, stats in sorted(self.endpoints.items())
+            }
+            repos: Dict[str, Dict[str, Any]] = {}
+            for (repo, feature), counters in sorted(self.files.items()):
+                seconds = counters["seconds"]
+                repos.setdefault(repo, {})[feature] = {
+                    **counters,
+                    "records_per_second": (
+                        counters["records"] / seconds if seconds else None
+                    ),
+                }
+            repos_done = self.repos_done
+        return {
+            "created_at": self.started.isoformat(timespec="seconds"),
+            "wall_seconds": elapsed,
+            "repos": {"total": self.total_repos, "done": repos_done},
+            "totals": {
+                **totals,
+                "records_per_second": totals["records"] / elapsed if elapsed else None,
+            },
+            "endpoints": endpoints,
+            "files": repos,
+        }
+
+    def save(self, metrics_dir: Path, extra: Optional[Dict[str, Any]] = None) -> Path:
+        """Saves the metrics of the run as JSON file named after its start time.
+
+        Args:
+            metrics_dir (Path): Directory of the metrics files.
+            extra (Optional[Dict[str, Any]], optional): Further statistics, e.g. of
+                                                        the rate-limit scheduler.
+                                                        Defaults to None.
+
+        Returns:
+            Path: Path of the metrics file.
+        """
+        metrics_dir = Path(metrics_dir)
+        metrics_dir.mkdir(parents=True, exist_ok=True)
+        metrics_file = metrics_dir / f"fetch-{self.started:%Y%m%d-%H%M%S}.json"
+        with open(metrics_file, "w") as f:
+            json.dump({**self.report(), **(extra or {})}, f, indent=2)
+        return metrics_file
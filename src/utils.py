@@ -6,7 +6,20 @@ import matplotlib.pyplot as plt
 import numpy as np
 import pandas as pd
 
-from preprocess_repo_data import FileDirEmptyError, NotFoundError
+import catalog
+import storage
+
+
+class NotFoundError(Exception):
+    """Exception raised when there is no File"""
+
+    pass
+
+
+class FileDirEmptyError(Exception):
+    """Exception raised when there File or Directory is Empty"""
+
+    pass
 
 
 def get_repo_path(repos_dir: Union[Path, str]) -> Optional[Path]:
@@ -57,6 +70,9 @@ def list_repos_dirs(repos_dir: Path) -> List[Path]:
     #     raise NotFoundError(f'Path Does not Exist: "{repos_path}" not found.')
     # elif len(list(repos_path.iterdir())) == 0:
     #     raise FileDirEmptyError(f"Empty File or Directory:{repos_path}")
+    repos_catalog = catalog.open_catalog(repos_dir)
+    if repos_catalog is not None and repos_catalog.repos:
+        return repos_catalog.repo_dirs()
     repos_path = get_repo_path(repos_dir)
     if repos_path is None:
         print("Something went wrong")
@@ -76,6 +92,10 @@ def list_repos_dirs(repos_dir: Path) -> List[Path]:
 def list_repo_files(repo_dir: Path) -> Dict[str, Path]:
     """Returns paths list of feature file in a repository directory.
 
+    CSV and Parquet files are listed; if a feature is stored in both formats
+    the most recently written file is returned. Repositories of an opened
+    catalog are looked up without listing the directory.
+
     Args:
         repo_dir (Path): Path to the repository directory
 
@@ -86,10 +106,21 @@ def list_repo_files(repo_dir: Path) -> Dict[str, Path]:
     #     raise NotFoundError(f'Path Does not Exist: "{repo_dir}" not found.')
     # elif len(list(repo_dir.iterdir())) == 0:
     #     raise FileDirEmptyError(f"Empty File or Directory:{repo_dir}")
+    repo_catalog = catalog.find_catalog(repo_dir)
+    if repo_catalog is not None:
+        repo_files = repo_catalog.repo_files(repo_dir)
+        if repo_files is not None:
+            return repo_files
     repo_path = get_repo_path(repo_dir)
     if repo_path is None:
         print("Something went wrong")
-    repo_lsit = {r_file.stem: r_file for r_file in repo_path.glob("*.csv")}
+    repo_lsit = {}
+    for r_file in repo_path.iterdir():
+        if r_file.suffix not in storage.FORMATS.values():
+            continue
+        current = repo_lsit.get(r_file.stem)
+        if current is None or r_file.stat().st_mtime > current.stat().st_mtime:
+            repo_lsit[r_file.stem] = r_file
     return repo_lsit
 
 
@@ -103,9 +134,6 @@ def get_feat_file(feature_name: str, repo_dir: Path) -> Path:
     Returns:
         Path: Path of the feature file.
     """
-    repo_path = get_repo_path(repo_dir)
-    if repo_path is None:
-        print("Something went wrong")
     repo_files = list_repo_files(repo_dir)
     return repo_files[feature_name]
 
@@ -115,6 +143,7 @@ def get_save_path(
     repos_dir: Path,
     save_dir: Path,
     parent: bool,
+    file_format: str = "csv",
 ) -> Path:
     """Creates a path to save the processed File or Directory.
 
@@ -124,23 +153,25 @@ def get_save_path(
         save_dir (Path): Path to save the processed File or Directory.
         parent (bool): Treu if the you want to keep the original parent directory name.
                         False if you want just to save unter the current directory.
+        file_format (str, optional): Storage format, "csv" or "parquet". Defaults to "csv".
 
     Returns:
         Path: Path to save the processed File or Directory.
     """
 
+    suffix = storage.check_format(file_format)
     if not save_dir.exists():
         save_dir.mkdir(exist_ok=True)
     repo_name = repos_dir.name
     parent_dir = list(repos_dir.parents)[0].name
 
     if not parent:
-        saving_path = (save_dir / f"{repo_name}_{feature_name}").with_suffix(".csv")
+        saving_path = (save_dir / f"{repo_name}_{feature_name}").with_suffix(suffix)
         # print(repo_name, repo_lang_dir)
     else:
         saving_path = save_dir / parent_dir / repo_name
         saving_path.mkdir(parents=True, exist_ok=True)
-        saving_path = (saving_path / f"{feature_name}").with_suffix(".csv")
+        saving_path = (saving_path / f"{feature_name}").with_suffix(suffix)
 
     if not saving_path.exists():
         saving_path.touch()
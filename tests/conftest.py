@@ -0,0 +1,36 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+# The modules of src/ import each other as top-level modules.
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+import catalog  # noqa: E402
+from generate_repo_data import generate_raw_data  # noqa: E402
+
+# Mean history sizes of the synthetic repositories of the tests.
+SIZES = {
+    "commits": 60,
+    "stars": 40,
+    "forks": 20,
+    "issues": 30,
+    "watchers": 5,
+    "contributors": 5,
+}
+
+
+@pytest.fixture(autouse=True)
+def no_catalog():
+    """Lists the data directories without catalogs unless a test enables them."""
+    catalog.configure(enabled=False)
+    yield
+    catalog.configure()
+
+
+@pytest.fixture
+def raw_data(tmp_path):
+    """Raw data tree of three small synthetic repositories."""
+    raw_data_dir = tmp_path / "raw"
+    generate_raw_data(raw_data_dir, 3, SIZES, start="2021-01-01", seed=1)
+    return raw_data_dir
@@ -0,0 +1,49 @@
+import asyncio
+
+import pandas as pd
+
+from async_fetch import AsyncRepoDataFetcher
+from fetch_repo_data import RepoDataFetcher
+from http_cache import ResponseCache
+from mock_github import MockGithubServer, synthetic_repos
+
+FILES = ("commits", "forks", "issues_pulls", "stargazer", "watchers", "Contributors")
+
+
+def fetch(engine: str, server: MockGithubServer, save_path, **kwargs) -> None:
+    names = list(server.repos)
+    fetcher = RepoDataFetcher(
+        names, save_path, tokens=["token"], api_url=server.url, **kwargs
+    )
+    if engine == "async":
+        asyncio.run(AsyncRepoDataFetcher(fetcher).fetch_repos(names, workers=2))
+    else:
+        for name in names:
+            fetcher.get_repo_data(name)
+    fetcher.client_pool.close()
+
+
+def read_files(save_path):
+    return {
+        (repo_dir.name, stem): pd.read_csv(repo_dir / f"{stem}.csv")
+        for repo_dir in sorted(save_path.iterdir())
+        for stem in FILES
+    }
+
+
+def test_async_engine_writes_the_files_of_the_sync_engine(tmp_path):
+    repos = synthetic_repos(3, 120, 80, 40, 60, 10, 10)
+    with MockGithubServer(repos) as server:
+        fetch("sync", server, tmp_path / "sync")
+        fetch("async", server, tmp_path / "async", checkpoint_pages=1)
+        cache = ResponseCache(tmp_path / "cache")
+        # An incremental run on top of the fetched files changes nothing.
+        fetch("async", server, tmp_path / "async", sync_mode="incremental", cache=cache)
+
+    expected = read_files(tmp_path / "sync")
+    actual = read_files(tmp_path / "async")
+    assert len(expected[("repo0", "commits")]) == 120
+    assert actual.keys() == expected.keys()
+    for name, table in expected.items():
+        pd.testing.assert_frame_equal(actual[name], table, obj=str(name))
+    assert not list((tmp_path / "async").rglob("*.part"))
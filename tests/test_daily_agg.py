@@ -0,0 +1,157 @@
+import io
+from pathlib import Path
+from typing import Dict, Union
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import daily_agg
+import utils
+from daily_agg import DailyCounts, DayTotals
+from preprocess_repo_data import RowRepoDataProcessor, feature_outputs
+
+ROLLUPS = ["W", "M", "Q"]
+
+
+def daily_count(df: pd.DataFrame, date_column: str, name: str) -> pd.DataFrame:
+    """Counts the events of a date column per day, as the baseline processor did."""
+    grouped = df.groupby(pd.Grouper(key=date_column, freq="D"))
+    return grouped[date_column].count().to_frame(name=name)
+
+
+def merge_outer(frames) -> pd.DataFrame:
+    merged = frames[0]
+    for frame in frames[1:]:
+        merged = pd.merge(merged, frame, how="outer", left_index=True, right_index=True)
+    return merged
+
+
+def baseline_features(repo_path: Path) -> Dict[str, Union[pd.DataFrame, pd.Series]]:
+    """Daily tables of a repository computed with the resample, groupby and
+    outer merge logic the aggregation replaced."""
+    commits = (
+        pd.read_csv(
+            repo_path / "commits.csv",
+            parse_dates=["commit_date"],
+            index_col="commit_date",
+        )
+        .commit_count.resample("D")
+        .count()
+    )
+    forks = daily_count(
+        pd.read_csv(repo_path / "forks.csv", parse_dates=["forked_at"]),
+        "forked_at",
+        "forks_count",
+    )
+    stars = daily_count(
+        pd.read_csv(repo_path / "stargazer.csv", parse_dates=["starred_at"]),
+        "starred_at",
+        "Stars_count",
+    )
+    issues_df = pd.read_csv(
+        repo_path / "issues_pulls.csv",
+        parse_dates=["pr_iss_opened_at", "pr_iss_updated_at", "pr_iss_closed_at"],
+    )
+    issues = merge_outer(
+        [
+            daily_count(issues_df, "pr_iss_opened_at", "pr_iss_Open_count"),
+            daily_count(issues_df, "pr_iss_updated_at", "pr_iss_updated_count"),
+            daily_count(issues_df, "pr_iss_closed_at", "pr_is_closed_count"),
+        ]
+    )
+    all_feature = merge_outer([commits, forks, stars, issues]).fillna(0)
+    all_feature.index.name = "date"
+    return {
+        "commits": commits,
+        "forks": forks,
+        "stargazer": stars,
+        "issues_pulls": issues,
+        "all_feature": all_feature,
+    }
+
+
+def baseline_rollup(all_feature: pd.DataFrame, freq: str) -> pd.DataFrame:
+    """Sums the baseline daily table per period, labelled by the period's first day."""
+    table = all_feature.groupby(all_feature.index.to_period(freq)).sum()
+    table.index = table.index.to_timestamp().rename("date")
+    return table
+
+
+def as_written(table: Union[pd.DataFrame, pd.Series]) -> pd.DataFrame:
+    """Reads a table back as it is read from a CSV file."""
+    buffer = io.StringIO()
+    table.to_csv(buffer)
+    buffer.seek(0)
+    return read_processed(buffer)
+
+
+def read_processed(file) -> pd.DataFrame:
+    return pd.read_csv(file, index_col=0, parse_dates=True)
+
+
+def assert_same_counts(actual: pd.DataFrame, expected: pd.DataFrame) -> None:
+    pd.testing.assert_frame_equal(actual, expected, check_dtype=False)
+
+
+@pytest.mark.parametrize("chunk_rows", [0, 7])
+def test_processed_files_match_the_baseline(raw_data, tmp_path, chunk_rows):
+    processor = RowRepoDataProcessor(rollups=ROLLUPS, chunk_rows=chunk_rows)
+    save_path = tmp_path / "processed"
+    for repo_path in utils.list_repos_dirs(raw_data):
+        expected = baseline_features(repo_path)
+        all_feature = processor.agg_one_repo_feat(repo_path, str(save_path))
+        outputs = {path.stem: path for path in feature_outputs(all_feature, ROLLUPS)}
+
+        for feature, table in expected.items():
+            assert_same_counts(read_processed(outputs[feature]), as_written(table))
+        for freq in ROLLUPS:
+            name = f"all_feature_{daily_agg.ROLLUPS[freq]}"
+            assert_same_counts(
+                read_processed(outputs[name]),
+                as_written(baseline_rollup(expected["all_feature"], freq)),
+            )
+
+
+def test_timezone_aware_dates_count_on_their_utc_day(tmp_path):
+    repo_path = tmp_path / "raw" / "repo"
+    repo_path.mkdir(parents=True)
+    pd.DataFrame(
+        {
+            "repo_name": "owner/repo",
+            "commit_count": 3,
+            "commit_sha": ["a", "b", "c"],
+            "commit_date": [
+                "2022-07-03 01:00:00+00:00",
+                "2022-07-01 23:00:00+00:00",
+                "2022-07-01 08:00:00+00:00",
+            ],
+        }
+    ).to_csv(repo_path / "commits.csv", index=False)
+
+    dates = pd.read_csv(repo_path / "commits.csv", parse_dates=["commit_date"])
+    counts = DailyCounts.from_dates({"commit_count": dates["commit_date"]})
+    table = counts.frame(["commit_count"], "commit_date")
+
+    expected = (
+        dates.set_index("commit_date").commit_count.resample("D").count().to_frame()
+    )
+    pd.testing.assert_frame_equal(
+        table, expected, check_dtype=False, check_index_type=False, check_freq=False
+    )
+    assert str(table.index.tz) == "UTC"
+
+
+def test_day_totals_add_up_chunks():
+    totals = DayTotals()
+    totals.add(np.array([3, 1, 3]))
+    totals.add(np.array([2, 3]))
+    totals.add(np.array([], dtype=np.int64))
+
+    assert list(totals.days) == [1, 2, 3]
+    assert list(totals.counts) == [1, 1, 3]
+
+
+def test_unknown_rollup_is_rejected():
+    with pytest.raises(ValueError):
+        daily_agg.check_rollups(["D"])
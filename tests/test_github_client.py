@@ -0,0 +1,68 @@
+import pickle
+import threading
+
+from github_client import GithubClientPool
+from http_cache import ResponseCache
+from mock_github import MockGithubServer, synthetic_repos
+
+
+def test_every_thread_gets_its_own_clients():
+    pool = GithubClientPool(["token-a", "token-b"])
+    clients = {}
+
+    def get_clients(name: str) -> None:
+        clients[name] = pool.clients
+
+    threads = [threading.Thread(target=get_clients, args=(i,)) for i in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert pool.clients is pool.clients
+    ids = {id(client) for by_token in clients.values() for client in by_token.values()}
+    assert len(ids) == 6
+    assert not ids & {id(client) for client in pool.clients.values()}
+    pool.close()
+
+
+def test_pickled_pool_builds_new_clients():
+    pool = GithubClientPool(["token"])
+    client = pool.get_client()
+    copy = pickle.loads(pickle.dumps(pool))
+    assert copy.get_client() is not client
+    pool.close()
+
+
+def get_repos_concurrently(get_client, names, threads=16, calls=20):
+    """Requests the repositories from several threads, returns the mismatches."""
+    mismatches = []
+
+    def fetch(offset: int) -> None:
+        for call in range(calls):
+            name = names[(offset + call) % len(names)]
+            full_name = get_client().get_repo(name).full_name
+            if full_name != name:
+                mismatches.append((name, full_name))
+
+    workers = [threading.Thread(target=fetch, args=(i,)) for i in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return mismatches
+
+
+def test_concurrent_cached_requests_get_their_own_responses(tmp_path):
+    repos = synthetic_repos(16, 1, 1, 1, 1, 1, 1)
+    names = [repo.full_name for repo in repos]
+    cache = ResponseCache(tmp_path / "cache")
+    with MockGithubServer(repos, latency=0.002) as server:
+        pool = GithubClientPool(["token"], api_url=server.url, cache=cache)
+        shared = pool.get_client()
+        # Threads of the pool and threads sharing one client, as the page
+        # prefetch does; the second round is answered from the cache.
+        for get_client in (pool.get_client, lambda: shared) * 2:
+            assert get_repos_concurrently(get_client, names) == []
+        pool.close()
+    assert cache.stats["hits"] > 0
@@ -0,0 +1,61 @@
+from pathlib import Path
+from typing import Dict, Set
+
+import catalog
+import change_tracker
+import utils
+from change_tracker import ChangeTracker
+from pipeline import PreprocessPipeline
+from preprocess_repo_data import RowRepoDataProcessor
+
+
+def modification_times(*dirs: Path) -> Dict[Path, int]:
+    return {
+        path: path.stat().st_mtime_ns
+        for root in dirs
+        for path in root.rglob("*")
+        if path.is_file()
+    }
+
+
+def rewritten(before: Dict[Path, int], after: Dict[Path, int]) -> Set[Path]:
+    return {path for path, mtime in after.items() if before.get(path) != mtime}
+
+
+def run_pipeline(raw_dir: Path, processed_dir: Path, final_dir: Path) -> None:
+    """Runs the preprocessing as ``preprocess_repo_data.main`` does."""
+    tracker = ChangeTracker(processed_dir / change_tracker.STATE_FILE)
+    processor = RowRepoDataProcessor(workers=1, tracker=tracker)
+    PreprocessPipeline(
+        processor, str(raw_dir), str(processed_dir), str(final_dir), [24]
+    ).run()
+    catalog.save_catalogs()
+
+
+def test_rebuild_only_the_changed_repository(raw_data, tmp_path):
+    catalog.configure(enabled=True)
+    processed_dir, final_dir = tmp_path / "processed", tmp_path / "final"
+    processed_dir.mkdir()
+    final_dir.mkdir()
+    run_pipeline(raw_data, processed_dir, final_dir)
+    # A new catalog for the next run, as a new process opens it.
+    catalog.configure(enabled=True)
+    before = modification_times(processed_dir, final_dir)
+
+    repo_path = utils.list_repos_dirs(raw_data)[0]
+    commits = repo_path / "commits.csv"
+    with open(commits) as f:
+        last_line = f.readlines()[-1]
+    with open(commits, "a") as f:
+        f.write(last_line)
+    run_pipeline(raw_data, processed_dir, final_dir)
+
+    changed = rewritten(before, modification_times(processed_dir, final_dir))
+    repo_outputs = set(processed_dir.glob(f"*/{repo_path.name}/*")) | set(
+        final_dir.glob(f"{repo_path.name}_*")
+    )
+    assert len(repo_outputs) == 6
+    assert changed == repo_outputs | {
+        processed_dir / "catalog.json",
+        processed_dir / change_tracker.STATE_FILE,
+    }
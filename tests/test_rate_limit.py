@@ -0,0 +1,163 @@
+import threading
+
+import pytest
+
+from rate_limit import RateLimitScheduler, rate_limited_connection_class
+
+KEY = "token"
+
+
+class FakeClock:
+    """Clock that only moves when the scheduler sleeps."""
+
+    def __init__(self, now: float = 1000.0) -> None:
+        self.now = now
+        self.sleeps = []
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def scheduler(clock):
+    return RateLimitScheduler(min_remaining=2, clock=clock, sleeper=clock.sleep)
+
+
+def headers(remaining: int, reset: float, limit: int = 10) -> dict:
+    return {
+        "x-ratelimit-remaining": str(remaining),
+        "x-ratelimit-limit": str(limit),
+        "x-ratelimit-reset": str(reset),
+    }
+
+
+def test_unknown_budget_does_not_wait(scheduler, clock):
+    assert scheduler.remaining(KEY) == float("inf")
+    assert scheduler.acquire(KEY) == 0
+    assert clock.sleeps == []
+
+
+def test_burst_drains_the_bucket_down_to_the_reserve(scheduler, clock):
+    scheduler.update(KEY, "core", headers(5, clock.now + 60))
+
+    assert [scheduler.reserve(KEY) for _ in range(3)] == [0, 0, 0]
+    assert scheduler.remaining(KEY) == 2
+    assert scheduler.reserve(KEY) == 61
+    assert scheduler.remaining(KEY) == 2
+
+
+def test_wait_on_empty_sleeps_until_the_reset(scheduler, clock):
+    reset = clock.now + 120
+    scheduler.update(KEY, "core", headers(2, reset))
+
+    assert scheduler.acquire(KEY) == 121
+    assert clock.sleeps == [121]
+    assert clock.now > reset
+    assert scheduler.stats["waits"] == 1
+    assert scheduler.stats["waited_seconds"] == 121
+    # Past the reset the budget is unknown until the next response.
+    assert scheduler.remaining(KEY) == float("inf")
+
+
+def test_refill_from_a_later_window(scheduler, clock):
+    scheduler.update(KEY, "core", headers(3, clock.now + 60))
+    scheduler.reserve(KEY)
+    assert scheduler.reserve(KEY) > 0
+
+    scheduler.update(KEY, "core", headers(10, clock.now + 3660))
+    assert scheduler.remaining(KEY) == 10
+    assert scheduler.acquire(KEY) == 0
+    assert scheduler.remaining(KEY) == 9
+
+
+def test_late_response_of_the_same_window_does_not_refill(scheduler, clock):
+    reset = clock.now + 60
+    scheduler.update(KEY, "core", headers(4, reset))
+    scheduler.update(KEY, "core", headers(8, reset))
+    assert scheduler.remaining(KEY) == 4
+
+
+def test_buckets_are_kept_per_resource(scheduler, clock):
+    scheduler.update(KEY, "core", headers(2, clock.now + 60))
+    scheduler.update(KEY, "graphql", headers(5, clock.now + 60))
+
+    assert scheduler.reserve(KEY, "core") > 0
+    assert scheduler.reserve(KEY, "graphql") == 0
+
+
+def test_primary_limit_is_retried_after_the_reset(scheduler, clock):
+    wait = scheduler.retry_after(KEY, "core", 403, headers(0, clock.now + 30), "", 0)
+    assert wait == 31
+    assert scheduler.stats["secondary_limits"] == 0
+
+
+def test_secondary_limit_backs_off(scheduler):
+    assert scheduler.retry_after(KEY, "core", 403, {"retry-after": "7"}, "", 0) == 7
+    body = "You have exceeded a secondary rate limit"
+    assert scheduler.retry_after(KEY, "core", 403, {}, body, 2) == 240
+    assert scheduler.retry_after(KEY, "core", 429, {}, "", 10) == scheduler.max_backoff
+    assert scheduler.stats["secondary_limits"] == 3
+    assert scheduler.retry_after(KEY, "core", 200, {}, "", 0) is None
+
+
+def test_primary_limit_without_reset_header(scheduler, clock):
+    wait = scheduler.retry_after(
+        KEY, "core", 403, {"x-ratelimit-remaining": "0"}, "", 0
+    )
+    assert wait == 61
+
+
+class FakeResponse:
+    def __init__(self, status: int) -> None:
+        self.status = status
+
+    def getheaders(self):
+        return []
+
+    def read(self) -> str:
+        return ""
+
+
+class FakeConnection:
+    """Connection class storing the request like PyGithub's."""
+
+    def __init__(self, host: str, port=None, **kwargs) -> None:
+        self.statuses = [429, 200]
+        self.sent = []
+
+    def request(self, verb, url, input, headers, stream=False) -> None:
+        self.verb, self.url, self.input, self.headers = verb, url, input, headers
+        self.stream = stream
+
+    def getresponse(self) -> FakeResponse:
+        self.sent.append((self.verb, self.url, self.headers))
+        return FakeResponse(self.statuses.pop(0))
+
+
+def test_retry_sends_the_same_request(clock):
+    def sleep_while_another_thread_requests(seconds: float) -> None:
+        clock.sleep(seconds)
+        other = threading.Thread(
+            target=connection.request, args=("GET", "/other", None, {"b": "2"})
+        )
+        other.start()
+        other.join()
+
+    scheduler = RateLimitScheduler(
+        clock=clock, sleeper=sleep_while_another_thread_requests
+    )
+    connection = rate_limited_connection_class(FakeConnection, scheduler, KEY)("host")
+    connection.request("GET", "/repos/owner/name", None, {"a": "1"})
+
+    assert connection.getresponse().status == 200
+    assert connection.sent == [("GET", "/repos/owner/name", {"a": "1"})] * 2
+    assert clock.sleeps == [60]
@@ -0,0 +1,129 @@
+import pandas as pd
+import pytest
+
+from record_writer import RecordWriter
+
+COMMIT_COLUMNS = ["repo_name", "commit_count", "commit_sha", "commit_date"]
+ISSUE_COLUMNS = ["repo_name", "pr_iss_number", "pr_iss_state", "pr_iss_updated_at"]
+
+
+def commit(sha: str, day: int, count: int = 10) -> dict:
+    return {
+        "repo_name": "owner/repo",
+        "commit_count": count,
+        "commit_sha": sha,
+        "commit_date": f"2022-07-{day:02d} 12:00:00",
+    }
+
+
+def issue(number: int, state: str, day: int) -> dict:
+    return {
+        "repo_name": "owner/repo",
+        "pr_iss_number": number,
+        "pr_iss_state": state,
+        "pr_iss_updated_at": f"2022-07-{day:02d} 12:00:00",
+    }
+
+
+def test_write_keeps_the_final_file_until_close(tmp_path):
+    file_path = tmp_path / "commits.csv"
+    writer = RecordWriter(file_path, COMMIT_COLUMNS, batch_size=2)
+    writer.write_many([commit("a", 3), commit("b", 2), commit("c", 1)])
+
+    assert writer.part_path.exists()
+    assert not file_path.exists()
+    writer.close()
+
+    assert not writer.part_path.exists()
+    assert list(pd.read_csv(file_path)["commit_sha"]) == ["a", "b", "c"]
+
+
+def test_interrupted_write_resumes_from_checkpoint(tmp_path):
+    file_path = tmp_path / "commits.csv"
+    records = [commit(sha, day) for sha, day in zip("abcde", range(5, 0, -1))]
+
+    with pytest.raises(RuntimeError):
+        with RecordWriter(file_path, COMMIT_COLUMNS, batch_size=2) as writer:
+            writer.write_many(records[:2])
+            writer.flush()  # checkpoint after 2 records
+            writer.write_many(records[2:4])
+            raise RuntimeError("connection lost")
+
+    # The records after the checkpoint were flushed but are fetched again.
+    assert not file_path.exists()
+    assert len(pd.read_csv(writer.part_path)) == 4
+
+    with RecordWriter(file_path, COMMIT_COLUMNS, batch_size=2) as writer:
+        assert writer.resume(2)
+        assert writer.count == 2
+        writer.write_many(records[2:])
+
+    assert list(pd.read_csv(file_path)["commit_sha"]) == list("abcde")
+    assert not writer.part_path.exists()
+
+
+def test_resume_without_part_file_starts_over(tmp_path):
+    writer = RecordWriter(tmp_path / "commits.csv", COMMIT_COLUMNS)
+    assert not writer.resume(10)
+    assert writer.count == 0
+
+
+def test_resume_past_the_part_file_starts_over(tmp_path):
+    file_path = tmp_path / "commits.csv"
+    writer = RecordWriter(file_path, COMMIT_COLUMNS)
+    writer.write_many([commit("a", 2), commit("b", 1)])
+    writer.flush()
+
+    assert not RecordWriter(file_path, COMMIT_COLUMNS).resume(3)
+
+
+@pytest.mark.parametrize("suffix", [".csv", ".parquet"])
+def test_append_adds_records_to_the_end(tmp_path, suffix):
+    file_path = tmp_path / f"commits{suffix}"
+    with RecordWriter(file_path, COMMIT_COLUMNS) as writer:
+        writer.write_many([commit("a", 1), commit("b", 2)])
+    with RecordWriter(file_path, COMMIT_COLUMNS, mode="append") as writer:
+        writer.write_many([commit("c", 3)])
+
+    stored = pd.read_csv(file_path) if suffix == ".csv" else pd.read_parquet(file_path)
+    assert list(stored.columns) == COMMIT_COLUMNS
+    assert list(stored["commit_sha"]) == ["a", "b", "c"]
+
+
+def test_upsert_replaces_rows_with_the_same_key(tmp_path):
+    file_path = tmp_path / "issues_pulls.csv"
+    with RecordWriter(file_path, ISSUE_COLUMNS) as writer:
+        writer.write_many(
+            [issue(1, "open", 1), issue(2, "open", 2), issue(3, "open", 3)]
+        )
+
+    with RecordWriter(
+        file_path, ISSUE_COLUMNS, mode="upsert", key="pr_iss_number"
+    ) as writer:
+        writer.write_many([issue(2, "closed", 5), issue(4, "open", 6)])
+
+    stored = pd.read_csv(file_path).set_index("pr_iss_number")
+    assert sorted(stored.index) == [1, 2, 3, 4]
+    assert stored.loc[2, "pr_iss_state"] == "closed"
+    assert stored.loc[2, "pr_iss_updated_at"] == "2022-07-05 12:00:00"
+    assert stored.loc[1, "pr_iss_state"] == "open"
+
+
+def test_upsert_requires_a_key(tmp_path):
+    with pytest.raises(ValueError):
+        RecordWriter(tmp_path / "issues_pulls.csv", ISSUE_COLUMNS, mode="upsert")
+
+
+def test_prepend_refreshes_the_snapshot_columns(tmp_path):
+    file_path = tmp_path / "commits.csv"
+    with RecordWriter(file_path, COMMIT_COLUMNS) as writer:
+        writer.write_many([commit("b", 2, count=2), commit("a", 1, count=2)])
+
+    with RecordWriter(
+        file_path, COMMIT_COLUMNS, mode="prepend", snapshot=["commit_count"]
+    ) as writer:
+        writer.write_many([commit("d", 4, count=4), commit("c", 3, count=4)])
+
+    stored = pd.read_csv(file_path)
+    assert list(stored["commit_sha"]) == ["d", "c", "b", "a"]
+    assert list(stored["commit_count"]) == [4, 4, 4, 4]
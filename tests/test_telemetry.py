@@ -0,0 +1,33 @@
+from pathlib import Path
+
+from telemetry import FetchTelemetry, split_url
+
+
+def test_split_url():
+    assert split_url("/repos/owner/name/commits?page=2") == (
+        "name",
+        "/repos/{owner}/{repo}/commits",
+        "commits",
+    )
+    assert split_url("/repos/owner/name") == (
+        "name",
+        "/repos/{owner}/{repo}",
+        "repo_data",
+    )
+    assert split_url("/users/someone") == (None, "/users/{name}", None)
+    assert split_url("/graphql") == (None, "/graphql", "graphql")
+
+
+def test_requests_and_pages_of_a_file_are_counted_together():
+    telemetry = FetchTelemetry(progress_seconds=0)
+    for stem, endpoint in [
+        ("Contributors", "contributors"),
+        ("stargazer", "stargazers"),
+    ]:
+        telemetry.record_request(f"/repos/owner/name/{endpoint}", 200, 0.01, 100)
+        telemetry.record_page(Path("raw", "name", f"{stem}.csv"), 30)
+
+    files = telemetry.report()["files"]["name"]
+    assert set(files) == {"Contributors", "stargazer"}
+    assert files["Contributors"]["requests"] == 1
+    assert files["Contributors"]["records"] == 30